@@ -16,6 +16,7 @@ sys.path.append(lstm_path)
 try:
     from data_pipeline import run_pipeline as start_crypto_pipeline
     from combine_signals import main as start_technical_analysis 
+    from correlations import main as start_correlations
   
     #from predictions import LSTMPredictionStrategy, PredictionService
     
@@ -55,6 +56,13 @@ def run_sequence():
     except Exception as e:
         print(f"Failed: {e}", flush=True)
 
+    print(f"\n[{datetime.now()}] Starting Correlations...", flush=True)
+    try:
+        start_correlations()
+        print(f"[{datetime.now()}] Complete.", flush=True)
+    except Exception as e:
+        print(f"Failed: {e}", flush=True)
+
 
     # print(f"\n[{datetime.now()}] Starting LSTM Analysis...", flush=True)
     # start_lstm_prediction()
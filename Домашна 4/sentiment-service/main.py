@@ -1,7 +1,8 @@
 from contextlib import asynccontextmanager
 import sys
 from pathlib import Path
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
+from sqlalchemy import text
 import uvicorn
 import time
 import asyncio
@@ -13,30 +14,69 @@ from datetime import datetime
 
 scrapers_path = Path(__file__).parent/ "sentiment-analysis" / "scrapers"
 analysis_path = Path(__file__).parent/ "sentiment-analysis" / "analysis"
+technical_path = Path(__file__).parent/ "technical-analysis"
 sys.path.append(str(scrapers_path))
 sys.path.append(str(analysis_path))
+sys.path.append(str(technical_path))
 
 load_dotenv()
 
 CALLBACK_TOKEN = os.getenv("CALLBACK_SECRET_TOKEN")
 
 try:
-    from sentiment_analysis import run_pipeline
+    from sentiment_analysis import Config as SentimentConfig, SentimentModelSingleton, run_pipeline, warm_up
     from jobs.scheduler import start_scheduler
 except ImportError as e:
     print(f"IMPORTING ERROR {e}")
     run_pipeline = None
+    warm_up = None
+
+try:
+    from database.database import DatabaseManager
+    from screening import parse_filters, screen_query
+except ImportError as e:
+    print(f"IMPORTING ERROR {e}")
+    screen_query = None
 
 if CALLBACK_TOKEN is None or CALLBACK_TOKEN == '':
     raise Exception("No callback token.")
 
+model_status = {"state": "not_loaded"}
+
+def warm_up_model():
+    model_status.update(state="loading", started_at=datetime.now().isoformat())
+    try:
+        model_status.update(warm_up())
+        model_status.update(state="ready", ready_at=datetime.now().isoformat())
+        print(f"Sentiment model ready ({model_status['backend']}): "
+              f"load {model_status['load_seconds']}s, warm-up {model_status['warmup_seconds']}s.")
+    except Exception as e:
+        model_status.update(state="failed", error=str(e))
+        print(f"Sentiment model warm-up failed: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if warm_up:
+        # before any thread starts; the workers come from a forkserver, never from this process
+        SentimentModelSingleton.open_pool()
+
     scheduler_thread = threading.Thread(target=start_scheduler, name="SchedulerThread", daemon=True)
     scheduler_thread.start()
     print("Scheduler thread started.")
+
+    if warm_up and SentimentConfig.PRELOAD_MODEL:
+        # in the background so startup and the other endpoints are not held up by the download
+        threading.Thread(target=warm_up_model, name="ModelWarmupThread", daemon=True).start()
+        print("Model warm-up thread started.")
+    elif warm_up:
+        model_status["state"] = "lazy"
+    else:
+        model_status["state"] = "unavailable"
     yield
 
+    if warm_up:
+        SentimentModelSingleton.close_pool()
+
 app = FastAPI(lifespan=lifespan)
 
 @app.post("/api/update-sentiment", status_code=202)
@@ -57,11 +97,49 @@ async def get_news_sentiment(request: Request):
     except Exception as e:
         return {"error": "Failed to process request"}
 
+@app.get("/api/ready")
+def readiness(response: Response):
+    """200 once the sentiment model is warm (or preloading is off), 503 while it loads or if loading failed."""
+    if model_status["state"] not in ("ready", "lazy"):
+        response.status_code = 503
+    return model_status
+
+@app.get("/api/screen")
+def screen_coins(
+    period: str = "DAY",
+    filter: str | None = None,
+    sort: str = "score",
+    ascending: bool = False,
+    limit: int = 20,
+    date: str | None = None,
+):
+    """
+    screen all coins on precomputed technical metrics, e.g.
+    /api/screen?period=DAY&filter=rsi < 30 and adx > 25&sort=pct_score&limit=10
+    """
+    if not screen_query:
+        return {"error": "Screening not available"}
+
+    try:
+        query, params = screen_query(period, parse_filters(filter), sort, ascending, limit, date)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    try:
+        with DatabaseManager.get_engine().connect() as conn:
+            rows = conn.execute(text(query), params).mappings().all()
+    except Exception as e:
+        print(f"Screening query failed: {e}")
+        return {"error": "Failed to run screen"}
+
+    return {"period": period.upper(), "count": len(rows), "results": [dict(row) for row in rows]}
+
 async def run_sentiment_pipeline(callback_url: str):
     print('Starting sentiment analysis pipeline...')
     pipeline_success = False
     try:
-        run_pipeline()
+        # off the event loop, so the API keeps answering while the pipeline and its workers run
+        await asyncio.to_thread(run_pipeline)
         pipeline_success = True
         print('Sentiment analysis pipeline completed.')
     except Exception as e:
@@ -0,0 +1,136 @@
+"""
+Persistent similarity index of stored headlines, for dedup across runs.
+
+Every stored headline is kept in postgres as its sparse term-count vector
+(hashed feature ids and counts, so the feature space never changes between
+runs) with the time it was indexed. Before inference, new titles are
+compared with the headlines of the last window_days: idf is fitted over the
+window plus the new titles, rows are l2-normalized like the in-batch
+SimilarityFilter and pairs above the threshold are found with the same
+sparse prefix-filtered search. Entries older than the window are evicted
+on every run.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import scipy.sparse as sp
+from psycopg2 import extras
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+from near_duplicates import similar_pairs, title_hash
+
+
+INDEX_TABLE = "headline_index"
+N_FEATURES = 2 ** 20
+
+_vectorizer = HashingVectorizer(stop_words='english', n_features=N_FEATURES, alternate_sign=False, norm=None)
+
+
+def term_counts(titles: list[str]) -> sp.csr_matrix:
+    return _vectorizer.transform(titles).tocsr()
+
+
+class HeadlineIndex:
+    def __init__(self, engine, window_days: int):
+        self.engine = engine
+        self.window_days = window_days
+
+    def _connect(self):
+        raw_conn = self.engine.raw_connection()
+        cursor = raw_conn.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {INDEX_TABLE} (
+                title_hash CHAR(40) PRIMARY KEY,
+                features INTEGER[] NOT NULL,
+                counts REAL[] NOT NULL,
+                indexed_at TIMESTAMP NOT NULL DEFAULT NOW()
+            )
+        """)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {INDEX_TABLE}_indexed_at_idx ON {INDEX_TABLE} (indexed_at)")
+        return raw_conn, cursor
+
+    def _cutoff(self) -> datetime:
+        return datetime.now() - timedelta(days=self.window_days)
+
+    def load(self) -> sp.csr_matrix:
+        """term counts of the headlines inside the window, after evicting older ones."""
+        raw_conn, cursor = self._connect()
+        try:
+            cursor.execute(f"DELETE FROM {INDEX_TABLE} WHERE indexed_at < %s", (self._cutoff(),))
+            evicted = cursor.rowcount
+            cursor.execute(f"SELECT features, counts FROM {INDEX_TABLE}")
+            rows = cursor.fetchall()
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
+
+        if evicted:
+            print(f"Evicted {evicted} headlines older than {self.window_days} days from the index.")
+        lengths = np.array([len(features) for features, _ in rows], dtype=np.int64)
+        indptr = np.r_[0, np.cumsum(lengths)]
+        indices = np.concatenate([f for f, _ in rows]).astype(np.int32) if rows else np.empty(0, dtype=np.int32)
+        data = np.concatenate([c for _, c in rows]).astype(np.float64) if rows else np.empty(0)
+        return sp.csr_matrix((data, indices, indptr), shape=(len(rows), N_FEATURES))
+
+    def duplicates(self, titles: list[str], threshold: float) -> np.ndarray:
+        """mask of titles with a headline in the window above the threshold."""
+        stored = self.load()
+        if stored.shape[0] == 0 or not titles:
+            return np.zeros(len(titles), dtype=bool)
+
+        counts = term_counts(titles)
+        tfidf = TfidfTransformer().fit(sp.vstack([stored, counts]))
+        i, _, _ = similar_pairs(tfidf.transform(counts), threshold, Y=tfidf.transform(stored))
+        mask = np.zeros(len(titles), dtype=bool)
+        mask[i] = True
+        return mask
+
+    def add(self, titles: list[str], indexed_at: list | None = None):
+        """index headlines (usually right after they are stored), refreshing their time if present."""
+        if not titles:
+            return
+        counts = term_counts(titles)
+        now = datetime.now()
+        rows = []
+        for k, title in enumerate(titles):
+            start, stop = counts.indptr[k], counts.indptr[k + 1]
+            rows.append((
+                title_hash(title),
+                counts.indices[start:stop].tolist(),
+                counts.data[start:stop].tolist(),
+                indexed_at[k] if indexed_at is not None else now,
+            ))
+
+        raw_conn, cursor = self._connect()
+        try:
+            extras.execute_values(
+                cursor,
+                f"""INSERT INTO {INDEX_TABLE} (title_hash, features, counts, indexed_at) VALUES %s
+                ON CONFLICT (title_hash) DO UPDATE SET indexed_at = EXCLUDED.indexed_at""",
+                rows,
+                page_size=500,
+            )
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
+
+    def backfill(self, source_table: str = "news_sentiment"):
+        """seed an empty index with the headlines stored inside the window."""
+        raw_conn, cursor = self._connect()
+        try:
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {INDEX_TABLE})")
+            has_entries = cursor.fetchone()[0]
+            cursor.execute("SELECT to_regclass(%s)", (source_table,))
+            has_source = cursor.fetchone()[0] is not None
+            rows = []
+            if not has_entries and has_source:
+                cursor.execute(f"SELECT title, date FROM {source_table} WHERE date >= %s", (self._cutoff(),))
+                rows = cursor.fetchall()
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
+
+        if rows:
+            self.add([title for title, _ in rows], [date for _, date in rows])
+            print(f"Indexed {len(rows)} stored headlines from the last {self.window_days} days.")
@@ -0,0 +1,107 @@
+"""
+Sentiment inference in a pool of worker processes.
+
+Workers are forked from a multiprocessing forkserver, never from the
+process that uses the pool: the service runs uvicorn's loop, the scheduler
+and the warm-up thread, and a child forked from a multithreaded process
+can deadlock on locks another thread held at the fork (logging, stdout,
+the allocator). The forkserver is a single-threaded process that imports
+the preload modules once and forks every worker from there, so a preload
+module that loads the model (see worker_model) lets the workers share the
+torch weights copy-on-write. Workers without a preloaded model, e.g. with
+ONNX Runtime, whose sessions own native thread pools that do not survive
+a fork, build their own with load. Each worker limits torch to
+threads_per_worker intra-op threads so the pool does not oversubscribe
+the cores. Batches go through the executor's task queue and are gathered
+by the caller.
+"""
+
+import multiprocessing
+import multiprocessing.forkserver
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+
+# the model in this process: preloaded in the forkserver and inherited, or loaded by the initializer
+_model = None
+
+
+def set_model(model):
+    """model for the workers forked after this call; used by forkserver preload modules."""
+    global _model
+    _model = model
+
+
+def start_forkserver(preload: list[str]):
+    """start the forkserver with the given preload modules, unless this process already has one."""
+    multiprocessing.set_forkserver_preload(list(preload))
+    # before python 3.13 the server ignores the sys.path it is sent, PYTHONPATH does reach it
+    previous = os.environ.get("PYTHONPATH")
+    os.environ["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+    try:
+        multiprocessing.forkserver.ensure_running()
+    finally:
+        if previous is None:
+            del os.environ["PYTHONPATH"]
+        else:
+            os.environ["PYTHONPATH"] = previous
+
+
+def run_batch(model, texts: list[str], max_tokens: int) -> list:
+    """
+    results for a batch, truncated by the tokenizer to max_tokens; if the
+    batch fails, title by title, with None for the titles that fail.
+    """
+    try:
+        return model(texts, batch_size=len(texts), truncation=True, max_length=max_tokens)
+    except Exception:
+        results = []
+        for text in texts:
+            try:
+                results.append(model([text], truncation=True, max_length=max_tokens)[0])
+            except Exception:
+                results.append(None)
+        return results
+
+
+def _init_worker(load, threads: int):
+    global _model
+    if _model is None and load is not None:
+        _model = load()
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _run_batch(texts: list[str], max_tokens: int) -> list:
+    return run_batch(_model, texts, max_tokens)
+
+
+class InferencePool:
+    def __init__(self, workers: int, load=None, preload: list[str] = (), threads_per_worker: int | None = None):
+        """
+        load builds the model in a worker that did not inherit one and must
+        be picklable (a module level function or a partial of one). preload
+        names the modules the forkserver imports before forking workers; it
+        only takes effect if this process has not started a forkserver yet,
+        so create the pool early, before other threads start.
+        """
+        self.workers = workers
+        threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        # started now, the server preloads the model while the caller goes on
+        start_forkserver(preload)
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_worker,
+            initargs=(load, threads),
+        )
+
+    def submit(self, texts: list[str], max_tokens: int):
+        return self.executor.submit(_run_batch, texts, max_tokens)
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,121 @@
+"""
+Near-duplicate headlines without the dense n x n similarity matrix.
+
+Titles are TF-IDF vectors with unit norm, so their cosine similarity is a
+dot product. Pairs above the threshold are found exactly with prefix
+filtering (All-Pairs): features are ordered from most to least frequent and
+each vector is split into a prefix of frequent features whose norm stays
+below the threshold and a suffix holding the rest. Two vectors that share
+no suffix feature cannot reach the threshold (their dot product is bounded
+by the prefix norm), so candidates come from a sparse product of the
+suffixes only, where common words rarely appear. Candidates are then
+verified with their exact cosine. Work and memory grow with the number of
+candidate pairs instead of n^2, and rows are processed in blocks.
+"""
+
+import hashlib
+import unicodedata
+
+import numpy as np
+import scipy.sparse as sp
+
+
+BLOCK_ROWS = 4096
+# keep prefixes strictly below the threshold despite rounding in the norms
+PREFIX_MARGIN = 1e-9
+
+
+def normalize_title(title) -> str:
+    """case, unicode form and whitespace folded, so re-scraped copies of a headline compare equal."""
+    return " ".join(unicodedata.normalize("NFKC", str(title)).lower().split())
+
+
+def title_hash(title) -> str:
+    return hashlib.sha1(normalize_title(title).encode("utf-8")).hexdigest()
+
+
+def suffix_matrix(X: sp.csr_matrix, threshold: float) -> sp.csr_matrix:
+    """0/1 matrix of the suffix features of every row (rows of X must have unit norm)."""
+    n, m = X.shape
+    df = np.bincount(X.indices, minlength=m)
+    rank = np.empty(m, dtype=np.int64)
+    rank[np.argsort(-df, kind="stable")] = np.arange(m)
+
+    rows = np.repeat(np.arange(n), np.diff(X.indptr))
+    order = np.lexsort((rank[X.indices], rows))
+    rows, cols, values = rows[order], X.indices[order], X.data[order]
+
+    # squared norm of each row's entries up to and including this one
+    cumulative = np.cumsum(values.astype(np.float64) ** 2)
+    row_start = np.r_[0.0, cumulative][X.indptr[:-1]]
+    cumulative -= np.repeat(row_start, np.diff(X.indptr))
+
+    limit = max(threshold - PREFIX_MARGIN, 0.0) ** 2
+    suffix = cumulative > limit
+    return sp.csr_matrix(
+        (np.ones(suffix.sum(), dtype=np.int32), (rows[suffix], cols[suffix])), shape=(n, m)
+    )
+
+
+def similar_pairs(
+    X: sp.csr_matrix,
+    threshold: float,
+    Y: sp.csr_matrix | None = None,
+    block_rows: int = BLOCK_ROWS,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (i, j, cosine) of all pairs with cosine > threshold. without Y, pairs
+    within X with i < j; with Y, pairs of X row i and Y row j. rows must
+    have unit norm and share one feature space.
+    """
+    X = sp.csr_matrix(X)
+    within = Y is None
+    Y = X if within else sp.csr_matrix(Y)
+
+    if within:
+        X_suffix = Y_suffix = suffix_matrix(X, threshold)
+    else:
+        # one global feature order so the prefix bound holds across both sets
+        stacked = suffix_matrix(sp.vstack([X, Y]).tocsr(), threshold)
+        X_suffix, Y_suffix = stacked[:X.shape[0]], stacked[X.shape[0]:]
+    Y_suffix_t = Y_suffix.T.tocsr()
+
+    found_i, found_j, found_sim = [], [], []
+    for start in range(0, X.shape[0], block_rows):
+        stop = min(start + block_rows, X.shape[0])
+        candidates = (X_suffix[start:stop] @ Y_suffix_t).tocoo()
+        i = candidates.row.astype(np.int64) + start
+        j = candidates.col.astype(np.int64)
+        if within:
+            keep = j > i
+            i, j = i[keep], j[keep]
+        if len(i) == 0:
+            continue
+
+        sim = np.asarray(X[i].multiply(Y[j]).sum(axis=1)).ravel()
+        hit = sim > threshold
+        found_i.append(i[hit])
+        found_j.append(j[hit])
+        found_sim.append(sim[hit])
+
+    if not found_i:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0)
+    return np.concatenate(found_i), np.concatenate(found_j), np.concatenate(found_sim)
+
+
+def duplicate_mask(n: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """
+    rows to drop, with the old filter's greedy rule: walking rows in order,
+    a row that is still kept drops every later row similar to it.
+    """
+    drop = np.zeros(n, dtype=bool)
+    if len(i) == 0:
+        return drop
+    order = np.argsort(i, kind="stable")
+    i, j = i[order], j[order]
+    starts = np.flatnonzero(np.r_[True, i[1:] != i[:-1]])
+    for start, stop in zip(starts, np.r_[starts[1:], len(i)]):
+        if not drop[i[start]]:
+            drop[j[start:stop]] = True
+    return drop
@@ -0,0 +1,111 @@
+"""
+ONNX Runtime backend for the sentiment model.
+
+The Hugging Face model is exported to ONNX once, quantized to int8 with
+dynamic quantization (int8 weights, activations quantized on the fly,
+which suits the CPU-only instances) and cached under ONNX_DIR. Later runs
+only load the cached file. OnnxSentimentPipeline is called like the
+transformers text-classification pipeline with top_k=None, so the rest of
+the pipeline does not depend on the backend.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoConfig, AutoTokenizer
+
+
+ONNX_DIR = Path(os.getenv("SENTIMENT_ONNX_DIR", Path(__file__).parent / ".onnx"))
+QUANTIZED_FILE = "model-int8.onnx"
+MAX_TOKENS = 512
+OPSET = 14
+
+
+def model_dir(model_name: str, directory: Path = ONNX_DIR) -> Path:
+    return directory / model_name.replace("/", "--")
+
+
+def export_quantized(model_name: str, directory: Path = ONNX_DIR) -> Path:
+    """export and int8-quantize the model unless the cached export exists; returns its folder."""
+    target = model_dir(model_name, directory)
+    if (target / QUANTIZED_FILE).exists():
+        return target
+
+    # only needed for the one-off export
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification
+
+    print(f"Exporting {model_name} to ONNX (int8)...")
+    target.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["Bitcoin rallies after the ETF approval"], return_tensors="pt")
+    input_names = list(sample.keys())
+    fp32_path = target / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in input_names}, "logits": {0: "batch"}},
+            opset_version=OPSET,
+            dynamo=False,
+        )
+
+    # written under a temporary name so an interrupted run never leaves a partial model behind
+    partial = target / f"{QUANTIZED_FILE}.partial"
+    quantize_dynamic(str(fp32_path), str(partial), weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(target)
+    model.config.save_pretrained(target)
+    partial.rename(target / QUANTIZED_FILE)
+    fp32_path.unlink()
+    return target
+
+
+class OnnxSentimentPipeline:
+    """drop-in for pipeline("sentiment-analysis", top_k=None) on an ONNX Runtime session."""
+
+    def __init__(self, directory: Path):
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        config = AutoConfig.from_pretrained(directory)
+        self.labels = [config.id2label[i] for i in range(config.num_labels)]
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(directory / QUANTIZED_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def __call__(self, texts, batch_size: int | None = None, max_length: int = MAX_TOKENS, **kwargs) -> list[list[dict]]:
+        # like the transformers pipeline, a single string gives a one-item list
+        if isinstance(texts, str):
+            texts = [texts]
+        batch_size = batch_size or len(texts)
+        max_length = min(max_length, MAX_TOKENS)
+
+        results = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True, truncation=True, max_length=max_length, return_tensors="np",
+            )
+            feeds = {name: values.astype(np.int64) for name, values in encoded.items() if name in self.input_names}
+            logits = self.session.run(["logits"], feeds)[0]
+
+            exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs = exp / exp.sum(axis=1, keepdims=True)
+            results.extend(
+                [{"label": label, "score": float(p)} for label, p in zip(self.labels, row)] for row in probs
+            )
+        return results
+
+
+def load_onnx_pipeline(model_name: str) -> OnnxSentimentPipeline:
+    return OnnxSentimentPipeline(export_quantized(model_name))
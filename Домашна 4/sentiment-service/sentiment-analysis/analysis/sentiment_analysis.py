@@ -1,10 +1,14 @@
 import os
 import sys
 import ast
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 from typing import List
 from pathlib import Path
-from difflib import get_close_matches
 
 import pandas as pd
 import numpy as np
@@ -12,12 +16,15 @@ from tqdm import tqdm
 from dotenv import load_dotenv
 from transformers import pipeline
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import psycopg2
 from psycopg2 import extras
 from sqlalchemy import text
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from database.database import DatabaseManager
+from headline_index import HeadlineIndex
+from inference_pool import InferencePool, run_batch
+from near_duplicates import duplicate_mask, similar_pairs, title_hash
+from symbol_resolver import SymbolResolver
 
 sys.path.append(str(Path(__file__).parent.parent / "scrapers"))
 try:
@@ -39,36 +46,180 @@ class Config:
     SYMBOL_MATCH_CUTOFF = 0.6
     
     MODEL_NAME = "ProsusAI/finbert"
+    # "torch" = transformers pipeline, "onnx" = int8-quantized export on ONNX Runtime
+    MODEL_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+    # titles per forward pass; titles are sorted by length so batches need little padding
+    BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+    # model input limit in tokens, special tokens included; the tokenizer truncates longer titles
+    MAX_TOKENS = 512
+    # score an article body column (when ingestion provides one) in overlapping token windows
+    SCORE_BODY = os.getenv("SENTIMENT_SCORE_BODY", "0") == "1"
+    BODY_COLUMN = "body"
+    WINDOW_STRIDE = int(os.getenv("SENTIMENT_WINDOW_STRIDE", "64"))
+    MAX_WINDOWS = int(os.getenv("SENTIMENT_MAX_WINDOWS", "16"))
+    # reuse stored scores for titles seen before (keyed by normalized title and model)
+    SCORE_CACHE = os.getenv("SENTIMENT_SCORE_CACHE", "1") == "1"
+    SCORE_CACHE_TABLE = "sentiment_score_cache"
+    # drop paraphrases of headlines stored in the last DEDUP_WINDOW_DAYS
+    CROSS_RUN_DEDUP = os.getenv("SENTIMENT_CROSS_RUN_DEDUP", "1") == "1"
+    DEDUP_WINDOW_DAYS = int(os.getenv("SENTIMENT_DEDUP_WINDOW_DAYS", "14"))
+    # run filters as early as their requirements allow instead of in declared order
+    REORDER_STEPS = os.getenv("SENTIMENT_REORDER_STEPS", "1") == "1"
+    # load the model and run a few dummy batches when the service starts
+    PRELOAD_MODEL = os.getenv("SENTIMENT_PRELOAD", "1") == "1"
+    WARMUP_BATCHES = int(os.getenv("SENTIMENT_WARMUP_BATCHES", "3"))
+    # inference worker processes forked after the model loads; 0 or 1 runs inference in-process
+    INFERENCE_WORKERS = int(os.getenv("SENTIMENT_WORKERS", "0"))
 
 # Strategy interface
 class PipelineStep(ABC):
+    # relative cost per row, used to order filters that are ready at the same time
+    cost: float = 1.0
+    # facts about the frame the step needs ("articles", "sentiment_score", ...) and adds
+    requires: frozenset = frozenset({"articles"})
+    provides: frozenset = frozenset()
+    # filters only drop rows and may run earlier than declared once their requirements hold,
+    # so a filter must commute with every step it can overtake; a step it must follow
+    # (because it looks at the rows or values that step drops or adds) is listed in requires
+    is_filter: bool = False
+
     @abstractmethod
     def process(self, df: pd.DataFrame) -> pd.DataFrame:
         pass
 
 
+def load_pipeline(backend: str = "torch"):
+    """
+    sentiment pipeline for the given backend and the backend it actually
+    uses: torch if onnx is unavailable.
+    """
+    if backend == "onnx":
+        try:
+            from onnx_backend import load_onnx_pipeline
+            return load_onnx_pipeline(Config.MODEL_NAME), "onnx"
+        except ImportError as e:
+            print(f"ONNX backend unavailable ({e}), using torch.")
+
+    return pipeline(
+        "sentiment-analysis", 
+        model=Config.MODEL_NAME, 
+        top_k=None,
+        device=-1 
+    ), "torch"
+
+
+def load_model(backend: str):
+    """the pipeline alone, for pool workers that build their own."""
+    return load_pipeline(backend)[0]
+
+
 class SentimentModelSingleton:
    
     _instance = None
     _pipeline = None
+    _backend = None
+    # opened by open_pool(), never by the lazy construction below
+    _pool = None
+    # the startup warm-up and the first pipeline run may construct it concurrently
+    _lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(SentimentModelSingleton, cls).__new__(cls)
-            cls._pipeline = pipeline(
-                "sentiment-analysis", 
-                model=Config.MODEL_NAME, 
-                top_k=None,
-                device=-1 
-            )
+        with cls._lock:
+            if cls._instance is None:
+                cls._pipeline, cls._backend = load_pipeline(Config.MODEL_BACKEND)
+                cls._instance = super(SentimentModelSingleton, cls).__new__(cls)
         return cls._instance
 
     def get_pipeline(self):
         return self._pipeline
 
+    def get_pool(self):
+        return self._pool
+
+    @classmethod
+    def backend(cls) -> str:
+        """backend of the loaded model; the configured one until the model is loaded."""
+        return cls._backend or Config.MODEL_BACKEND
+
+    @classmethod
+    def open_pool(cls):
+        """start the inference workers; call it before the process starts other threads."""
+        with cls._lock:
+            if cls._pool is None:
+                cls._pool = start_pool()
+
+    @classmethod
+    def close_pool(cls):
+        with cls._lock:
+            if cls._pool is not None:
+                cls._pool.close()
+                cls._pool = None
+
+
+def start_pool():
+    """
+    worker pool whose forkserver preloads the model (worker_model); workers
+    it could not preload for build their own. None if disabled.
+    """
+    if Config.INFERENCE_WORKERS <= 1:
+        return None
+    try:
+        pool = InferencePool(
+            Config.INFERENCE_WORKERS,
+            load=partial(load_model, Config.MODEL_BACKEND),
+            preload=["worker_model"],
+        )
+        print(f"Started {Config.INFERENCE_WORKERS} inference workers ({Config.MODEL_BACKEND}).")
+        return pool
+    except Exception as e:
+        print(f"Inference workers failed to start, running in-process: {e}")
+        return None
+
+
+WARMUP_TITLES = [
+    "Bitcoin climbs above resistance as ETF inflows accelerate",
+    "Ethereum developers delay the next network upgrade",
+    "Regulators open an investigation into a major crypto exchange after weeks of withdrawals and outages",
+    "Solana rallies",
+    "Stablecoin issuer publishes reserve attestation showing short-term treasuries and cash holdings",
+]
+
+
+def warm_up(batches: int = Config.WARMUP_BATCHES) -> dict:
+    """
+    load the model and run a few dummy batches of varied lengths, so the
+    first real run does not pay for loading and first-inference setup.
+    returns the backend and timings.
+    """
+    start = time.perf_counter()
+    model = SentimentModelSingleton().get_pipeline()
+    load_seconds = time.perf_counter() - start
+
+    # every worker of the pool runs its own batches
+    pool = SentimentModelSingleton().get_pool()
+    start = time.perf_counter()
+    batches = [
+        [WARMUP_TITLES[(k + i) % len(WARMUP_TITLES)] for i in range(Config.BATCH_SIZE)]
+        for k in range(batches * (pool.workers if pool else 1))
+    ]
+    if pool:
+        for future in [pool.submit(batch, Config.MAX_TOKENS) for batch in batches]:
+            future.result()
+    else:
+        for batch in batches:
+            model(batch, batch_size=len(batch), truncation=True, max_length=Config.MAX_TOKENS)
+    return {
+        "backend": SentimentModelSingleton.backend(),
+        "load_seconds": round(load_seconds, 2),
+        "warmup_seconds": round(time.perf_counter() - start, 2),
+    }
+
 
 
 class DataIngestion(PipelineStep):
+    requires = frozenset()
+    provides = frozenset({"articles"})
+
     def __init__(self, light_mode: bool = False):
         self.light_mode = light_mode
 
@@ -95,28 +246,322 @@ class DataIngestion(PipelineStep):
         print(f"Successfully loaded {len(df)} rows.")
         return df
 
-class SentimentAnalysis(PipelineStep):
+class StoredTitleFilter(PipelineStep):
+    """drop articles whose title is already in news_sentiment before paying for inference."""
+    cost = 1.0
+    is_filter = True
+
     def process(self, df: pd.DataFrame) -> pd.DataFrame:
         if df.empty: return df
-        print("Running Sentiment Analysis...")
-        
-        model = SentimentModelSingleton().get_pipeline()
-        
-        def get_sentiment(text):
+        print("Skipping Stored Titles...")
+        initial_count = len(df)
+        df = df.drop_duplicates(subset='title')
+
+        try:
+            raw_conn = DatabaseManager.get_engine().raw_connection()
             try:
-                result = model(str(text)[:512])[0]
-                scores = {item['label']: item['score'] for item in result}
-                pos = scores.get('positive', 0)
-                neg = scores.get('negative', 0)
-                return pd.Series([max(scores, key=scores.get), pos - neg])
-            except Exception:
-                return pd.Series(["error", 0.0])
-
-        tqdm.pandas(desc="Analyzing")
-        df[['sentiment_label', 'sentiment_score']] = df['title'].progress_apply(get_sentiment)
+                cursor = raw_conn.cursor()
+                cursor.execute("SELECT to_regclass('news_sentiment')")
+                if cursor.fetchone()[0] is None:
+                    return df
+                # one indexed lookup on the unique title column for the whole batch
+                cursor.execute(
+                    "SELECT title FROM news_sentiment WHERE title = ANY(%s)",
+                    (df['title'].tolist(),),
+                )
+                stored = {row[0] for row in cursor.fetchall()}
+            finally:
+                raw_conn.close()
+        except Exception as e:
+            print(f"Stored title lookup failed: {e}")
+            return df
+
+        df_new = df[~df['title'].isin(stored)]
+        print(f"Dropped {initial_count - len(df_new)} stored or repeated articles.")
+        return df_new
+
+
+class IndexedDuplicateFilter(PipelineStep):
+    """drop paraphrases of headlines stored by earlier runs, using the persistent headline index."""
+    cost = 5.0
+    is_filter = True
+
+    def process(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df.empty: return df
+        print("Filtering Paraphrases of Stored Headlines...")
+
+        try:
+            index = HeadlineIndex(DatabaseManager.get_engine(), Config.DEDUP_WINDOW_DAYS)
+            index.backfill()
+            duplicates = index.duplicates(df['title'].tolist(), Config.SIMILARITY_THRESHOLD)
+        except Exception as e:
+            print(f"Headline index lookup failed: {e}")
+            return df
+
+        print(f"Dropped {int(duplicates.sum())} rows.")
+        return df[~duplicates]
+
+
+def model_key(backend: str) -> str:
+    return f"{Config.MODEL_NAME}:{backend}"
+
+
+class ScoreCache:
+    """sentiment results per (normalized title hash, model) in postgres."""
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def _connect(self):
+        raw_conn = DatabaseManager.get_engine().raw_connection()
+        cursor = raw_conn.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {Config.SCORE_CACHE_TABLE} (
+                title_hash CHAR(40) NOT NULL,
+                model VARCHAR(100) NOT NULL,
+                sentiment_label VARCHAR(20),
+                sentiment_score FLOAT,
+                created_at TIMESTAMP DEFAULT NOW(),
+                PRIMARY KEY (title_hash, model)
+            )
+        """)
+        return raw_conn, cursor
+
+    def load(self, hashes: list[str]) -> dict[str, tuple[str, float]]:
+        raw_conn, cursor = self._connect()
+        try:
+            cursor.execute(
+                f"SELECT title_hash, sentiment_label, sentiment_score FROM {Config.SCORE_CACHE_TABLE} "
+                "WHERE model = %s AND title_hash = ANY(%s)",
+                (self.model, list(hashes)),
+            )
+            cached = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+            raw_conn.commit()
+            return cached
+        finally:
+            raw_conn.close()
+
+    def save(self, hashes: list[str], labels, scores):
+        rows = [
+            (h, self.model, label, float(score))
+            for h, label, score in zip(hashes, labels, scores)
+            if label != "error"
+        ]
+        if not rows:
+            return
+        raw_conn, cursor = self._connect()
+        try:
+            extras.execute_values(
+                cursor,
+                f"INSERT INTO {Config.SCORE_CACHE_TABLE} (title_hash, model, sentiment_label, sentiment_score) "
+                "VALUES %s ON CONFLICT (title_hash, model) DO NOTHING",
+                rows,
+                page_size=500,
+            )
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
+
+
+def sentiment_from_result(result) -> tuple[str, float]:
+    """label with the highest probability and positive - negative probability."""
+    scores = {item['label']: item['score'] for item in result}
+    return max(scores, key=scores.get), scores.get('positive', 0) - scores.get('negative', 0)
+
+
+def token_windows(tokenizer, texts, max_tokens: int, stride: int, max_windows: int):
+    """
+    split texts into windows that fit the model, consecutive windows sharing
+    stride tokens and the last one ending at the end of the text; above
+    max_windows, evenly spaced ones are kept. returns the window texts, the
+    index of each window's text and its token count. texts that already fit
+    stay one window, unchanged.
+    """
+    span = max_tokens - tokenizer.num_special_tokens_to_add()
+    step = max(1, span - stride)
+    token_ids = tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+
+    windows, owners, weights = [], [], []
+    for k, (text, ids) in enumerate(zip(texts, token_ids)):
+        if len(ids) <= span:
+            windows.append(text)
+            owners.append(k)
+            weights.append(max(len(ids), 1))
+            continue
+        starts = list(range(0, len(ids) - span, step)) + [len(ids) - span]
+        if len(starts) > max_windows:
+            # spread the allowed windows over the whole text
+            starts = [starts[i] for i in np.unique(np.linspace(0, len(starts) - 1, max_windows).round().astype(int))]
+        for start in starts:
+            windows.append(tokenizer.decode(ids[start:start + span]))
+            owners.append(k)
+            weights.append(span)
+    return windows, owners, weights
+
+
+def pool_windows(results, owners, weights, n: int) -> list:
+    """per text, the class probabilities of its windows averaged by token count; None if every window failed."""
+    totals = [{} for _ in range(n)]
+    mass = np.zeros(n)
+    for result, owner, weight in zip(results, owners, weights):
+        if result is None:
+            continue
+        for item in result:
+            totals[owner][item['label']] = totals[owner].get(item['label'], 0.0) + weight * item['score']
+        mass[owner] += weight
+    return [
+        [{'label': label, 'score': total / mass[k]} for label, total in totals[k].items()] if mass[k] else None
+        for k in range(n)
+    ]
+
+
+class SentimentAnalysis(PipelineStep):
+    cost = 100.0
+    provides = frozenset({"sentiment_score"})
+
+    def __init__(
+        self,
+        batch_size: int = Config.BATCH_SIZE,
+        use_cache: bool = Config.SCORE_CACHE,
+        body_mode: bool = Config.SCORE_BODY,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.use_cache = use_cache
+        self.body_mode = body_mode
+
+    def cache_key(self) -> str:
+        key = model_key(SentimentModelSingleton.backend())
+        # pooled window scores differ from truncated ones for long texts
+        if self.body_mode:
+            return f"{key}:windows-{Config.WINDOW_STRIDE}-{Config.MAX_WINDOWS}"
+        return key
+
+    def predict_results(self, texts) -> list:
+        """
+        raw model results for a sequence of texts, in input order (None where
+        scoring failed). texts run through the model sorted by length,
+        batch_size at a time, on the worker pool when there is one; a failing
+        batch is retried text by text so one bad input only marks itself.
+        """
+        singleton = SentimentModelSingleton()
+        model, pool = singleton.get_pipeline(), singleton.get_pool()
+        texts = [str(t) for t in texts]
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        batches = [order[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+
+        all_results = [None] * len(texts)
+
+        def collect(batch, results):
+            for i, result in zip(batch, results):
+                all_results[i] = result
+
+        progress = tqdm(total=len(batches), desc="Analyzing", unit="batch")
+        remaining = batches
+        if pool is not None:
+            done = set()
+            try:
+                futures = {
+                    pool.submit([texts[i] for i in batch], Config.MAX_TOKENS): k for k, batch in enumerate(batches)
+                }
+                for future in as_completed(futures):
+                    collect(batches[futures[future]], future.result())
+                    done.add(futures[future])
+                    progress.update()
+            except BrokenProcessPool as e:
+                # a worker died (e.g. out of memory): finish in-process from here on
+                print(f"Inference pool broken, continuing in-process: {e}")
+                SentimentModelSingleton.close_pool()
+            remaining = [batch for k, batch in enumerate(batches) if k not in done]
+
+        for batch in remaining:
+            collect(batch, run_batch(model, [texts[i] for i in batch], Config.MAX_TOKENS))
+            progress.update()
+        progress.close()
+
+        return all_results
+
+    def predict_windows(self, texts) -> list:
+        """
+        results for texts of any length: every text is split into token
+        windows, the windows of all texts are scored together in the usual
+        batches and their probabilities are pooled back per text.
+        """
+        tokenizer = SentimentModelSingleton().get_pipeline().tokenizer
+        texts = [str(t) for t in texts]
+        windows, owners, weights = token_windows(
+            tokenizer, texts, Config.MAX_TOKENS, Config.WINDOW_STRIDE, Config.MAX_WINDOWS
+        )
+        if len(windows) > len(texts):
+            print(f"{len(texts)} texts split into {len(windows)} windows.")
+        return pool_windows(self.predict_results(windows), owners, weights, len(texts))
+
+    def predict(self, texts) -> tuple[np.ndarray, np.ndarray]:
+        """labels and scores in input order; failed texts get the "error" label and a score of 0."""
+        results = self.predict_windows(texts) if self.body_mode else self.predict_results(texts)
+        labels = np.full(len(results), "error", dtype=object)
+        scores = np.zeros(len(results), dtype=np.float64)
+        for i, result in enumerate(results):
+            if result is not None:
+                labels[i], scores[i] = sentiment_from_result(result)
+        return labels, scores
+
+    def predict_cached(self, titles) -> tuple[np.ndarray, np.ndarray]:
+        """predict with the score cache: each normalized title goes through the model at most once."""
+        hashes = [title_hash(t) for t in titles]
+        labels = np.full(len(titles), "error", dtype=object)
+        scores = np.zeros(len(titles), dtype=np.float64)
+
+        try:
+            cached = ScoreCache(self.cache_key()).load(set(hashes))
+        except Exception as e:
+            print(f"Score cache lookup failed: {e}")
+            return self.predict(titles)
+
+        # first title of every uncached hash
+        first = {}
+        for i, h in enumerate(hashes):
+            if h not in cached:
+                first.setdefault(h, i)
+        print(f"Score cache: {len(titles) - len(first)} of {len(titles)} titles reused, {len(first)} to score")
+
+        if first:
+            new_labels, new_scores = self.predict([titles[i] for i in first.values()])
+            cached.update(zip(first, zip(new_labels, new_scores)))
+            try:
+                # keyed after predicting: loading the model may have fallen back to another backend
+                ScoreCache(self.cache_key()).save(list(first), new_labels, new_scores)
+            except Exception as e:
+                print(f"Score cache update failed: {e}")
+
+        for i, h in enumerate(hashes):
+            labels[i], scores[i] = cached[h]
+        return labels, scores
+
+    def process(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df.empty: return df
+        print(f"Running Sentiment Analysis (batch size {self.batch_size})...")
+
+        texts = df['title']
+        if self.body_mode and Config.BODY_COLUMN in df:
+            # articles without a body are scored on their title
+            body = df[Config.BODY_COLUMN]
+            texts = body.where(body.notna() & (body.astype(str).str.strip() != ""), df['title'])
+        texts = texts.astype(str).tolist()
+
+        if self.use_cache:
+            labels, scores = self.predict_cached(texts)
+        else:
+            labels, scores = self.predict(texts)
+        df['sentiment_label'] = labels
+        df['sentiment_score'] = scores
         return df
 
 class ConfidenceFilter(PipelineStep):
+    cost = 0.1
+    requires = frozenset({"sentiment_score"})
+    provides = frozenset({"confident"})
+    is_filter = True
+
     def process(self, df: pd.DataFrame) -> pd.DataFrame:
         if df.empty: return df
         print("Filtering by Confidence...")
@@ -127,6 +572,12 @@ class ConfidenceFilter(PipelineStep):
         return df_filtered
 
 class SimilarityFilter(PipelineStep):
+    # a dropped low-confidence row must not suppress its near-duplicates, so this waits for ConfidenceFilter
+    cost = 5.0
+    requires = frozenset({"confident"})
+    provides = frozenset({"deduplicated"})
+    is_filter = True
+
     def process(self, df: pd.DataFrame) -> pd.DataFrame:
         if df.empty: return df
         print("Filtering Duplicates...")
@@ -134,36 +585,31 @@ class SimilarityFilter(PipelineStep):
         df = df.reset_index(drop=True)
         vectorizer = TfidfVectorizer(stop_words='english')
         tfidf_matrix = vectorizer.fit_transform(df['title'])
-        cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
-        
-        indices_to_drop = set()
-        for i in range(len(df)):
-            if i in indices_to_drop: continue
-            for j in range(i + 1, len(df)):
-                if j in indices_to_drop: continue
-                if cosine_sim[i, j] > Config.SIMILARITY_THRESHOLD:
-                    indices_to_drop.add(j)
-        
-        df_filtered = df.drop(list(indices_to_drop))
+
+        # sparse candidate search instead of the dense n x n similarity matrix
+        i, j, _ = similar_pairs(tfidf_matrix, Config.SIMILARITY_THRESHOLD)
+        df_filtered = df[~duplicate_mask(len(df), i, j)]
         
         return df_filtered
 
 class SymbolMapping(PipelineStep):
+    # drops articles whose symbols are not tracked, but also rewrites symbols and learns
+    # aliases from the article counts of the rows left, so it is not a filter and keeps its place
+    cost = 2.0
+    requires = frozenset({"deduplicated"})
+
     def process(self, df: pd.DataFrame) -> pd.DataFrame:
         if df.empty: return df
         print("Mapping Symbols...")
         
        
         try:
-            engine = DatabaseManager.get_engine()
-            with engine.connect() as conn:
-                result = conn.execute(text("SELECT DISTINCT symbol FROM ohlcv_data;"))
-                db_symbols = set([row[0] for row in result])
+            resolver = SymbolResolver(DatabaseManager.get_engine(), Config.SYMBOL_MATCH_CUTOFF)
         except Exception as e:
             print(f"DB Connection failed: {e}")
             return df 
 
-        if not db_symbols:
+        if not resolver.universe.symbols:
             return df
 
         # Helper to parse string lists
@@ -185,25 +631,19 @@ class SymbolMapping(PipelineStep):
         coin_counts = df_exploded[df_exploded['symbols_list'].astype(bool)]['symbols_list'].value_counts()
         
        
-        news_symbols = set(coin_counts.index)
-        not_matched = news_symbols - db_symbols
-        matched = news_symbols.intersection(db_symbols)
-        symbol_mapping = {}
-
-        for sym in not_matched:
-            if coin_counts[sym] < Config.MIN_ARTICLES_THRESHOLD:
-                symbol_mapping[sym] = None
-            else:
-                closest = get_close_matches(sym, db_symbols, n=1, cutoff=Config.SYMBOL_MATCH_CUTOFF)
-                symbol_mapping[sym] = closest[0] if closest else None
+        # learned aliases apply to any symbol, fuzzy matching only to frequent ones
+        symbol_mapping = {
+            sym: resolver.resolve(sym, fuzzy=coin_counts[sym] >= Config.MIN_ARTICLES_THRESHOLD)
+            for sym in coin_counts.index
+        }
+        try:
+            resolver.save_learned()
+        except Exception as e:
+            print(f"Saving symbol aliases failed: {e}")
 
         
         def map_row(symbols):
-            mapped = []
-            for s in symbols:
-                if s in matched: mapped.append(s)
-                elif s in symbol_mapping and symbol_mapping[s]: mapped.append(symbol_mapping[s])
-            return list(set(mapped))
+            return list({symbol_mapping[s] for s in symbols if symbol_mapping.get(s)})
 
         df['symbols_mapped'] = df['symbols_list'].apply(map_row)
         
@@ -214,6 +654,9 @@ class SymbolMapping(PipelineStep):
         return df_final.drop(columns=['symbols_list', 'symbols_mapped'])
 
 class DatabaseStorage(PipelineStep):
+    cost = 10.0
+    requires = frozenset({"articles", "sentiment_score"})
+
     def process(self, df: pd.DataFrame) -> pd.DataFrame:
         if df.empty: return df
         print("Storing to Database...")
@@ -277,6 +720,9 @@ class DatabaseStorage(PipelineStep):
                 print(f"Stored {len(data_to_insert)} articles.")
             finally:
                 raw_conn.close()
+
+            if Config.CROSS_RUN_DEDUP:
+                HeadlineIndex(engine, Config.DEDUP_WINDOW_DAYS).add(df['title'].tolist())
         except Exception as e:
             print(f"Storage failed: {e}")
             
@@ -291,13 +737,55 @@ class SentimentPipeline:
     def add_step(self, step: PipelineStep):
         self.steps.append(step)
 
+    def schedule(self) -> List[PipelineStep]:
+        """
+        execution order: after every step, the filters whose requirements
+        hold run first, cheapest first; otherwise the first remaining step in
+        declared order runs. requirements no step provides are ignored.
+        """
+        available = set().union(*(step.provides for step in self.steps))
+        provided = set()
+        remaining = list(self.steps)
+        order = []
+        while remaining:
+            ready = [step for step in remaining if (step.requires & available) <= provided]
+            filters = [step for step in ready if step.is_filter]
+            step = min(filters, key=lambda f: f.cost) if filters else remaining[0]
+            remaining.remove(step)
+            provided |= step.provides
+            order.append(step)
+        return order
+
     def run(self):
+        order = self.schedule() if Config.REORDER_STEPS else list(self.steps)
+        if order != self.steps:
+            print("Step order: " + " -> ".join(type(step).__name__ for step in order))
+
         data = None
-        for step in self.steps:
+        dropped = {}
+        executed = []
+        for step in order:
+            rows_in = 0 if data is None else len(data)
             data = step.process(data)
+            executed.append(step)
+            if step.is_filter:
+                dropped[id(step)] = rows_in - len(data)
             if data is not None and data.empty and not isinstance(step, DataIngestion):
                 print("Dataframe is empty.")
                 break
+
+        # rows that filters declared after a step removed before it ran
+        for step in executed:
+            if step.is_filter:
+                continue
+            position = self.steps.index(step)
+            saved = sum(
+                dropped.get(id(f), 0)
+                for f in executed[:executed.index(step)]
+                if f.is_filter and self.steps.index(f) > position
+            )
+            if saved:
+                print(f"Reordering kept {saved} rows out of {type(step).__name__}.")
         print("Pipeline execution finished.")
         return data
 
@@ -305,6 +793,9 @@ def run_pipeline(light_mode: bool = False):
     pipeline = SentimentPipeline()
     
     pipeline.add_step(DataIngestion(light_mode=light_mode))
+    pipeline.add_step(StoredTitleFilter())
+    if Config.CROSS_RUN_DEDUP:
+        pipeline.add_step(IndexedDuplicateFilter())
     pipeline.add_step(SentimentAnalysis())
     pipeline.add_step(ConfidenceFilter())
     pipeline.add_step(SimilarityFilter())
@@ -314,7 +805,11 @@ def run_pipeline(light_mode: bool = False):
     return pipeline.run()
 
 def main():
-    run_pipeline()
+    SentimentModelSingleton.open_pool()
+    try:
+        run_pipeline()
+    finally:
+        SentimentModelSingleton.close_pool()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,144 @@
+"""
+Resolves symbols found in news to the tracked symbol universe.
+
+The universe is read from coins_metadata (one row per tracked coin, unlike
+ohlcv_data which holds every daily candle) and kept in memory for
+UNIVERSE_TTL seconds, so repeated runs in the same process do not query it
+again. A symbol resolves, in order, to itself if tracked, to a learned
+alias from the symbol_aliases table, or to a fuzzy match. Fuzzy matching
+scores only the symbols that share a padded character bigram with the
+query and whose length allows the cutoff, using difflib's ratio like
+before; every fuzzy hit is stored as an alias so later runs resolve it
+with a dict lookup. Aliases whose target left the universe are ignored.
+"""
+
+import os
+import time
+from collections import defaultdict
+from difflib import get_close_matches
+
+from psycopg2 import extras
+
+
+ALIAS_TABLE = "symbol_aliases"
+UNIVERSE_TTL = int(os.getenv("SYMBOL_UNIVERSE_TTL", "3600"))
+
+
+def bigrams(symbol: str) -> set[str]:
+    padded = f"^{symbol}$"
+    return {padded[k:k + 2] for k in range(len(padded) - 1)}
+
+
+def load_universe(engine) -> set[str]:
+    raw_conn = engine.raw_connection()
+    try:
+        cursor = raw_conn.cursor()
+        cursor.execute("SELECT to_regclass('coins_metadata')")
+        if cursor.fetchone()[0] is None:
+            return set()
+        cursor.execute("SELECT symbol FROM coins_metadata")
+        return {row[0] for row in cursor.fetchall() if row[0]}
+    finally:
+        raw_conn.close()
+
+
+class SymbolUniverse:
+    """tracked symbols with a bigram index, shared by the process for UNIVERSE_TTL seconds."""
+
+    _cached = None
+    _loaded_at = 0.0
+
+    def __init__(self, symbols: set[str]):
+        self.symbols = frozenset(symbols)
+        self.index = defaultdict(set)
+        for symbol in self.symbols:
+            for gram in bigrams(symbol):
+                self.index[gram].add(symbol)
+
+    def candidates(self, symbol: str, cutoff: float) -> list[str]:
+        """symbols that can reach the cutoff: a shared bigram and 2 * min(len) / sum(len) >= cutoff."""
+        found = set()
+        for gram in bigrams(symbol):
+            found |= self.index.get(gram, set())
+        n = len(symbol)
+        return [c for c in found if 2 * min(n, len(c)) / (n + len(c)) >= cutoff]
+
+    @classmethod
+    def get(cls, engine) -> "SymbolUniverse":
+        if cls._cached is None or time.monotonic() - cls._loaded_at > UNIVERSE_TTL:
+            try:
+                cls._cached = cls(load_universe(engine))
+                cls._loaded_at = time.monotonic()
+            except Exception as e:
+                if cls._cached is None:
+                    raise
+                print(f"Symbol universe refresh failed, keeping the cached one: {e}")
+        return cls._cached
+
+    @classmethod
+    def invalidate(cls):
+        cls._cached = None
+
+
+class SymbolResolver:
+    def __init__(self, engine, cutoff: float):
+        self.engine = engine
+        self.cutoff = cutoff
+        self.universe = SymbolUniverse.get(engine)
+        self.aliases = self._load_aliases()
+        self.learned = {}
+
+    def _connect(self):
+        raw_conn = self.engine.raw_connection()
+        cursor = raw_conn.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {ALIAS_TABLE} (
+                alias TEXT PRIMARY KEY,
+                symbol TEXT NOT NULL,
+                source VARCHAR(10) NOT NULL DEFAULT 'manual',
+                updated_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        return raw_conn, cursor
+
+    def _load_aliases(self) -> dict[str, str]:
+        raw_conn, cursor = self._connect()
+        try:
+            cursor.execute(f"SELECT alias, symbol FROM {ALIAS_TABLE}")
+            rows = cursor.fetchall()
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
+        return {alias: symbol for alias, symbol in rows if symbol in self.universe.symbols}
+
+    def resolve(self, symbol: str, fuzzy: bool = True) -> str | None:
+        if symbol in self.universe.symbols:
+            return symbol
+        if symbol in self.aliases:
+            return self.aliases[symbol]
+        if not fuzzy:
+            return None
+
+        closest = get_close_matches(symbol, self.universe.candidates(symbol, self.cutoff), n=1, cutoff=self.cutoff)
+        if not closest:
+            return None
+        self.aliases[symbol] = self.learned[symbol] = closest[0]
+        return closest[0]
+
+    def save_learned(self):
+        """persist this run's fuzzy matches; manually entered aliases are never overwritten."""
+        if not self.learned:
+            return
+        raw_conn, cursor = self._connect()
+        try:
+            extras.execute_values(
+                cursor,
+                f"""INSERT INTO {ALIAS_TABLE} (alias, symbol, source) VALUES %s
+                ON CONFLICT (alias) DO UPDATE SET symbol = EXCLUDED.symbol, updated_at = NOW()
+                WHERE {ALIAS_TABLE}.source = 'fuzzy'""",
+                [(alias, symbol, "fuzzy") for alias, symbol in self.learned.items()],
+            )
+            raw_conn.commit()
+        finally:
+            raw_conn.close()
+        self.learned = {}
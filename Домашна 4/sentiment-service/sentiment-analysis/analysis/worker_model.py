@@ -0,0 +1,17 @@
+"""
+Preloaded by the inference forkserver (see inference_pool): loads the
+torch sentiment model once in the server, so the workers forked from it
+share the weights copy-on-write. ONNX Runtime sessions cannot be shared
+through fork, with that backend every worker loads its own.
+"""
+
+from inference_pool import set_model
+from sentiment_analysis import Config, load_pipeline
+
+
+if Config.MODEL_BACKEND != "onnx":
+    try:
+        set_model(load_pipeline(Config.MODEL_BACKEND)[0])
+    except Exception as e:
+        # the workers load the model themselves
+        print(f"Preloading the sentiment model failed: {e}")
@@ -0,0 +1,127 @@
+"""
+Accuracy drift, latency and memory of the torch and ONNX (int8) backends.
+
+Each backend runs in its own process so its resident memory is measured
+alone: RSS after loading the model and peak RSS after scoring. Both score
+the same titles with SentimentAnalysis.predict; per-batch latency (p50,
+p95) and titles/sec are reported. The ONNX scores are then compared with
+the torch ones: label agreement and the mean / max absolute difference of
+sentiment_score. With --max-drift the script exits 1 when the max score
+difference or the label disagreement exceeds it.
+
+Usage:
+    python benchmarks/backend_comparison.py --titles 512 --batch-size 32
+    python benchmarks/backend_comparison.py --csv news.csv --max-drift 0.05
+"""
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ANALYSIS_ROOT = Path(__file__).resolve().parents[1] / "analysis"
+if str(ANALYSIS_ROOT) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_ROOT))
+
+from batch_throughput import make_titles
+from sentiment_analysis import Config, SentimentAnalysis, SentimentModelSingleton
+
+
+def rss_mb() -> float:
+    """current resident set size; falls back to the peak where /proc is missing."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_backend(backend: str, titles: list[str], batch_size: int) -> dict:
+    """load and run one backend; executed in a fresh process."""
+    Config.MODEL_BACKEND = backend
+    start_rss = rss_mb()
+    start = time.perf_counter()
+    model = SentimentModelSingleton().get_pipeline()
+    load_s = time.perf_counter() - start
+    loaded_rss = rss_mb()
+    model(titles[:2])
+
+    # per-batch latency on the same length-sorted batches predict uses
+    order = np.argsort([len(t) for t in titles], kind="stable")
+    latencies = []
+    for i in range(0, len(titles), batch_size):
+        batch = [titles[j] for j in order[i:i + batch_size]]
+        start = time.perf_counter()
+        model(batch, batch_size=len(batch))
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    labels, scores = SentimentAnalysis(batch_size).predict(titles)
+    total_s = time.perf_counter() - start
+
+    return {
+        "load_s": load_s,
+        "model_mb": loaded_rss - start_rss,
+        "peak_mb": peak_rss_mb(),
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p95_ms": np.percentile(latencies, 95) * 1000,
+        "titles_per_s": len(titles) / total_s,
+        "labels": labels,
+        "scores": scores,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=512)
+    parser.add_argument("--csv", help="csv with a title column instead of synthetic titles")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-drift", type=float, help="fail when drift exceeds this")
+    args = parser.parse_args()
+
+    titles = pd.read_csv(args.csv)["title"].astype(str).tolist()[:args.titles] if args.csv else make_titles(args.titles)
+    print(f"{len(titles)} titles, batch size {args.batch_size}\n")
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for backend in ["torch", "onnx"]:
+        with context.Pool(1) as pool:
+            results[backend] = pool.apply(run_backend, (backend, titles, args.batch_size))
+
+    print(f"{'backend':<8} {'load':>8} {'model RSS':>10} {'peak RSS':>10} {'p50':>9} {'p95':>9} {'titles/s':>9}")
+    for backend, r in results.items():
+        print(
+            f"{backend:<8} {r['load_s']:>7.1f}s {r['model_mb']:>8.0f}MB {r['peak_mb']:>8.0f}MB "
+            f"{r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms {r['titles_per_s']:>9.1f}"
+        )
+
+    torch_r, onnx_r = results["torch"], results["onnx"]
+    disagree = float(np.mean(torch_r["labels"] != onnx_r["labels"]))
+    diff = np.abs(torch_r["scores"] - onnx_r["scores"])
+    print(f"\nspeedup: {onnx_r['titles_per_s'] / torch_r['titles_per_s']:.1f}x")
+    print(f"label disagreement: {disagree:.2%}")
+    print(f"sentiment_score |diff|: mean {diff.mean():.4f}, max {diff.max():.4f}")
+    # scores that cross the ConfidenceFilter threshold change which rows are kept
+    threshold = Config.CONFIDENCE_THRESHOLD
+    crossed = np.mean((np.abs(torch_r["scores"]) > threshold) != (np.abs(onnx_r["scores"]) > threshold))
+    print(f"confidence filter decisions changed: {crossed:.2%}")
+
+    if args.max_drift is not None and (diff.max() > args.max_drift or disagree > args.max_drift):
+        print(f"\ndrift above {args.max_drift}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
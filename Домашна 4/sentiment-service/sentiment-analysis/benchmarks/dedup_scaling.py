@@ -0,0 +1,106 @@
+"""
+Scaling benchmark for near-duplicate headline filtering.
+
+Synthetic headlines are drawn from a Zipf-distributed vocabulary (a few
+very common words like real crypto news, a long tail of rare ones) and a
+share of them are paraphrased copies of earlier headlines (a word swapped,
+dropped or added). The old filter (dense cosine_similarity plus the nested
+loop) runs up to --dense-limit titles, beyond that its n^2 float64 matrix
+alone is reported; the prefix-filtered sparse search runs for every size.
+Where both run, the kept rows must be identical.
+
+Usage:
+    python benchmarks/dedup_scaling.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+ANALYSIS_ROOT = Path(__file__).resolve().parents[1] / "analysis"
+if str(ANALYSIS_ROOT) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_ROOT))
+
+from near_duplicates import duplicate_mask, similar_pairs
+
+
+THRESHOLD = 0.85
+
+
+def make_headlines(n: int, vocabulary: int = 20000, duplicate_share: float = 0.15, seed: int = 42) -> list[str]:
+    rng = np.random.default_rng(seed)
+    words = [f"tok{k}" for k in range(vocabulary)]
+    ranks = np.minimum(rng.zipf(1.3, size=(n, 14)), vocabulary) - 1
+    lengths = rng.integers(6, 15, n)
+
+    headlines = []
+    for k in range(n):
+        if k > 10 and rng.random() < duplicate_share:
+            tokens = headlines[rng.integers(k)].split()
+            edit = rng.integers(3)
+            position = rng.integers(len(tokens))
+            if edit == 0:
+                tokens[position] = words[rng.integers(vocabulary)]
+            elif edit == 1 and len(tokens) > 3:
+                tokens.pop(position)
+            else:
+                tokens.insert(position, words[rng.integers(vocabulary)])
+            headlines.append(" ".join(tokens))
+        else:
+            headlines.append(" ".join(words[r] for r in ranks[k, :lengths[k]]))
+    return headlines
+
+
+def dense_filter(tfidf) -> np.ndarray:
+    """the previous SimilarityFilter: dense similarities and a nested loop."""
+    cosine_sim = cosine_similarity(tfidf, tfidf)
+    n = tfidf.shape[0]
+    drop = set()
+    for i in range(n):
+        if i in drop: continue
+        for j in range(i + 1, n):
+            if j in drop: continue
+            if cosine_sim[i, j] > THRESHOLD:
+                drop.add(j)
+    mask = np.zeros(n, dtype=bool)
+    mask[list(drop)] = True
+    return mask
+
+
+def sparse_filter(tfidf) -> np.ndarray:
+    i, j, _ = similar_pairs(tfidf, THRESHOLD)
+    return duplicate_mask(tfidf.shape[0], i, j)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 3000, 10000, 30000, 100000])
+    parser.add_argument("--dense-limit", type=int, default=5000, help="largest size to run the old filter on")
+    args = parser.parse_args()
+
+    print(f"{'titles':>8} {'dense':>10} {'dense matrix':>13} {'sparse':>10} {'dropped':>9}")
+    for n in args.sizes:
+        tfidf = TfidfVectorizer(stop_words="english").fit_transform(make_headlines(n))
+
+        start = time.perf_counter()
+        sparse_mask = sparse_filter(tfidf)
+        sparse_s = time.perf_counter() - start
+
+        dense = "-"
+        if n <= args.dense_limit:
+            start = time.perf_counter()
+            dense_mask = dense_filter(tfidf)
+            dense = f"{time.perf_counter() - start:.2f}s"
+            if not np.array_equal(dense_mask, sparse_mask):
+                print(f"  kept rows differ at {np.flatnonzero(dense_mask != sparse_mask)[:10]}")
+
+        print(f"{n:>8} {dense:>10} {n * n * 8 / 1e9:>11.2f}GB {sparse_s:>9.2f}s {sparse_mask.sum():>9}")
+
+
+if __name__ == "__main__":
+    main()
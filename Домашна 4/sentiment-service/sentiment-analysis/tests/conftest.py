@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+ANALYSIS_ROOT = Path(__file__).resolve().parents[1] / "analysis"
+if str(ANALYSIS_ROOT) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_ROOT))
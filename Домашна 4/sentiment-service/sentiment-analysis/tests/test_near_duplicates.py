@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from near_duplicates import duplicate_mask, similar_pairs, title_hash
+
+
+def random_titles(n: int, rng) -> list[str]:
+    """titles over a small vocabulary, a share of them copies of earlier ones with one word changed."""
+    words = [f"w{k}" for k in range(40)]
+    titles = []
+    for k in range(n):
+        if k and rng.random() < 0.3:
+            tokens = titles[rng.integers(k)].split()
+            tokens[rng.integers(len(tokens))] = words[rng.integers(len(words))]
+            titles.append(" ".join(tokens))
+        else:
+            titles.append(" ".join(rng.choice(words, rng.integers(2, 8))))
+    return titles
+
+
+def dense_pairs(X, threshold: float, Y=None) -> set:
+    sim = cosine_similarity(X, X if Y is None else Y)
+    i, j = np.nonzero(sim > threshold)
+    if Y is None:
+        keep = j > i
+        i, j = i[keep], j[keep]
+    return set(zip(i.tolist(), j.tolist()))
+
+
+def dense_filter(X, threshold: float) -> np.ndarray:
+    """the SimilarityFilter before the sparse search: dense similarities and a nested loop."""
+    sim = cosine_similarity(X, X)
+    n = X.shape[0]
+    drop = set()
+    for i in range(n):
+        if i in drop:
+            continue
+        for j in range(i + 1, n):
+            if j not in drop and sim[i, j] > threshold:
+                drop.add(j)
+    mask = np.zeros(n, dtype=bool)
+    mask[list(drop)] = True
+    return mask
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("threshold", [0.3, 0.6, 0.85])
+@pytest.mark.parametrize("block_rows", [1, 7, 4096])
+def test_pairs_and_mask_match_the_dense_filter(seed, threshold, block_rows):
+    rng = np.random.default_rng(seed)
+    X = TfidfVectorizer().fit_transform(random_titles(60, rng))
+
+    i, j, sim = similar_pairs(X, threshold, block_rows=block_rows)
+    assert set(zip(i.tolist(), j.tolist())) == dense_pairs(X, threshold)
+    np.testing.assert_allclose(sim, cosine_similarity(X, X)[i, j])
+    np.testing.assert_array_equal(duplicate_mask(X.shape[0], i, j), dense_filter(X, threshold))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("block_rows", [1, 4096])
+def test_cross_set_pairs_match_dense(seed, block_rows):
+    rng = np.random.default_rng(seed)
+    titles = random_titles(80, rng)
+    vectorizer = TfidfVectorizer().fit(titles)
+    X, Y = vectorizer.transform(titles[40:]), vectorizer.transform(titles[:40])
+
+    i, j, sim = similar_pairs(X, 0.6, Y, block_rows=block_rows)
+    assert set(zip(i.tolist(), j.tolist())) == dense_pairs(X, 0.6, Y)
+    np.testing.assert_allclose(sim, cosine_similarity(X, Y)[i, j])
+
+
+def test_no_pairs():
+    X = TfidfVectorizer().fit_transform(["alpha beta", "gamma delta", "epsilon"])
+    i, j, sim = similar_pairs(X, 0.85)
+    assert len(i) == len(j) == len(sim) == 0
+    assert not duplicate_mask(3, i, j).any()
+
+
+def test_title_hash_folds_case_and_whitespace():
+    assert title_hash("Bitcoin  hits\tNEW high") == title_hash("bitcoin hits new high")
+    assert title_hash("Bitcoin hits new high") != title_hash("Bitcoin hits new low")
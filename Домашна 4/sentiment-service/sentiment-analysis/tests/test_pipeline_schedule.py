@@ -0,0 +1,54 @@
+import pytest
+
+import sentiment_analysis as sa
+
+
+class CheapFilter(sa.PipelineStep):
+    """a filter that only needs the articles, declared late."""
+    cost = 0.5
+    is_filter = True
+
+    def process(self, df):
+        return df
+
+
+def default_steps(cross_run_dedup: bool) -> list:
+    steps = [sa.DataIngestion(), sa.StoredTitleFilter()]
+    if cross_run_dedup:
+        steps.append(sa.IndexedDuplicateFilter())
+    return steps + [
+        sa.SentimentAnalysis(),
+        sa.ConfidenceFilter(),
+        sa.SimilarityFilter(),
+        sa.SymbolMapping(),
+        sa.DatabaseStorage(),
+    ]
+
+
+def schedule(steps: list) -> list:
+    pipeline = sa.SentimentPipeline()
+    for step in steps:
+        pipeline.add_step(step)
+    return pipeline.schedule()
+
+
+@pytest.mark.parametrize("cross_run_dedup", [True, False])
+def test_default_steps_keep_declared_order(cross_run_dedup):
+    # none of the default filters commutes with the steps declared before it
+    steps = default_steps(cross_run_dedup)
+    assert schedule(steps) == steps
+
+
+def test_filters_move_up_only_past_their_requirements():
+    steps = default_steps(True)
+    confidence, similarity = steps[4], steps[5]
+    declared = [step for step in steps if step not in (confidence, similarity)] + [similarity, confidence]
+    assert schedule(declared) == steps
+
+
+def test_ready_filter_moves_ahead_of_inference():
+    steps = default_steps(True)
+    late = CheapFilter()
+    order = schedule(steps[:-1] + [late, steps[-1]])
+    assert order[:2] == [steps[0], late]
+    assert [step for step in order if step is not late] == steps
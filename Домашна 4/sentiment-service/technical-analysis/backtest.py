@@ -0,0 +1,220 @@
+"""
+Vectorized backtester for normalized_score threshold strategies.
+
+Scores are reconstructed for every bar of every coin on the dates x symbols
+grid (sweep.normalized_scores with the live indicator parameters, no per-row
+python), then every strategy is simulated for all symbols and thresholds at
+once with array operations:
+
+    position[t] = +1 if score[t] >= threshold
+                  -1 if score[t] <= -threshold and shorting is allowed
+                   0 otherwise
+
+The position decided on bar t's close earns the close-to-close return of
+bar t + 1, so there is no look-ahead. Every change of position pays
+cost_bps. Reported per symbol and in aggregate (equal-weight portfolio of
+all coins trading on a bar): hit rate, total return, max drawdown, exposure
+and number of trades.
+
+Usage:
+    python backtest.py                           # OHLCV from the database
+    python backtest.py --csv ohlcv.csv --thresholds 0.2 0.4 --short
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from resampling import TIMEFRAME_RULES
+from sweep import LIVE_PARAMS, normalized_scores, sweep_panel
+from wide_engine import MA_MIN_BARS, OSC_MIN_BARS, WidePanel, oscillator_mask, panel_for
+
+
+DEFAULT_THRESHOLDS = (0.2, 0.4, 0.6)
+DEFAULT_COST_BPS = 10.0
+
+
+def forward_returns(close: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    close-to-close return from bar t to the next bar with a price, per coin.
+    gaps (no trades) are bridged by carrying the last close; 0 outside the
+    coin's history.
+    """
+    carried = pd.DataFrame(np.where(mask, close, np.nan)).ffill().to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = carried[1:] / carried[:-1] - 1.0
+    returns = np.vstack([returns, np.full((1, close.shape[1]), np.nan)])
+    valid = mask & np.vstack([mask[1:], np.zeros((1, mask.shape[1]), dtype=bool)])
+    return np.where(valid & np.isfinite(returns), returns, 0.0)
+
+
+def positions(scores: np.ndarray, thresholds, allow_short: bool = False) -> np.ndarray:
+    """positions for every threshold at once: (thresholds, dates, symbols) int8."""
+    thresholds = np.asarray(thresholds, dtype=np.float64)[:, None, None]
+    position = (scores >= thresholds).astype(np.int8)
+    if allow_short:
+        position -= (scores <= -thresholds).astype(np.int8)
+    return position
+
+
+def max_drawdown(equity: np.ndarray) -> np.ndarray:
+    """largest peak-to-trough loss along axis -2 (dates) as a negative fraction."""
+    peak = np.maximum.accumulate(equity, axis=-2)
+    return (equity / peak - 1.0).min(axis=-2)
+
+
+def simulate(
+    scores: np.ndarray,
+    returns: np.ndarray,
+    tradable: np.ndarray,
+    thresholds=DEFAULT_THRESHOLDS,
+    allow_short: bool = False,
+    cost_bps: float = DEFAULT_COST_BPS,
+) -> dict[str, np.ndarray]:
+    """
+    simulate the threshold strategies; scores, returns and tradable are
+    dates x symbols. returns per-symbol metrics shaped (thresholds, symbols)
+    and the portfolio metrics shaped (thresholds,).
+    """
+    position = positions(scores, thresholds, allow_short)
+    position[:, ~tradable] = 0
+
+    previous = np.concatenate([np.zeros_like(position[:, :1]), position[:, :-1]], axis=1)
+    turnover = np.abs(position - previous)
+    # a position cannot lose more than its stake (e.g. a short into a +300% bar)
+    strategy = np.maximum(position * returns - turnover * cost_bps / 10_000, -1.0)
+
+    equity = np.cumprod(1.0 + strategy, axis=1)
+    active = position != 0
+    in_market = active.sum(axis=1)
+    wins = (active & (position * returns > 0)).sum(axis=1)
+
+    # equal weight across the coins that have a bar, rebalanced every bar
+    portfolio = strategy.sum(axis=2) / np.maximum(tradable.sum(axis=1), 1)
+    portfolio_equity = np.cumprod(1.0 + portfolio, axis=1)
+
+    return {
+        "hit_rate": np.where(in_market > 0, wins / np.maximum(in_market, 1), np.nan),
+        "total_return": equity[:, -1] - 1.0,
+        "max_drawdown": max_drawdown(equity),
+        "exposure": in_market / np.maximum(tradable.sum(axis=0), 1),
+        "trades": ((position != 0) & (position != previous)).sum(axis=1),
+        "portfolio_return": portfolio_equity[:, -1] - 1.0,
+        "portfolio_drawdown": max_drawdown(portfolio_equity[..., None])[:, 0],
+        "portfolio_hit_rate": wins.sum(axis=1) / np.maximum(in_market.sum(axis=1), 1),
+    }
+
+
+def indicator_rows_mask(panel: WidePanel, rule: str | None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    bars that get an oscillator row and bars that get a moving-average row in
+    the indicator modules: from the 30th oscillator bar (empty periods
+    skipped) and from the 20th bar of the coin respectively.
+    """
+    osc_mask = oscillator_mask(panel, rule)
+    osc_rows = osc_mask & (np.cumsum(osc_mask, axis=0) >= OSC_MIN_BARS)
+    ma_rows = panel.mask & (np.cumsum(panel.mask, axis=0) >= MA_MIN_BARS)
+    return osc_rows, ma_rows
+
+
+def score_grid(panel: WidePanel, rule: str | None, timeframe: str, params: dict = LIVE_PARAMS):
+    """
+    normalized_score for every bar of every coin, as the history rows of
+    combine_signals score it; 0 on bars without any indicator row.
+    """
+    grid = {indicator: [p] for indicator, p in params.items()}
+    result = sweep_panel(panel, rule, timeframe, grid)
+    osc_rows, ma_rows = indicator_rows_mask(panel, rule)
+    return normalized_scores(result, params, osc_rows, ma_rows)
+
+
+def backtest_timeframe(
+    panel: WidePanel,
+    rule: str | None,
+    timeframe: str,
+    thresholds=DEFAULT_THRESHOLDS,
+    allow_short: bool = False,
+    cost_bps: float = DEFAULT_COST_BPS,
+    params: dict = LIVE_PARAMS,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """per-symbol and aggregate results for one timeframe."""
+    close = panel.fields["close"]
+    scores = score_grid(panel, rule, timeframe, params)
+    returns = forward_returns(close, panel.mask)
+    tradable = panel.mask & ~np.isnan(close)
+
+    metrics = simulate(scores, returns, tradable, thresholds, allow_short, cost_bps)
+
+    per_symbol = []
+    for i, threshold in enumerate(thresholds):
+        per_symbol.append(pd.DataFrame({
+            "timeframe": timeframe,
+            "threshold": threshold,
+            "symbol": panel.symbols,
+            "hit_rate": metrics["hit_rate"][i],
+            "total_return": metrics["total_return"][i],
+            "max_drawdown": metrics["max_drawdown"][i],
+            "exposure": metrics["exposure"][i],
+            "trades": metrics["trades"][i],
+        }))
+
+    summary = pd.DataFrame({
+        "timeframe": timeframe,
+        "threshold": list(thresholds),
+        "hit_rate": metrics["portfolio_hit_rate"],
+        "portfolio_return": metrics["portfolio_return"],
+        "portfolio_drawdown": metrics["portfolio_drawdown"],
+        "median_symbol_return": [frame["total_return"].median() for frame in per_symbol],
+        "symbols_positive": [(frame["total_return"] > 0).mean() for frame in per_symbol],
+    })
+    return pd.concat(per_symbol, ignore_index=True), summary
+
+
+def run_backtest(
+    raw_df: pd.DataFrame,
+    thresholds=DEFAULT_THRESHOLDS,
+    allow_short: bool = False,
+    cost_bps: float = DEFAULT_COST_BPS,
+    params: dict = LIVE_PARAMS,
+    timeframes=tuple(TIMEFRAME_RULES),
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """replay long-format OHLCV rows for every timeframe."""
+    daily = WidePanel.from_long(raw_df)
+    per_symbol, summary = [], []
+    for tf in timeframes:
+        symbol_df, summary_df = backtest_timeframe(
+            panel_for(daily, tf), TIMEFRAME_RULES[tf], tf,
+            thresholds, allow_short, cost_bps, params,
+        )
+        per_symbol.append(symbol_df)
+        summary.append(summary_df)
+    return pd.concat(per_symbol, ignore_index=True), pd.concat(summary, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", help="OHLCV csv with symbol,date,open,high,low,close,volume (default: database)")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=list(DEFAULT_THRESHOLDS))
+    parser.add_argument("--short", action="store_true", help="go short below -threshold")
+    parser.add_argument("--cost-bps", type=float, default=DEFAULT_COST_BPS)
+    parser.add_argument("--out", help="write per-symbol results to this csv")
+    args = parser.parse_args()
+
+    if args.csv:
+        raw_df = pd.read_csv(args.csv, parse_dates=["date"])
+    else:
+        from combine_signals import fetch_ohlcv
+        raw_df = fetch_ohlcv()
+
+    per_symbol, summary = run_backtest(raw_df, args.thresholds, args.short, args.cost_bps)
+
+    with pd.option_context("display.width", 120, "display.float_format", "{:.3f}".format):
+        print(summary.to_string(index=False))
+    if args.out:
+        per_symbol.to_csv(args.out, index=False)
+        print(f"\nper-symbol results -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Check of the backtester's scores against the production history rows.
+
+Builds the history frames with combine_signals.build_frames(history=True)
+on synthetic OHLCV (listing days, gaps, missing bars and revised
+duplicates, see synthetic_ohlcv) and compares their normalized_score with
+backtest.score_grid on the same (date, symbol) cells, for every timeframe.
+Grid cells without a history row must score 0. Prints the mismatching
+counts per timeframe and exits 1 on any mismatch.
+
+Usage:
+    python benchmarks/backtest_scores.py --symbols 200 --days 1095
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+TECHNICAL_ROOT = Path(__file__).resolve().parents[1]
+if str(TECHNICAL_ROOT) not in sys.path:
+    sys.path.insert(0, str(TECHNICAL_ROOT))
+
+from backtest import score_grid
+from combine_signals import build_frames, clean_ohlcv
+from resampling import TIMEFRAME_RULES
+from synthetic_ohlcv import synthetic_ohlcv
+from wide_engine import WidePanel, panel_for
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    raw_df = clean_ohlcv(synthetic_ohlcv(args.symbols, args.days, args.seed))
+    print(f"{args.symbols} symbols, {args.days} days, {len(raw_df)} rows\n")
+
+    start = time.perf_counter()
+    frames = build_frames(history=True, raw_df=raw_df, sql_resample=False, stream=False, use_cache=False)
+    history_s = time.perf_counter() - start
+
+    daily = WidePanel.from_long(raw_df)
+    failed = False
+    print(f"{'timeframe':<10} {'history rows':>13} {'mismatches':>11} {'scored without row':>19}")
+    for tf, rule in TIMEFRAME_RULES.items():
+        panel = panel_for(daily, tf)
+        scores = score_grid(panel, rule, tf)
+
+        frame = frames[tf]
+        rows = panel.dates.get_indexer(frame["Date"])
+        cols = np.searchsorted(panel.symbols, frame["Symbol"])
+        expected = frame["normalized_score"].to_numpy()
+        mismatches = int((scores[rows, cols] != expected).sum())
+
+        has_row = np.zeros(scores.shape, dtype=bool)
+        has_row[rows, cols] = True
+        without_row = int(((scores != 0) & ~has_row).sum())
+
+        failed |= bool(mismatches or without_row)
+        print(f"{tf:<10} {len(frame):>13} {mismatches:>11} {without_row:>19}")
+
+    print(f"\nhistory frames built in {history_s:.1f}s")
+    if failed:
+        print("backtest scores differ from the history rows")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark for the rolling correlation job: sliding the pairwise statistics
+by one day against rebuilding them from the window and against a full
+pandas DataFrame.corr of the window every day.
+
+Reports the per-day time of each approach, the top-k extraction time, the
+size of the state and the largest correlation difference between the
+incrementally updated state and a fresh rebuild.
+
+Usage:
+    python benchmarks/correlation_scaling.py --symbols 1500 --days 400 --window 90
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+TECHNICAL_ROOT = Path(__file__).resolve().parents[1]
+if str(TECHNICAL_ROOT) not in sys.path:
+    sys.path.insert(0, str(TECHNICAL_ROOT))
+
+from correlations import BLOCK_ROWS, MIN_OVERLAP, TOP_K, close_matrix, rebuild_state, update_state
+from wide_scaling import make_listed_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=1500)
+    parser.add_argument("--days", type=int, default=400)
+    parser.add_argument("--window", type=int, default=90)
+    parser.add_argument("--steps", type=int, default=10, help="days applied incrementally")
+    parser.add_argument("--pandas-steps", type=int, default=2, help="days timed with DataFrame.corr (0 = skip)")
+    args = parser.parse_args()
+
+    raw_df = make_listed_frame(args.symbols, args.days)[["symbol", "date", "close"]]
+    dates = np.sort(raw_df["date"].unique())
+    cut = dates[-args.steps - 1]
+    universe = np.sort(raw_df["symbol"].unique())
+    print(f"{args.symbols} symbols, {args.days} days, {args.window}d window, {args.steps} incremental days\n")
+
+    state = rebuild_state(args.window, raw_df[raw_df["date"] <= cut], universe)
+    state_mb = sum(m.nbytes for m in (state.count, state.sums, state.squares, state.cross)) / 1e6
+
+    start = time.perf_counter()
+    state = update_state(state, raw_df[raw_df["date"] >= cut])
+    incremental_s = (time.perf_counter() - start) / args.steps
+
+    start = time.perf_counter()
+    for day in dates[-args.steps:]:
+        rebuilt = rebuild_state(args.window, raw_df[raw_df["date"] <= day], universe)
+    rebuild_s = (time.perf_counter() - start) / args.steps
+
+    start = time.perf_counter()
+    state.top_peers(TOP_K)
+    top_k_s = time.perf_counter() - start
+
+    print(f"{'incremental update':<24} {incremental_s * 1000:>10.1f} ms/day")
+    print(f"{'rebuild from window':<24} {rebuild_s * 1000:>10.1f} ms/day")
+    if args.pandas_steps:
+        closes = close_matrix(raw_df)
+        returns = closes.pct_change(fill_method=None)
+        min_periods = int(np.ceil(MIN_OVERLAP * args.window))
+        start = time.perf_counter()
+        for end in range(len(returns) - args.pandas_steps, len(returns)):
+            returns.iloc[end - args.window + 1:end + 1].corr(min_periods=min_periods)
+        pandas_s = (time.perf_counter() - start) / args.pandas_steps
+        print(f"{'DataFrame.corr':<24} {pandas_s * 1000:>10.1f} ms/day")
+    print(f"{f'top-{TOP_K} peers':<24} {top_k_s * 1000:>10.1f} ms")
+    print(f"\nstate: {state_mb:.0f} MB per window, correlations in blocks of {BLOCK_ROWS} rows")
+
+    drift = 0.0
+    for start_row in range(0, len(state.symbols), BLOCK_ROWS):
+        stop = min(start_row + BLOCK_ROWS, len(state.symbols))
+        a = state.correlation_rows(start_row, stop)
+        b = rebuilt.correlation_rows(start_row, stop)
+        drift = max(drift, float(np.nanmax(np.abs(a - b), initial=0.0)))
+    print(f"max |incremental - rebuild| correlation: {drift:.2e}")
+
+
+if __name__ == "__main__":
+    main()
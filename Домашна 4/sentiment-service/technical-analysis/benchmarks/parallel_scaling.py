@@ -0,0 +1,61 @@
+"""
+Scaling benchmark for the process-pool mode of combine_signals.
+
+Runs oscillator + moving-average computation on a synthetic OHLCV frame with
+1, 2, 4, ... worker processes (up to the CPU count) and reports wall time,
+speedup and parallel efficiency (speedup / workers).
+
+Usage:
+    python benchmarks/parallel_scaling.py --symbols 200 --days 1095
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+TECHNICAL_ROOT = Path(__file__).resolve().parents[1]
+if str(TECHNICAL_ROOT) not in sys.path:
+    sys.path.insert(0, str(TECHNICAL_ROOT))
+
+from combine_signals import compute_frames, compute_frames_parallel
+from partition_scaling import make_frame
+
+
+def worker_counts(max_workers: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    raw_df = make_frame(args.symbols, args.days).reset_index()
+    print(f"{args.symbols} symbols x {args.days} days = {len(raw_df)} rows\n")
+
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8} {'efficiency':>11}")
+    serial_s = None
+    for workers in worker_counts(args.max_workers):
+        start = time.perf_counter()
+        if workers == 1:
+            compute_frames(raw_df)
+        else:
+            compute_frames_parallel(raw_df, workers)
+        elapsed = time.perf_counter() - start
+
+        serial_s = serial_s or elapsed
+        speedup = serial_s / elapsed
+        print(f"{workers:>8} {elapsed:>10.2f} {speedup:>7.2f}x {speedup / workers:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
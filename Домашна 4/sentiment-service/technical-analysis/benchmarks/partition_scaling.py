@@ -0,0 +1,97 @@
+"""
+Scaling benchmark for per-symbol partitioning of the OHLCV frame.
+
+Compares the old per-symbol boolean mask (df[df["symbol"] == symbol].copy())
+with partition_by_symbol for growing symbol counts. The single-pass version
+should grow linearly with the number of rows, the mask version quadratically.
+
+Usage:
+    python benchmarks/partition_scaling.py
+    python benchmarks/partition_scaling.py --days 365 --no-baseline
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TECHNICAL_ROOT = Path(__file__).resolve().parents[1]
+if str(TECHNICAL_ROOT) not in sys.path:
+    sys.path.insert(0, str(TECHNICAL_ROOT))
+
+from partitioning import partition_by_symbol
+
+
+SYMBOL_COUNTS = [100, 500, 1000, 2500, 5000]
+
+
+def make_frame(n_symbols: int, n_days: int, seed: int = 42) -> pd.DataFrame:
+    """build a date-indexed frame shaped like fetch_ohlcv output."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end="2025-01-01", periods=n_days, freq="D")
+    n_rows = n_symbols * n_days
+
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_rows)))
+    df = pd.DataFrame({
+        "symbol": np.repeat([f"C{i:05d}-USD" for i in range(n_symbols)], n_days),
+        "open": close,
+        "high": close * 1.01,
+        "low": close * 0.99,
+        "close": close,
+        "volume": rng.uniform(1e3, 1e6, n_rows),
+    }, index=pd.Index(np.tile(dates, n_symbols), name="date"))
+    return df
+
+
+def run_mask(df: pd.DataFrame) -> int:
+    rows = 0
+    for symbol in df["symbol"].unique():
+        coin_df = df[df["symbol"] == symbol].copy().sort_index()
+        rows += len(coin_df)
+    return rows
+
+
+def run_partition(df: pd.DataFrame) -> int:
+    rows = 0
+    for _, coin_df in partition_by_symbol(df, "symbol"):
+        rows += len(coin_df)
+    return rows
+
+
+def timed(fn, df: pd.DataFrame) -> float:
+    start = time.perf_counter()
+    rows = fn(df)
+    elapsed = time.perf_counter() - start
+    assert rows == len(df)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365, help="history length per symbol")
+    parser.add_argument("--no-baseline", action="store_true", help="skip the per-symbol mask timing")
+    args = parser.parse_args()
+
+    header = f"{'symbols':>8} {'rows':>10} {'partition s':>12} {'us/row':>8}"
+    if not args.no_baseline:
+        header += f" {'mask s':>10} {'speedup':>8}"
+    print(header)
+
+    for n_symbols in SYMBOL_COUNTS:
+        df = make_frame(n_symbols, args.days)
+        part_s = timed(run_partition, df)
+        per_row_us = part_s / len(df) * 1e6
+
+        if args.no_baseline:
+            print(f"{n_symbols:>8} {len(df):>10} {part_s:>12.3f} {per_row_us:>8.3f}")
+            continue
+
+        mask_s = timed(run_mask, df)
+        print(f"{n_symbols:>8} {len(df):>10} {part_s:>12.3f} {per_row_us:>8.3f} {mask_s:>10.3f} {mask_s / part_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Per-stage scaling benchmark for combine_signals on synthetic OHLCV.
+
+For every symbol count and history length the pipeline is split into its
+stages and each one is timed and traced for peak memory:
+
+    prepare     dedupe/sort the rows and build the daily, weekly and monthly bars
+    osc         oscillator indicators for all timeframes
+    ma          moving-average indicators for all timeframes
+    merge       prefix and outer-join the oscillator and moving-average rows
+    normalize   normalized_score and final sort
+
+Each stage runs once untraced for the time and once under tracemalloc for
+the peak (tracemalloc slows python-heavy stages down, so the two are kept
+apart; --no-memory skips the second run). Results can be saved as a
+baseline and later runs checked against it: any stage slower or larger
+than baseline * tolerance is reported and the exit code is 1.
+
+Usage:
+    python benchmarks/stage_scaling.py --symbols 300 1500 7500 --days 365 1095 --engine wide
+    python benchmarks/stage_scaling.py --save-baseline baseline.json
+    python benchmarks/stage_scaling.py --baseline baseline.json --tolerance 1.3
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+os.environ.setdefault("TQDM_DISABLE", "1")
+
+TECHNICAL_ROOT = Path(__file__).resolve().parents[1]
+if str(TECHNICAL_ROOT) not in sys.path:
+    sys.path.insert(0, str(TECHNICAL_ROOT))
+
+from combine_signals import calculate_normalized_score, clean_ohlcv, get_indicator_modules, standardize_columns
+from resampling import TIMEFRAME_RULES, BarCache
+from synthetic_ohlcv import synthetic_ohlcv
+from wide_engine import (
+    MA_COLUMNS, MA_MIN_BARS, OSC_COLUMNS, OSC_MIN_BARS, WidePanel,
+    compute_moving_averages, compute_oscillators, indicator_rows, oscillator_mask, panel_for,
+)
+
+
+STAGES = ["prepare", "osc", "ma", "merge", "normalize"]
+# stages faster than this are too noisy to flag on time
+NOISE_FLOOR_SECONDS = 0.05
+
+
+def prepare(raw_df: pd.DataFrame, engine: str):
+    df = clean_ohlcv(raw_df.copy())
+    if engine == "wide":
+        daily = WidePanel.from_long(df)
+        return {tf: panel_for(daily, tf) for tf in TIMEFRAME_RULES}
+
+    bars = BarCache(df.set_index("date"))
+    for symbol in bars.symbols:
+        for tf in TIMEFRAME_RULES:
+            bars.get(symbol, tf)
+    return bars
+
+
+def oscillators(bars, engine: str) -> dict:
+    if engine == "wide":
+        return {
+            tf: indicator_rows(
+                panel, oscillator_mask(panel, TIMEFRAME_RULES[tf]), compute_oscillators, ["high", "low", "close"],
+                OSC_COLUMNS + ["raw_score_osc"], OSC_MIN_BARS, "date", "symbol",
+            )
+            for tf, panel in bars.items()
+        }
+    osc_module, _ = get_indicator_modules()
+    return osc_module.compute_oscillator_frames(bars)
+
+
+def moving_averages(bars, engine: str) -> dict:
+    if engine == "wide":
+        return {
+            tf: indicator_rows(
+                panel, panel.mask, compute_moving_averages, ["close", "volume"],
+                MA_COLUMNS + ["raw_score_ma"], MA_MIN_BARS, "Date", "Symbol",
+            )
+            for tf, panel in bars.items()
+        }
+    _, ma_module = get_indicator_modules()
+    return ma_module.compute_moving_average_frames(bars)
+
+
+def merge(osc_frames: dict, ma_frames: dict) -> dict:
+    merged = {}
+    for tf in TIMEFRAME_RULES:
+        osc_tf = standardize_columns(osc_frames.get(tf, pd.DataFrame()), "osc_")
+        ma_tf = standardize_columns(ma_frames.get(tf, pd.DataFrame()), "ma_")
+        # short histories leave no monthly rows (and no columns) to join on
+        if osc_tf.empty or ma_tf.empty:
+            merged[tf] = ma_tf if osc_tf.empty else osc_tf
+        else:
+            merged[tf] = pd.merge(osc_tf, ma_tf, on=["Date", "Symbol"], how="outer")
+    return merged
+
+
+def normalize(merged: dict) -> dict:
+    return {
+        tf: calculate_normalized_score(df).sort_values(["Symbol", "Date"]) if not df.empty else df
+        for tf, df in merged.items()
+    }
+
+
+def measure(func, *args, memory: bool = True) -> tuple[object, float, float | None]:
+    """(result, seconds, peak MB above the start of the call)."""
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+
+    peak_mb = None
+    if memory:
+        del result
+        tracemalloc.start()
+        result = func(*args)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return result, seconds, peak_mb
+
+
+def run_stage(func, *args, memory: bool):
+    result, seconds, peak_mb = measure(func, *args, memory=memory)
+    return result, {"seconds": seconds, "peak_mb": peak_mb}
+
+
+def run_case(raw_df: pd.DataFrame, engine: str, memory: bool) -> dict[str, dict]:
+    results = {}
+    bars, results["prepare"] = run_stage(prepare, raw_df, engine, memory=memory)
+    osc_frames, results["osc"] = run_stage(oscillators, bars, engine, memory=memory)
+    ma_frames, results["ma"] = run_stage(moving_averages, bars, engine, memory=memory)
+    merged, results["merge"] = run_stage(merge, osc_frames, ma_frames, memory=memory)
+    _, results["normalize"] = run_stage(normalize, merged, memory=memory)
+    return results
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    found = []
+    for case, stages in results.items():
+        for stage, metrics in stages.items():
+            base = baseline.get(case, {}).get(stage)
+            if not base:
+                continue
+            for metric in ("seconds", "peak_mb"):
+                if metrics.get(metric) is None or base.get(metric) is None:
+                    continue
+                if metric == "seconds" and base[metric] < NOISE_FLOOR_SECONDS:
+                    continue
+                if metrics[metric] > base[metric] * tolerance:
+                    found.append(f"{case} {stage} {metric}: {metrics[metric]:.3f} vs baseline {base[metric]:.3f}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, nargs="+", default=[100, 300, 1500])
+    parser.add_argument("--days", type=int, nargs="+", default=[365, 3 * 365])
+    parser.add_argument("--engine", choices=["loop", "wide"], default="wide")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run of each stage")
+    parser.add_argument("--save-baseline", help="write the results to this json file")
+    parser.add_argument("--baseline", help="compare against this json file and exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed ratio to the baseline")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{args.engine} engine\n")
+    print(f"{'case':<14} " + " ".join(f"{stage:>20}" for stage in STAGES))
+    for n_days in args.days:
+        for n_symbols in args.symbols:
+            raw_df = synthetic_ohlcv(n_symbols, n_days, args.seed)
+            case = f"{args.engine}:{n_symbols}x{n_days}"
+            results[case] = run_case(raw_df, args.engine, not args.no_memory)
+
+            cells = []
+            for stage in STAGES:
+                metrics = results[case][stage]
+                peak = f"{metrics['peak_mb']:.0f}MB" if metrics["peak_mb"] is not None else "-"
+                cells.append(f"{metrics['seconds']:>10.2f}s {peak:>8}")
+            print(f"{n_symbols:>5}x{n_days:<8} " + " ".join(cells), flush=True)
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2))
+        print(f"\nbaseline -> {args.save_baseline}")
+
+    if args.baseline:
+        found = regressions(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if found:
+            print(f"\n{len(found)} regression(s) over {args.tolerance}x the baseline:")
+            for line in found:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nno regressions over {args.tolerance}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark for the parameter sweep against computing each grid entry alone.
+
+The independent path calls the full kernels for every (indicator, params)
+entry, recomputing price changes, true range, directional movement, emas
+and rolling sums each time. The sweep shares them across entries and runs
+all exponential smoothings in batched ewm passes. Both run on the same
+compacted daily bars; entries whose votes disagree are listed as a sanity
+check (prefix-sum means can flip a vote on exact ties only).
+
+Usage:
+    python benchmarks/sweep_scaling.py --symbols 500 --days 1095
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+TECHNICAL_ROOT = Path(__file__).resolve().parents[1]
+if str(TECHNICAL_ROOT) not in sys.path:
+    sys.path.insert(0, str(TECHNICAL_ROOT))
+
+import kernels
+import scoring
+from sweep import DEFAULT_GRID, SWEEPS, Intermediates, smoothing_passes
+from wide_engine import WidePanel, compact_inputs
+from wide_scaling import make_listed_frame
+
+
+def independent_entry(high, low, close, volume, indicator: str, params: tuple):
+    if indicator == "rsi":
+        return scoring.band_vote(kernels.rsi(close, *params), 30, 70)
+    if indicator == "macd":
+        line, signal, _ = kernels.macd(close, *params)
+        return scoring.cross_vote(line, signal)
+    if indicator == "stoch":
+        stoch_k, _ = kernels.stoch(high, low, close, *params)
+        return scoring.band_vote(stoch_k, 20, 80)
+    if indicator == "adx":
+        _, dmp, dmn = kernels.adx(high, low, close, *params)
+        return scoring.cross_vote(dmp, dmn)
+    if indicator == "cci":
+        return scoring.band_vote(kernels.cci(high, low, close, *params), -100, 100)
+    n = params[0]
+    middle, _, _ = kernels.bollinger(close, n)
+    return scoring.moving_average_score(close, kernels.sma(close, n), kernels.ema(close, n), kernels.wma(close, n), middle)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    args = parser.parse_args()
+
+    panel = WidePanel.from_long(make_listed_frame(args.symbols, args.days))
+    arrays, _, _, _ = compact_inputs(panel, panel.mask, ["high", "low", "close", "volume"])
+    entries = [(name, params) for name, grid in DEFAULT_GRID.items() for params in grid]
+    print(f"{args.symbols} symbols x {args.days} days, {len(entries)} grid entries\n")
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        start = time.perf_counter()
+        independent = [independent_entry(*arrays, name, params) for name, params in entries]
+        independent_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ctx = Intermediates(*arrays)
+        for specs in smoothing_passes(ctx, DEFAULT_GRID):
+            ctx.smooth(specs)
+        shared = [SWEEPS[name](ctx, *params)[1] for name, params in entries]
+        shared_s = time.perf_counter() - start
+
+    print(f"{'independent kernels':<22} {independent_s:>8.2f}s")
+    print(f"{'shared intermediates':<22} {shared_s:>8.2f}s")
+    print(f"\nspeedup: {independent_s / shared_s:.1f}x")
+
+    for (name, params), a, b in zip(entries, independent, shared):
+        differ = np.mean(np.asarray(a) != np.asarray(b))
+        if differ:
+            print(f"  {name}{params}: {differ:.4%} of votes differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Deterministic synthetic OHLCV rows shaped like fetch_ohlcv output.
+
+Prices are geometric random walks with a per-coin volatility. To look like
+the real table, coins list on different days, some have a multi-week gap
+(exchange outage or trading halt), single days are missing at random and a
+share of the bars are sent twice with a revised close (the pipeline keeps
+the last one). The same arguments always give the same frame.
+
+Usage:
+    python benchmarks/synthetic_ohlcv.py --symbols 1500 --days 1095 --out ohlcv.csv
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ohlcv(
+    n_symbols: int,
+    n_days: int,
+    seed: int = 42,
+    end: str = "2025-01-01",
+    listing_spread: float = 0.5,
+    gap_share: float = 0.1,
+    missing_rate: float = 0.01,
+    duplicate_rate: float = 0.01,
+) -> pd.DataFrame:
+    """
+    long-format (symbol, date, open, high, low, close, volume) rows sorted by
+    symbol and date, duplicates included.
+
+    listing_spread: coins list uniformly within this share of the range
+    gap_share: share of coins with one gap of 3-60 days
+    missing_rate: share of single bars dropped at random
+    duplicate_rate: share of bars repeated with a revised close
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=end, periods=n_days, freq="D")
+    symbols = np.array([f"S{i:05d}-USD" for i in range(n_symbols)])
+    day = np.arange(n_days)[:, None]
+
+    volatility = rng.uniform(0.01, 0.06, n_symbols)
+    log_returns = rng.standard_normal((n_days, n_symbols)) * volatility
+    close = rng.uniform(0.01, 1000, n_symbols) * np.exp(np.cumsum(log_returns, axis=0))
+    open_ = np.vstack([close[:1], close[:-1]]) * (1 + rng.normal(0, 0.002, (n_days, n_symbols)))
+    wick = np.abs(rng.normal(0, 0.5, (2, n_days, n_symbols))) * volatility
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(12, 1.5, (n_days, n_symbols))
+
+    # the first coin has the full history, the others list later
+    listed = rng.integers(0, max(1, int(n_days * listing_spread)), n_symbols)
+    listed[0] = 0
+    present = day >= listed
+
+    has_gap = rng.random(n_symbols) < gap_share
+    gap_length = rng.integers(3, 61, n_symbols)
+    gap_start = listed + rng.integers(1, max(2, n_days // 2), n_symbols)
+    present &= ~(has_gap & (day >= gap_start) & (day < gap_start + gap_length))
+    present &= rng.random((n_days, n_symbols)) >= missing_rate
+
+    # (symbol, date) order: transpose so rows run over dates within a symbol
+    rows, cols = np.nonzero(present.T)
+    df = pd.DataFrame({
+        "symbol": symbols[rows],
+        "date": dates[cols],
+        "open": open_.T[rows, cols],
+        "high": high.T[rows, cols],
+        "low": low.T[rows, cols],
+        "close": close.T[rows, cols],
+        "volume": volume.T[rows, cols],
+    })
+
+    duplicates = df.sample(frac=duplicate_rate, random_state=seed)
+    duplicates["close"] *= 1 + rng.normal(0, 0.001, len(duplicates))
+    duplicates["high"] = duplicates[["high", "close"]].max(axis=1)
+    duplicates["low"] = duplicates[["low", "close"]].min(axis=1)
+    df = pd.concat([df, duplicates]).sort_values(["symbol", "date"], kind="stable")
+    return df.reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", type=int, default=1500)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    df = synthetic_ohlcv(args.symbols, args.days, args.seed)
+    df.to_csv(args.out, index=False)
+    print(f"{len(df)} rows for {args.symbols} symbols -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Validate kernels.py against pandas_ta / ta on real OHLCV data and time both.
+
+Every indicator is computed per symbol and timeframe with the library and
+with the NumPy kernel; values must agree within the tolerance and NaN
+positions must match. Exits with status 1 on any mismatch.
+
+CCI is compared against ta.trend.cci: pandas_ta's cci divides only the mean
+by the deviation term (tp - sma / (c * mad)), which is not the standard
+formula the +-100 thresholds in the oscillator score are written for.
+
+Usage:
+    python benchmarks/validate_kernels.py                # OHLCV from the database
+    python benchmarks/validate_kernels.py --csv ohlcv.csv --symbols 50
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TECHNICAL_ROOT = Path(__file__).resolve().parents[1]
+if str(TECHNICAL_ROOT) not in sys.path:
+    sys.path.insert(0, str(TECHNICAL_ROOT))
+
+import kernels
+from resampling import BarCache, TIMEFRAME_RULES
+
+
+RTOL = 1e-7
+ATOL = 1e-9
+
+
+def library_indicators(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    import pandas_ta  # noqa: F401  (registers the .ta accessor)
+    import ta
+
+    high, low, close, volume = df["high"], df["low"], df["close"], df["volume"]
+    out = {}
+
+    # the .ta accessor hands back its input frame when a series is too short
+    macd = df.ta.macd(fast=12, slow=26, signal=9)
+    stoch = df.ta.stoch(k=14, d=3, smooth_k=3)
+    adx = df.ta.adx(length=14)
+    parts = [f for f in (macd, stoch, adx) if f is not None]
+    frame = pd.concat(parts, axis=1) if parts else pd.DataFrame()
+
+    out["RSI"] = df.ta.rsi(length=14)
+    out["MACD_LINE"] = frame.get("MACD_12_26_9")
+    out["MACD_SIGNAL"] = frame.get("MACDs_12_26_9")
+    out["STOCH_K"] = frame.get("STOCHk_14_3_3")
+    out["STOCH_D"] = frame.get("STOCHd_14_3_3")
+    out["ADX"] = frame.get("ADX_14")
+    out["DMI_PLUS"] = frame.get("DMP_14")
+    out["DMI_MINUS"] = frame.get("DMN_14")
+    out["CCI"] = ta.trend.cci(high, low, close, window=20)
+
+    out["SMA"] = ta.trend.sma_indicator(close, window=20)
+    out["EMA"] = ta.trend.ema_indicator(close, window=20)
+    out["WMA"] = ta.trend.wma_indicator(close, window=20)
+    out["VOLUME_SMA"] = ta.trend.sma_indicator(volume, window=20)
+    bb = ta.volatility.BollingerBands(close=close, window=20, window_dev=2)
+    out["BOLLINGER_MIDDLE"] = bb.bollinger_mavg()
+    out["BOLLINGER_UPPER"] = bb.bollinger_hband()
+    out["BOLLINGER_LOWER"] = bb.bollinger_lband()
+
+    n = len(df)
+    return {
+        name: (np.full(n, np.nan) if series is None else series.to_numpy(dtype=np.float64))
+        for name, series in out.items()
+    }
+
+
+def kernel_indicators(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    high = df["high"].to_numpy(dtype=np.float64)
+    low = df["low"].to_numpy(dtype=np.float64)
+    close = df["close"].to_numpy(dtype=np.float64)
+    volume = df["volume"].to_numpy(dtype=np.float64)
+    out = {}
+
+    out["RSI"] = kernels.rsi(close, 14)
+    out["MACD_LINE"], out["MACD_SIGNAL"], _ = kernels.macd(close, 12, 26, 9)
+    out["STOCH_K"], out["STOCH_D"] = kernels.stoch(high, low, close, 14, 3, 3)
+    out["ADX"], out["DMI_PLUS"], out["DMI_MINUS"] = kernels.adx(high, low, close, 14)
+    out["CCI"] = kernels.cci(high, low, close, 20)
+
+    out["SMA"] = kernels.sma(close, 20)
+    out["EMA"] = kernels.ema(close, 20)
+    out["WMA"] = kernels.wma(close, 20)
+    out["VOLUME_SMA"] = kernels.sma(volume, 20)
+    out["BOLLINGER_MIDDLE"], out["BOLLINGER_UPPER"], out["BOLLINGER_LOWER"] = kernels.bollinger(close, 20, 2)
+    return out
+
+
+def compare(expected: np.ndarray, actual: np.ndarray) -> tuple[bool, float]:
+    """return (ok, max relative error) for two aligned arrays."""
+    exp_nan, act_nan = np.isnan(expected), np.isnan(actual)
+    if expected.shape != actual.shape or not np.array_equal(exp_nan, act_nan):
+        return False, np.inf
+    valid = ~exp_nan
+    if not valid.any():
+        return True, 0.0
+    diff = np.abs(expected[valid] - actual[valid])
+    ok = bool(np.all(diff <= ATOL + RTOL * np.abs(expected[valid])))
+    rel = float(np.max(diff / np.maximum(np.abs(expected[valid]), ATOL)))
+    return ok, rel
+
+
+def load_ohlcv(csv_path: str | None) -> pd.DataFrame:
+    if csv_path:
+        df = pd.read_csv(csv_path, parse_dates=["date"])
+    else:
+        from combine_signals import fetch_ohlcv
+        df = fetch_ohlcv()
+    return df.drop_duplicates(subset=["symbol", "date"], keep="last").sort_values(["symbol", "date"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", help="OHLCV csv with symbol,date,open,high,low,close,volume (default: database)")
+    parser.add_argument("--symbols", type=int, default=0, help="limit to the first N symbols")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    import pandas_ta  # noqa: F401
+    import ta  # noqa: F401
+    print(f"library import: {time.perf_counter() - start:.2f}s (kernels need only numpy)")
+
+    raw_df = load_ohlcv(args.csv)
+    bars = BarCache(raw_df.set_index("date"))
+    symbols = bars.symbols[:args.symbols] if args.symbols else bars.symbols
+    print(f"validating {len(symbols)} symbols x {len(TIMEFRAME_RULES)} timeframes")
+
+    worst: dict[str, float] = {}
+    failures = []
+    library_s = kernel_s = 0.0
+
+    for symbol in symbols:
+        for tf, rule in TIMEFRAME_RULES.items():
+            df = bars.get(symbol, tf)
+            df = df if rule is None else df.dropna()
+            if df.empty:
+                continue
+
+            t0 = time.perf_counter()
+            expected = library_indicators(df)
+            t1 = time.perf_counter()
+            actual = kernel_indicators(df)
+            t2 = time.perf_counter()
+            library_s += t1 - t0
+            kernel_s += t2 - t1
+
+            for name, values in expected.items():
+                ok, rel = compare(values, actual[name])
+                worst[name] = max(worst.get(name, 0.0), rel)
+                if not ok:
+                    failures.append((symbol, tf, name))
+
+    print(f"\n{'indicator':<18} {'max rel err':>12}")
+    for name, rel in worst.items():
+        print(f"{name:<18} {rel:>12.2e}")
+
+    print(f"\nlibrary: {library_s:.2f}s   kernels: {kernel_s:.2f}s   speedup: {library_s / max(kernel_s, 1e-9):.1f}x")
+
+    if failures:
+        print(f"\n{len(failures)} mismatches, first ones:")
+        for symbol, tf, name in failures[:20]:
+            print(f"  {symbol} {tf} {name}")
+        sys.exit(1)
+    print("\nall indicators match")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
 import importlib.util
+import io
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
 from pathlib import Path
 from urllib.parse import quote_plus
 
 import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.types import Date
 
 load_dotenv()
 
@@ -16,6 +20,11 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from database.database import DatabaseManager
+from indicator_cache import CACHE_DIR, CACHE_ENABLED, PARQUET_AVAILABLE, IndicatorCache, config_version, symbol_keys
+from partitioning import symbol_boundaries
+from resampling import BarCache
+from screening import SCREEN_INDEXES, SCREEN_TABLE, build_screen
+from wide_engine import compute_frames_wide
 
 
 BASE_DIR = Path(__file__).parent
@@ -23,9 +32,52 @@ OSC_PATH = BASE_DIR / "oscilators" / "script.py"
 MA_PATH = BASE_DIR / "moving-averages" / "script.py"
 
 HISTORY_LIMIT_DAYS = 3 * 365
+OHLCV_FILTER = f"""symbol IN (SELECT symbol FROM coins_metadata)
+      AND date::date >= CURRENT_DATE - INTERVAL '{HISTORY_LIMIT_DAYS} days'"""
+DAILY_OHLCV_QUERY = f"""
+    SELECT symbol, date, open, high, low, close, volume
+    FROM ohlcv_data
+    WHERE {OHLCV_FILTER}
+    ORDER BY symbol, date ASC
+    """
 MAX_OSC_SCORE = 5
 MAX_MA_SCORE = 4
 
+# number of worker processes for indicator computation (1 = serial)
+DEFAULT_WORKERS = int(os.getenv("TA_WORKERS", "1"))
+# shards per worker so faster workers pick up the remaining load
+SHARDS_PER_WORKER = 4
+# "loop" = per-symbol indicator modules, "wide" = all coins at once on dates x symbols arrays
+DEFAULT_ENGINE = os.getenv("TA_ENGINE", "loop")
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# aggregate weekly/monthly bars in postgres instead of resampling daily rows in pandas
+SQL_RESAMPLE = os.getenv("TA_SQL_RESAMPLE", "0") == "1"
+# timeframe -> (date_trunc unit, offset from period start to its pandas label)
+SQL_PERIODS = {"1w": ("week", "6 days"), "1m": ("month", "1 month - 1 day")}
+
+# stream OHLCV through a server-side cursor in chunks of whole symbols
+STREAM_OHLCV = os.getenv("TA_STREAM", "0") == "1"
+STREAM_CHUNK_ROWS = int(os.getenv("TA_STREAM_CHUNK_ROWS", "100000"))
+STREAM_FETCH_ROWS = 10_000
+
+# symbols per cache segment when computing uncached symbols (one segment per shard in the pool)
+CACHE_BATCH_ROWS = 200_000
+
+# daily series of indicators and normalized_score, appended to on every run
+HISTORY_ENABLED = os.getenv("TA_HISTORY", "0") == "1"
+HISTORY_TABLE = "technical_analysis_history"
+HISTORY_KEY = ["symbol", "period", "date"]
+PERIOD_MAP = {"1d": "DAY", "1w": "WEEK", "1m": "MONTH"}
+
+OUTPUT_TABLE = "technical_analysis"
+# indexes for the backend lookups (by symbol, by symbol and period)
+OUTPUT_INDEXES = [("symbol", "period")]
+# give up the swap instead of queueing readers behind a long-running query
+SWAP_LOCK_TIMEOUT = "5s"
+
+_indicator_modules = None
+
 
 def load_module(name: str, path: Path):
     spec = importlib.util.spec_from_file_location(name, path)
@@ -36,6 +88,16 @@ def load_module(name: str, path: Path):
     return module
 
 
+def get_indicator_modules():
+    """load the oscillator and moving-average modules once per process."""
+    global _indicator_modules
+    if _indicator_modules is None:
+        _indicator_modules = (
+            load_module("oscillators_module", OSC_PATH),
+            load_module("ma_module", MA_PATH),
+        )
+    return _indicator_modules
+
 
 def standardize_columns(df: pd.DataFrame, prefix: str) -> pd.DataFrame:
     if df.empty:
@@ -85,46 +147,299 @@ def calculate_normalized_score(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def fetch_ohlcv() -> pd.DataFrame:
+def fetch_ohlcv(timeframe: str = "1d") -> pd.DataFrame:
+    """
+    daily OHLCV rows, or weekly/monthly bars aggregated in postgres so only
+    one row per symbol and period is transferred.
+    """
     engine = DatabaseManager.get_engine()
     
-    query = f"""
-    SELECT symbol, date, open, high, low, close, volume
-    FROM ohlcv_data
-    WHERE symbol IN (SELECT symbol FROM coins_metadata)
-      AND date::date >= CURRENT_DATE - INTERVAL '{HISTORY_LIMIT_DAYS} days'
-    ORDER BY symbol, date ASC
-    """
+    if timeframe == "1d":
+        query = DAILY_OHLCV_QUERY
+    else:
+        unit, label_offset = SQL_PERIODS[timeframe]
+        # bars are labelled with the period end, like pandas W / ME resampling
+        query = f"""
+        WITH daily AS (
+            SELECT DISTINCT ON (symbol, date::date)
+                symbol, date::date AS date, open, high, low, close, volume
+            FROM ohlcv_data
+            WHERE {OHLCV_FILTER}
+            ORDER BY symbol, date::date
+        )
+        SELECT
+            symbol,
+            (date_trunc('{unit}', date) + INTERVAL '{label_offset}')::date AS date,
+            (array_agg(open ORDER BY date) FILTER (WHERE open IS NOT NULL))[1] AS open,
+            MAX(high) AS high,
+            MIN(low) AS low,
+            (array_agg(close ORDER BY date DESC) FILTER (WHERE close IS NOT NULL))[1] AS close,
+            COALESCE(SUM(volume), 0) AS volume
+        FROM daily
+        GROUP BY 1, 2
+        ORDER BY symbol, date ASC
+        """
     
     df = pd.read_sql(query, engine)
+    return clean_ohlcv(df)
+
+
+def clean_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
     df["date"] = pd.to_datetime(df["date"])
     df = df.drop_duplicates(subset=["symbol", "date"], keep="last")
     df = df.sort_values(["symbol", "date"])
-    
     return df
 
 
-def build_frames() -> dict[str, pd.DataFrame]:
-    osc_module = load_module("oscillators_module", OSC_PATH)
-    ma_module = load_module("ma_module", MA_PATH)
+def fetch_resampled_ohlcv() -> dict[str, pd.DataFrame]:
+    return {tf: fetch_ohlcv(tf) for tf in SQL_PERIODS}
+
+
+def ohlcv_frame(rows: list[tuple]) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=["symbol", "date"] + OHLCV_COLUMNS)
+    df[OHLCV_COLUMNS] = df[OHLCV_COLUMNS].astype(np.float64)
+    return clean_ohlcv(df)
+
+
+def stream_ohlcv(chunk_rows: int = STREAM_CHUNK_ROWS):
+    """
+    yield daily OHLCV frames holding whole symbols, in (symbol, date) order,
+    from a named server-side cursor. a chunk is cut at the first symbol
+    boundary after chunk_rows rows, so memory stays around chunk_rows (or
+    the largest single coin) instead of the whole dataset.
+    """
+    engine = DatabaseManager.get_engine()
+    raw_conn = engine.raw_connection()
+    try:
+        # named cursor = server-side: rows arrive STREAM_FETCH_ROWS at a time
+        cursor = raw_conn.cursor(name="ohlcv_stream")
+        cursor.itersize = STREAM_FETCH_ROWS
+        cursor.execute(DAILY_OHLCV_QUERY)
+
+        pending = []
+        while True:
+            rows = cursor.fetchmany(STREAM_FETCH_ROWS)
+            if not rows:
+                break
+            pending.extend(rows)
+            if len(pending) < chunk_rows:
+                continue
+
+            # the last symbol may continue in the next fetch, keep it back
+            cut = len(pending)
+            last_symbol = pending[-1][0]
+            while cut > 0 and pending[cut - 1][0] == last_symbol:
+                cut -= 1
+            if cut > 0:
+                yield ohlcv_frame(pending[:cut])
+                pending = pending[cut:]
+
+        if pending:
+            yield ohlcv_frame(pending)
+        cursor.close()
+    finally:
+        raw_conn.close()
+
+
+def compute_frames_streamed(
+    engine: str = DEFAULT_ENGINE,
+    history: bool = False,
+    cache: IndicatorCache | None = None,
+) -> tuple[dict, dict]:
+    """compute indicators chunk by chunk while OHLCV is streamed from the database."""
+    osc_parts, ma_parts = [], []
+    for chunk in stream_ohlcv():
+        if cache is not None:
+            osc_frames, ma_frames = compute_frames_cached(chunk, cache, 1, engine, history)
+        else:
+            osc_frames, ma_frames = compute_engine(chunk, engine, history)
+        osc_parts.append(osc_frames)
+        ma_parts.append(ma_frames)
+    if cache is not None:
+        cache.compact()
+    return concat_frames(osc_parts), concat_frames(ma_parts)
+
+
+def compute_frames(raw_df: pd.DataFrame, resampled: dict[str, pd.DataFrame] | None = None) -> tuple[dict, dict]:
+    """
+    run oscillator and moving-average indicators over the given OHLCV rows.
+    resampled optionally holds weekly/monthly bars already aggregated in SQL.
+    """
+    osc_module, ma_module = get_indicator_modules()
+
+    # resample once per symbol/timeframe and share the bars between both modules
+    resampled = {tf: df.set_index("date") for tf, df in (resampled or {}).items()}
+    bars = BarCache(raw_df.set_index("date"), resampled=resampled)
+
+    osc_frames = osc_module.compute_oscillator_frames(bars)
+    ma_frames = ma_module.compute_moving_average_frames(bars)
+
+    return osc_frames, ma_frames
+
+
+def compute_engine(
+    raw_df: pd.DataFrame,
+    engine: str = DEFAULT_ENGINE,
+    history: bool = False,
+    resampled: dict[str, pd.DataFrame] | None = None,
+) -> tuple[dict, dict]:
+    """compute in this process with the wide engine or the per-symbol modules."""
+    if history or engine == "wide":
+        return compute_frames_wide(raw_df, history=history, resampled=resampled)
+    return compute_frames(raw_df, resampled)
+
+
+def shard_bounds(ends: np.ndarray, n_shards: int) -> list[tuple[int, int]]:
+    """
+    split sorted per-symbol row ranges into contiguous shards of similar row counts.
+    returns (first_symbol, last_symbol_exclusive) index pairs.
+    """
+    n_symbols = len(ends)
+    n_shards = max(1, min(n_shards, n_symbols))
+    targets = ends[-1] * np.arange(1, n_shards) / n_shards
+    cuts = np.unique(np.searchsorted(ends, targets, side="left") + 1)
+    cuts = cuts[(cuts > 0) & (cuts < n_symbols)]
+    edges = np.r_[0, cuts, n_symbols]
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def compute_shard(task: dict) -> tuple[dict, dict]:
+    """
+    worker entry point: attach to the shared OHLCV buffers, rebuild the shard
+    frame from its row offsets and compute indicators for it.
+    """
+    values_shm = shared_memory.SharedMemory(name=task["values_name"])
+    dates_shm = shared_memory.SharedMemory(name=task["dates_name"])
+    try:
+        n_rows = task["n_rows"]
+        start, end = task["start"], task["end"]
+        values = np.ndarray((n_rows, len(OHLCV_COLUMNS)), dtype=np.float64, buffer=values_shm.buf)
+        dates = np.ndarray((n_rows,), dtype=np.int64, buffer=dates_shm.buf)
+
+        # copy the shard out of shared memory before the buffers are released
+        shard_df = pd.DataFrame(np.array(values[start:end]), columns=OHLCV_COLUMNS)
+        shard_df.insert(0, "date", pd.to_datetime(np.array(dates[start:end]), unit="ns"))
+        shard_df.insert(0, "symbol", np.repeat(task["symbols"], task["lengths"]))
+        del values, dates
+    finally:
+        values_shm.close()
+        dates_shm.close()
+
+    return compute_frames(shard_df)
+
+
+def concat_frames(parts: list[dict]) -> dict[str, pd.DataFrame]:
+    frames = {}
+    for tf in ["1d", "1w", "1m"]:
+        tf_parts = [part[tf] for part in parts if not part.get(tf, pd.DataFrame()).empty]
+        frames[tf] = pd.concat(tf_parts, ignore_index=True) if tf_parts else pd.DataFrame()
+    return frames
+
+
+def compute_frames_parallel(raw_df: pd.DataFrame, workers: int, on_result=None) -> tuple[dict, dict]:
+    """
+    shard symbols across a process pool. OHLCV values and dates are placed in
+    shared memory once, workers only receive row offsets and symbol names.
+    on_result(symbols, osc_frames, ma_frames) is called as each shard finishes.
+    """
+    raw_df = raw_df.sort_values(["symbol", "date"], kind="stable").reset_index(drop=True)
+    symbols = raw_df["symbol"].to_numpy()
+    starts, ends = symbol_boundaries(symbols)
+    if len(starts) == 0:
+        return {}, {}
+
+    values = raw_df[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+    dates = raw_df["date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+    values_shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    dates_shm = shared_memory.SharedMemory(create=True, size=max(dates.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=np.float64, buffer=values_shm.buf)[:] = values
+        np.ndarray(dates.shape, dtype=np.int64, buffer=dates_shm.buf)[:] = dates
+
+        tasks = []
+        for first, last in shard_bounds(ends, workers * SHARDS_PER_WORKER):
+            tasks.append({
+                "values_name": values_shm.name,
+                "dates_name": dates_shm.name,
+                "n_rows": len(raw_df),
+                "start": int(starts[first]),
+                "end": int(ends[last - 1]),
+                "symbols": symbols[starts[first:last]].tolist(),
+                "lengths": (ends[first:last] - starts[first:last]).tolist(),
+            })
 
-    raw_df = fetch_ohlcv()
+        osc_parts, ma_parts = [], []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(compute_shard, task): task for task in tasks}
+            for future in as_completed(futures):
+                osc_frames, ma_frames = future.result()
+                if on_result is not None:
+                    on_result(futures[future]["symbols"], osc_frames, ma_frames)
+                osc_parts.append(osc_frames)
+                ma_parts.append(ma_frames)
+    finally:
+        values_shm.close()
+        values_shm.unlink()
+        dates_shm.close()
+        dates_shm.unlink()
 
-    osc_df = raw_df.copy().set_index("date")
+    return concat_frames(osc_parts), concat_frames(ma_parts)
 
-    ma_df = raw_df.rename(columns={
-        "symbol": "Symbol",
-        "date": "Date",
-        "open": "Open",
-        "high": "High",
-        "low": "Low",
-        "close": "Close",
-        "volume": "Volume",
-    }).set_index("Date")
 
-    osc_frames = osc_module.compute_oscillator_frames(osc_df)
-    ma_frames = ma_module.compute_moving_average_frames(ma_df)
+def symbol_batches(raw_df: pd.DataFrame, max_rows: int) -> list[np.ndarray]:
+    """whole-symbol batches of about max_rows rows, for rows sorted by symbol."""
+    symbols = raw_df["symbol"].to_numpy()
+    starts, ends = symbol_boundaries(symbols)
+    if len(starts) == 0:
+        return []
+    n_batches = -(-int(ends[-1]) // max_rows)
+    return [symbols[starts[first:last]] for first, last in shard_bounds(ends, n_batches)]
 
+
+def compute_frames_cached(
+    raw_df: pd.DataFrame,
+    cache: IndicatorCache,
+    workers: int = DEFAULT_WORKERS,
+    engine: str = DEFAULT_ENGINE,
+    history: bool = False,
+    resampled: dict[str, pd.DataFrame] | None = None,
+) -> tuple[dict, dict]:
+    """
+    reuse cached rows of symbols whose OHLCV is unchanged and compute the
+    rest, storing every finished batch (or pool shard) right away.
+    """
+    raw_df = raw_df.sort_values(["symbol", "date"], kind="stable").reset_index(drop=True)
+    keys = symbol_keys(raw_df, config_version(history, engine))
+    hits = cache.hits(keys)
+    missing_df = raw_df[~raw_df["symbol"].isin(hits.index)]
+    print(f"Indicator cache: {len(hits)} of {len(keys)} symbols cached")
+
+    osc_parts, ma_parts = [], []
+    if len(hits):
+        osc_frames, ma_frames = cache.load(hits)
+        osc_parts.append(osc_frames)
+        ma_parts.append(ma_frames)
+
+    def store(symbols, osc_frames, ma_frames):
+        cache.store(keys[list(symbols)], osc_frames, ma_frames)
+        osc_parts.append(osc_frames)
+        ma_parts.append(ma_frames)
+
+    if workers > 1 and engine != "wide" and not history:
+        compute_frames_parallel(missing_df, workers, on_result=store)
+    else:
+        for symbols in symbol_batches(missing_df, CACHE_BATCH_ROWS):
+            batch_df = missing_df[missing_df["symbol"].isin(symbols)]
+            batch_resampled = None
+            if resampled is not None:
+                batch_resampled = {tf: df[df["symbol"].isin(symbols)] for tf, df in resampled.items()}
+            store(symbols, *compute_engine(batch_df, engine, history, batch_resampled))
+
+    return concat_frames(osc_parts), concat_frames(ma_parts)
+
+
+def merge_frames(osc_frames: dict, ma_frames: dict) -> dict[str, pd.DataFrame]:
     # merge and normalize for each timeframe
     merged_frames = {}
     for tf in ["1d", "1w", "1m"]:
@@ -141,11 +456,56 @@ def build_frames() -> dict[str, pd.DataFrame]:
     return merged_frames
 
 
-def save_outputs(frames: dict[str, pd.DataFrame]):
-    engine = DatabaseManager.get_engine()
-    
-    period_map = {"1d": "DAY", "1w": "WEEK", "1m": "MONTH"}
-    
+def build_frames(
+    workers: int = DEFAULT_WORKERS,
+    engine: str = DEFAULT_ENGINE,
+    history: bool = False,
+    raw_df: pd.DataFrame | None = None,
+    sql_resample: bool = SQL_RESAMPLE,
+    stream: bool = STREAM_OHLCV,
+    use_cache: bool = CACHE_ENABLED,
+) -> dict[str, pd.DataFrame]:
+    """
+    latest indicator row per symbol and timeframe, or the full series when
+    history is set (always computed with the wide engine and so with the
+    native kernels whatever TA_INDICATOR_BACKEND says; the per-symbol
+    modules only keep their last row).
+
+    with sql_resample, weekly/monthly bars come from postgres; the process
+    pool still resamples the daily rows of its shards itself.
+    with stream (and no raw_df), OHLCV is streamed and computed chunk by
+    chunk in this process; workers and sql_resample do not apply.
+    with use_cache, symbols whose OHLCV did not change since the last run
+    are read from the indicator cache instead of being recomputed.
+    """
+    cache = None
+    if use_cache and not PARQUET_AVAILABLE:
+        print("Indicator cache disabled: pyarrow is not installed")
+    elif use_cache:
+        cache = IndicatorCache(CACHE_DIR / ("history" if history else "latest"))
+
+    if raw_df is None and stream:
+        return merge_frames(*compute_frames_streamed(engine, history, cache))
+
+    if raw_df is None:
+        raw_df = fetch_ohlcv()
+    resampled = fetch_resampled_ohlcv() if sql_resample else None
+
+    if cache is not None:
+        osc_frames, ma_frames = compute_frames_cached(raw_df, cache, workers, engine, history, resampled)
+        cache.compact()
+    elif history or engine == "wide":
+        osc_frames, ma_frames = compute_engine(raw_df, engine, history, resampled)
+    elif workers > 1:
+        osc_frames, ma_frames = compute_frames_parallel(raw_df, workers)
+    else:
+        osc_frames, ma_frames = compute_frames(raw_df, resampled)
+
+    return merge_frames(osc_frames, ma_frames)
+
+
+def prepare_output(frames: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """stack the timeframe frames into the technical_analysis table layout."""
     all_frames = []
     for tf, df in frames.items():
         if df.empty:
@@ -155,36 +515,173 @@ def save_outputs(frames: dict[str, pd.DataFrame]):
         df = df.copy()
         df["Date"] = pd.to_datetime(df["Date"]).dt.date
         
-        df["period"] = period_map[tf]
+        df["period"] = PERIOD_MAP[tf]
         
         df.columns = [c.lower() for c in df.columns]
         
         all_frames.append(df)
     
     if not all_frames:
-        print("No data to save.")
-        return
+        return pd.DataFrame()
     
     combined_df = pd.concat(all_frames, ignore_index=True)
     combined_df.drop(columns=['osc_raw_score_osc', 'ma_raw_score_ma', 'ma_volume_multiplier'], 
                      inplace=True, errors='ignore')
+    return combined_df
+
+
+def copy_into(cursor, df: pd.DataFrame, table_name: str):
+    """bulk load a frame into an existing table with postgres COPY."""
+    output = io.StringIO()
+    df.to_csv(output, index=False, header=False)
+    output.seek(0)
+    columns = ", ".join(f'"{c}"' for c in df.columns)
+    cursor.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT CSV)", output)
+
+
+def publish_table(df: pd.DataFrame, table_name: str, indexes: list[tuple[str, ...]], engine):
+    """
+    replace a table without readers ever seeing it missing or half filled:
+    COPY into a staging table, build its primary key and indexes, then drop
+    the old table and rename the staging one in a single short transaction.
+    """
+    staging = f"{table_name}_staging"
+    index_names = {columns: f"{'_'.join(columns)}_idx" for columns in indexes}
+
+    df.head(0).to_sql(staging, engine, if_exists="replace", index=False, dtype={"date": Date()})
+
+    raw_conn = engine.raw_connection()
+    try:
+        cursor = raw_conn.cursor()
+        copy_into(cursor, df, staging)
+        cursor.execute(f"ALTER TABLE {staging} ADD CONSTRAINT {staging}_pkey PRIMARY KEY (id)")
+        for columns, name in index_names.items():
+            cursor.execute(f"CREATE INDEX {staging}_{name} ON {staging} ({', '.join(columns)})")
+        cursor.execute(f"ANALYZE {staging}")
+        raw_conn.commit()
+
+        cursor.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+        cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+        cursor.execute(f"ALTER TABLE {staging} RENAME TO {table_name}")
+        cursor.execute(f"ALTER TABLE {table_name} RENAME CONSTRAINT {staging}_pkey TO {table_name}_pkey")
+        for name in index_names.values():
+            cursor.execute(f"ALTER INDEX {staging}_{name} RENAME TO {table_name}_{name}")
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+
+
+def save_outputs(frames: dict[str, pd.DataFrame]):
+    engine = DatabaseManager.get_engine()
+    
+    combined_df = prepare_output(frames)
+    if combined_df.empty:
+        print("No data to save.")
+        return
+    
     combined_df.insert(0, "id", range(1, len(combined_df) + 1))
     
-    combined_df.to_sql("technical_analysis", engine, if_exists="replace", index=False, chunksize=10000)
+    publish_table(combined_df, OUTPUT_TABLE, OUTPUT_INDEXES, engine)
     
-    print(f"Saved {len(combined_df)} rows with {len(combined_df.columns)} columns to 'technical_analysis'")
+    # cross-sectional ranks for the screening endpoint, published the same way
+    publish_table(build_screen(combined_df), SCREEN_TABLE, SCREEN_INDEXES, engine)
+    
+    print(f"Saved {len(combined_df)} rows with {len(combined_df.columns)} columns to '{OUTPUT_TABLE}'")
     print(f"  - DAY: {len(combined_df[combined_df['period'] == 'DAY'])} rows")
     print(f"  - WEEK: {len(combined_df[combined_df['period'] == 'WEEK'])} rows")
     print(f"  - MONTH: {len(combined_df[combined_df['period'] == 'MONTH'])} rows")
 
 
+def new_history_rows(df: pd.DataFrame, engine) -> pd.DataFrame:
+    """
+    keep only rows on or after the last stored date per (symbol, period).
+    the last stored row is rewritten because the current week/month bar
+    (and its indicators) keeps changing until the period closes.
+    """
+    last = pd.read_sql(
+        f"SELECT symbol, period, MAX(date) AS last_date FROM {HISTORY_TABLE} GROUP BY symbol, period",
+        engine,
+    )
+    if last.empty:
+        return df
+
+    df = df.merge(last, on=["symbol", "period"], how="left")
+    last_date = pd.to_datetime(df.pop("last_date"))
+    return df[last_date.isna() | (pd.to_datetime(df["date"]) >= last_date)]
+
+
+def save_history(frames: dict[str, pd.DataFrame]):
+    """append new dates to technical_analysis_history, upserting on (symbol, period, date)."""
+    engine = DatabaseManager.get_engine()
+
+    combined_df = prepare_output(frames)
+    if combined_df.empty:
+        print("No history to save.")
+        return
+
+    # creates the table on the first run, no-op afterwards
+    combined_df.head(0).to_sql(HISTORY_TABLE, engine, if_exists="append", index=False, dtype={"date": Date()})
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {HISTORY_TABLE}_key ON {HISTORY_TABLE} (symbol, period, date)"
+        ))
+
+    new_df = new_history_rows(combined_df, engine)
+    if new_df.empty:
+        print("History is up to date.")
+        return
+
+    columns = ", ".join(f'"{c}"' for c in new_df.columns)
+    updates = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in new_df.columns if c not in HISTORY_KEY)
+
+    raw_conn = engine.raw_connection()
+    try:
+        cursor = raw_conn.cursor()
+        cursor.execute(f"CREATE TEMP TABLE history_batch (LIKE {HISTORY_TABLE}) ON COMMIT DROP")
+        copy_into(cursor, new_df, "history_batch")
+        cursor.execute(f"""
+            INSERT INTO {HISTORY_TABLE} ({columns})
+            SELECT {columns} FROM history_batch
+            ON CONFLICT (symbol, period, date) DO UPDATE SET {updates}
+        """)
+        raw_conn.commit()
+    finally:
+        raw_conn.close()
+
+    print(f"Upserted {len(new_df)} of {len(combined_df)} rows into '{HISTORY_TABLE}'")
+
+
 def main():
+    # streamed runs read OHLCV again for the history pass instead of holding it
+    raw_df = None if STREAM_OHLCV else fetch_ohlcv()
+
+    # history only exists for the wide engine (native kernels); with it on, the
+    # latest rows use the same engine so each technical_analysis row equals the
+    # last history row of its symbol (the library backend computes CCI differently)
+    engine = DEFAULT_ENGINE
+    if HISTORY_ENABLED:
+        ignored = [
+            f"{name}={os.environ[name]}"
+            for name, used in (("TA_ENGINE", "wide"), ("TA_INDICATOR_BACKEND", "native"))
+            if os.getenv(name, used) != used
+        ]
+        if ignored:
+            print(f"TA_HISTORY=1 computes all rows with the wide engine and native kernels, ignoring {', '.join(ignored)}")
+        engine = "wide"
+
     print("Building technical analysis frames...")
-    frames = build_frames()
+    frames = build_frames(raw_df=raw_df, engine=engine)
     
     print("\nSaving to database...")
     save_outputs(frames)
 
+    if HISTORY_ENABLED:
+        print("\nUpdating technical analysis history...")
+        save_history(build_frames(history=True, raw_df=raw_df))
+
 
 if __name__ == "__main__":
     main()
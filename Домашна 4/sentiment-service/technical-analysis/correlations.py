@@ -0,0 +1,316 @@
+"""
+Rolling 30/90-day return correlations between all tracked coins.
+
+For each window the job keeps the pairwise sufficient statistics of the
+last `window` daily returns as N x N matrices (joint observation counts,
+sums, sums of squares and cross products over the days both coins have a
+return). A new day is a rank-1 update: add that day's outer products and
+subtract those of the day leaving the window, O(N^2) per day with no
+window ever re-read. The state is saved between runs so the daily job only
+applies the days since the last run; it is rebuilt from scratch (one
+matrix product over the window, reading only the last max(windows) + 1
+days of closes) when there is no usable state, the
+tracked universe (coins_metadata) changes or every REBUILD_AFTER_UPDATES
+updates to shed rounding drift. Coins of the universe without recent bars
+stay in the state with NaN returns, so they add nothing to any pair.
+
+Only the top-k most correlated peers per symbol are stored
+(coin_correlations table). Correlations are evaluated in row blocks, so
+beyond the statistics themselves no dense N x N x window array exists.
+
+Usage:
+    python correlations.py
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from combine_signals import DatabaseManager, OHLCV_FILTER, publish_table
+
+
+BASE_DIR = Path(__file__).parent
+STATE_DIR = Path(os.getenv("TA_CACHE_DIR", BASE_DIR / ".cache"))
+
+WINDOWS = (30, 90)
+TOP_K = int(os.getenv("CORRELATION_TOP_K", "10"))
+# pairs need this share of the window as joint observations
+MIN_OVERLAP = 2 / 3
+REBUILD_AFTER_UPDATES = 30
+BLOCK_ROWS = 256
+
+OUTPUT_TABLE = "coin_correlations"
+OUTPUT_INDEXES = [("symbol", "window_days")]
+
+
+class CorrelationState:
+    """pairwise sufficient statistics of the returns in a sliding window."""
+
+    def __init__(self, window: int, symbols: np.ndarray):
+        n = len(symbols)
+        self.window = window
+        self.symbols = symbols
+        self.count = np.zeros((n, n))
+        self.sums = np.zeros((n, n))      # [i, j] = sum of x_i over days i and j both have a return
+        self.squares = np.zeros((n, n))   # [i, j] = sum of x_i^2 over the same days
+        self.cross = np.zeros((n, n))     # [i, j] = sum of x_i * x_j
+        self.returns = np.empty((0, n))   # the window's rows, oldest first (NaN = no return)
+        self.dates = pd.DatetimeIndex([])
+        self.last_close = np.full(n, np.nan)
+        self.updates = 0
+
+    @classmethod
+    def build(cls, window: int, symbols: np.ndarray, dates: pd.DatetimeIndex, returns: np.ndarray, last_close: np.ndarray):
+        """state for the last `window` rows, from one matrix product per statistic."""
+        state = cls(window, symbols)
+        rows = returns[-window:]
+        present = ~np.isnan(rows)
+        values = np.where(present, rows, 0.0)
+        weights = present.astype(np.float64)
+
+        state.count = weights.T @ weights
+        state.sums = values.T @ weights
+        state.squares = (values ** 2).T @ weights
+        state.cross = values.T @ values
+        state.returns = rows.copy()
+        state.dates = dates[-window:]
+        state.last_close = last_close.copy()
+        return state
+
+    def _apply(self, row: np.ndarray, sign: float):
+        present = ~np.isnan(row)
+        values = np.where(present, row, 0.0)
+        weights = present.astype(np.float64)
+        self.count += sign * np.outer(weights, weights)
+        self.sums += sign * np.outer(values, weights)
+        self.squares += sign * np.outer(values ** 2, weights)
+        self.cross += sign * np.outer(values, values)
+
+    def push(self, date: pd.Timestamp, row: np.ndarray):
+        """slide the window by one day."""
+        self._apply(row, 1.0)
+        self.returns = np.vstack([self.returns, row[None]])
+        self.dates = self.dates.append(pd.DatetimeIndex([date]))
+        if len(self.returns) > self.window:
+            self._apply(self.returns[0], -1.0)
+            self.returns = self.returns[1:]
+            self.dates = self.dates[1:]
+        self.updates += 1
+
+    def correlation_rows(self, start: int, stop: int) -> np.ndarray:
+        """pearson correlation of rows start:stop against every symbol, NaN for thin overlaps."""
+        count = self.count[start:stop]
+        sums = self.sums[start:stop]
+        peer_sums = self.sums.T[start:stop]
+        peer_squares = self.squares.T[start:stop]
+
+        covariance = count * self.cross[start:stop] - sums * peer_sums
+        variance = count * self.squares[start:stop] - sums ** 2
+        peer_variance = count * peer_squares - peer_sums ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = covariance / np.sqrt(variance * peer_variance)
+
+        corr[count < np.ceil(MIN_OVERLAP * self.window)] = np.nan
+        corr[np.arange(stop - start), np.arange(start, stop)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+    def top_peers(self, k: int = TOP_K) -> pd.DataFrame:
+        """the k most correlated peers of every symbol."""
+        frames = []
+        for start in range(0, len(self.symbols), BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, len(self.symbols))
+            corr = self.correlation_rows(start, stop)
+            ranked = np.where(np.isnan(corr), -np.inf, corr)
+
+            kk = min(k, corr.shape[1])
+            top = np.argpartition(-ranked, kk - 1, axis=1)[:, :kk]
+            top_corr = np.take_along_axis(ranked, top, axis=1)
+            order = np.argsort(-top_corr, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_corr = np.take_along_axis(top_corr, order, axis=1)
+
+            rows, ranks = np.nonzero(np.isfinite(top_corr))
+            frames.append(pd.DataFrame({
+                "symbol": self.symbols[start + rows],
+                "peer_rank": ranks + 1,
+                "peer": self.symbols[top[rows, ranks]],
+                "correlation": top_corr[rows, ranks],
+                "overlap_days": self.count[start + rows, top[rows, ranks]].astype(np.int64),
+            }))
+
+        if not frames:
+            frames = [pd.DataFrame(columns=["symbol", "peer_rank", "peer", "correlation", "overlap_days"])]
+        peers = pd.concat(frames, ignore_index=True)
+        peers.insert(0, "date", self.dates[-1].date() if len(self.dates) else None)
+        peers.insert(2, "window_days", self.window)
+        return peers
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            window=self.window,
+            symbols=self.symbols.astype(str),
+            count=self.count,
+            sums=self.sums,
+            squares=self.squares,
+            cross=self.cross,
+            returns=self.returns,
+            dates=self.dates.to_numpy(dtype="datetime64[ns]"),
+            last_close=self.last_close,
+            updates=self.updates,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "CorrelationState | None":
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            state = cls(int(data["window"]), data["symbols"])
+            state.count = data["count"]
+            state.sums = data["sums"]
+            state.squares = data["squares"]
+            state.cross = data["cross"]
+            state.returns = data["returns"]
+            state.dates = pd.DatetimeIndex(data["dates"])
+            state.last_close = data["last_close"]
+            state.updates = int(data["updates"])
+        return state
+
+
+def close_matrix(df: pd.DataFrame, symbols: np.ndarray | None = None) -> pd.DataFrame:
+    """pivot (symbol, date, close) rows into a daily dates x symbols close matrix (no rows if df is empty)."""
+    df = df.drop_duplicates(subset=["symbol", "date"], keep="last")
+    closes = df.pivot(index="date", columns="symbol", values="close").sort_index(axis=0).sort_index(axis=1)
+    if len(closes):
+        closes = closes.reindex(pd.date_range(closes.index[0], closes.index[-1], freq="D"))
+    if symbols is not None:
+        closes = closes.reindex(columns=symbols)
+    return closes
+
+
+def daily_returns(closes: np.ndarray, previous_close: np.ndarray | None = None) -> np.ndarray:
+    """simple returns, NaN unless both the bar and the previous day have a close."""
+    if previous_close is None:
+        previous_close = np.full(closes.shape[1], np.nan)
+    previous = np.vstack([previous_close[None], closes[:-1]])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = closes / previous - 1.0
+    return np.where(np.isfinite(returns), returns, np.nan)
+
+
+def fetch_universe() -> np.ndarray:
+    """the tracked coins, sorted like the columns of close_matrix."""
+    engine = DatabaseManager.get_engine()
+    df = pd.read_sql(text("SELECT DISTINCT symbol FROM coins_metadata"), engine)
+    return np.sort(df["symbol"].dropna().astype(str).unique())
+
+
+def fetch_latest_date() -> pd.Timestamp | None:
+    """the last day any tracked coin has a bar, None without bars."""
+    engine = DatabaseManager.get_engine()
+    df = pd.read_sql(text(f"SELECT MAX(date::date) AS date FROM ohlcv_data WHERE {OHLCV_FILTER}"), engine)
+    latest = df["date"].iloc[0]
+    return None if pd.isna(latest) else pd.Timestamp(latest)
+
+
+def fetch_closes(since: pd.Timestamp | None = None) -> pd.DataFrame:
+    """daily closes of the tracked coins, optionally only from `since` on."""
+    engine = DatabaseManager.get_engine()
+    params = {}
+    since_filter = ""
+    if since is not None:
+        since_filter = "AND date::date >= CAST(:since AS DATE)"
+        params["since"] = since.date().isoformat()
+    query = f"""
+    SELECT symbol, date::date AS date, close
+    FROM ohlcv_data
+    WHERE {OHLCV_FILTER} {since_filter}
+    ORDER BY symbol, date ASC
+    """
+    df = pd.read_sql(text(query), engine, params=params)
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def can_update(state: CorrelationState | None, universe: np.ndarray) -> bool:
+    """whether the saved state can be slid forward for the tracked universe."""
+    if state is None or len(state.dates) == 0 or state.updates >= REBUILD_AFTER_UPDATES:
+        return False
+    return np.array_equal(state.symbols, universe)
+
+
+def rebuild_state(window: int, closes_df: pd.DataFrame, universe: np.ndarray) -> CorrelationState:
+    """state for the last `window` days of the closes; an empty state without closes."""
+    closes = close_matrix(closes_df, universe)
+    if closes.empty:
+        return CorrelationState(window, universe)
+    returns = daily_returns(closes.to_numpy())
+    return CorrelationState.build(window, closes.columns.to_numpy(), closes.index, returns, closes.to_numpy()[-1])
+
+
+def update_state(state: CorrelationState, closes_df: pd.DataFrame) -> CorrelationState:
+    """slide the state over the days after its last date; coins without bars get NaN returns."""
+    if closes_df.empty:
+        return state
+    closes = close_matrix(closes_df, state.symbols)
+    # every day after the state's last one, including days no coin has a bar
+    new = closes.reindex(pd.date_range(state.dates[-1] + pd.Timedelta(days=1), closes.index[-1], freq="D"))
+    returns = daily_returns(new.to_numpy(), state.last_close)
+    for date, row in zip(new.index, returns):
+        state.push(date, row)
+    if len(new):
+        # like a rebuild, a missing bar leaves no return for the day after it
+        state.last_close = new.to_numpy()[-1]
+    return state
+
+
+def state_path(window: int) -> Path:
+    return STATE_DIR / f"correlation_{window}.npz"
+
+
+def run_correlations(windows=WINDOWS, k: int = TOP_K) -> pd.DataFrame:
+    """update (or rebuild) every window's state and return the top-k peers."""
+    states = {w: CorrelationState.load(state_path(w)) for w in windows}
+    universe = fetch_universe()
+
+    # an update only needs the days since the oldest saved state
+    last_dates = [s.dates[-1] for s in states.values() if s is not None and len(s.dates)]
+    recent = fetch_closes(min(last_dates)) if last_dates else None
+    full = None
+
+    peers = []
+    for w in windows:
+        if recent is not None and can_update(states[w], universe):
+            state = update_state(states[w], recent)
+            print(f"  {w}d window: updated to {state.dates[-1].date()} ({state.updates} day(s) since the last rebuild)")
+        else:
+            if full is None:
+                # a window's returns need its days and the close of the day before
+                latest = fetch_latest_date()
+                full = fetch_closes(latest - pd.Timedelta(days=max(windows)) if latest is not None else None)
+            state = rebuild_state(w, full, universe)
+            print(f"  {w}d window: rebuilt for {len(state.symbols)} symbols")
+        state.save(state_path(w))
+        peers.append(state.top_peers(k))
+
+    return pd.concat(peers, ignore_index=True)
+
+
+def main():
+    print("Computing rolling correlations...")
+    peers = run_correlations()
+    if peers.empty:
+        print("No correlations to save.")
+        return
+    peers.insert(0, "id", range(1, len(peers) + 1))
+
+    publish_table(peers, OUTPUT_TABLE, OUTPUT_INDEXES, DatabaseManager.get_engine())
+    print(f"Saved {len(peers)} peer rows to '{OUTPUT_TABLE}'")
+
+
+if __name__ == "__main__":
+    main()
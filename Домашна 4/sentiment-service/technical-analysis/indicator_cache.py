@@ -0,0 +1,262 @@
+"""
+Content-keyed on-disk cache of per-symbol indicator rows.
+
+A symbol's key is a hash of (symbol, last bar date, row count, content hash
+of its OHLCV rows, indicator config version); cached rows are stored per
+timeframe next to it. The config version changes with CACHE_VERSION, the
+indicator backend that computed the rows, history mode and the source of the indicator code, so
+editing an indicator invalidates everything computed with the old one.
+
+Results are written to Parquet segments as soon as a batch of symbols is
+computed, so a rerun after a partial failure reuses the finished batches.
+compact() rewrites the segments into one file per kind keeping only the
+rows of the current keys, which also evicts delisted or changed symbols.
+
+Segments are sorted by symbol and written in row groups, and every segment
+has a manifest of its keys. load() only opens the segments whose manifest
+holds a wanted key and lets pyarrow skip the row groups outside the wanted
+symbol range, so a streamed chunk reads about its own rows instead of the
+whole cache. compact() copies the segments one at a time.
+"""
+
+import hashlib
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+BASE_DIR = Path(__file__).parent
+CACHE_DIR = Path(os.getenv("TA_CACHE_DIR", BASE_DIR / ".cache")) / "indicators"
+CACHE_ENABLED = os.getenv("TA_INDICATOR_CACHE", "0") == "1"
+
+# bump when cached rows must not be reused although no indicator source changed
+CACHE_VERSION = "1"
+SOURCE_FILES = [
+    BASE_DIR / "oscilators" / "script.py",
+    BASE_DIR / "moving-averages" / "script.py",
+    BASE_DIR / "kernels.py",
+    BASE_DIR / "scoring.py",
+    BASE_DIR / "resampling.py",
+    BASE_DIR / "wide_engine.py",
+]
+KINDS = ("osc", "ma")
+TIMEFRAMES = ("1d", "1w", "1m")
+KEY_COLUMN = "cache_key"
+TIMEFRAME_COLUMN = "cache_timeframe"
+# the oscillator frames use lowercase columns, the moving-average ones capitalized
+SYMBOL_COLUMNS = {"osc": "symbol", "ma": "Symbol"}
+DATE_COLUMNS = {"osc": "date", "ma": "Date"}
+# rows per parquet row group, the unit load() can skip
+ROW_GROUP_ROWS = int(os.getenv("TA_CACHE_ROW_GROUP_ROWS", "20000"))
+
+
+def effective_backend(engine: str = "loop", history: bool = False) -> str:
+    """kernels that compute the rows: the wide engine (and so history mode) always uses the native ones."""
+    if history or engine == "wide":
+        return "native"
+    return os.getenv("TA_INDICATOR_BACKEND", "library")
+
+
+def config_version(history: bool = False, engine: str = "loop") -> str:
+    """version string for the indicator code and settings that produce the rows."""
+    digest = hashlib.sha1(CACHE_VERSION.encode())
+    digest.update(effective_backend(engine, history).encode())
+    digest.update(b"history" if history else b"latest")
+    for path in SOURCE_FILES:
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def symbol_keys(raw_df: pd.DataFrame, version: str) -> pd.Series:
+    """cache key per symbol of long-format daily OHLCV rows."""
+    columns = ["date", "open", "high", "low", "close", "volume"]
+    row_hashes = pd.util.hash_pandas_object(raw_df[columns], index=False).to_numpy()
+    stats = pd.DataFrame({
+        "symbol": raw_df["symbol"].to_numpy(),
+        "date": raw_df["date"].to_numpy(),
+        "row_hash": row_hashes,
+    }).groupby("symbol", sort=True).agg(
+        last_date=("date", "max"),
+        rows=("date", "size"),
+        # order independent and wraps around on overflow
+        content=("row_hash", lambda h: int(np.bitwise_xor.reduce(h.to_numpy()) ^ np.sum(h.to_numpy(), dtype=np.uint64))),
+    )
+
+    keys = [
+        hashlib.sha1(f"{symbol}|{row.last_date}|{row.rows}|{row.content}|{version}".encode()).hexdigest()
+        for symbol, row in stats.iterrows()
+    ]
+    return pd.Series(keys, index=stats.index, name=KEY_COLUMN)
+
+
+def symbol_column(df: pd.DataFrame) -> str:
+    return "symbol" if "symbol" in df.columns else "Symbol"
+
+
+def first_symbol(path: Path, kind: str) -> str:
+    """smallest symbol of a segment (segments are written sorted by symbol)."""
+    segment = pq.ParquetFile(path)
+    if segment.metadata.num_row_groups == 0:
+        return ""
+    return segment.read_row_group(0, columns=[SYMBOL_COLUMNS[kind]]).column(0)[0].as_py()
+
+
+def unified_schema(paths: list[Path]) -> "pa.Schema":
+    """
+    schema holding the columns of every segment (a segment of short-history
+    symbols can lack some indicator columns), numeric types widened to fit.
+    """
+    schemas = [pq.read_schema(path).remove_metadata() for path in paths]
+    return pa.unify_schemas(schemas, promote_options="permissive")
+
+
+def conform(table: "pa.Table", schema: "pa.Schema") -> "pa.Table":
+    """the table with the schema's columns in its order, missing ones null."""
+    columns = [
+        table.column(field.name).cast(field.type) if field.name in table.column_names
+        else pa.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class IndicatorCache:
+    """parquet segments of indicator rows, looked up by symbol key."""
+
+    def __init__(self, directory: Path = CACHE_DIR):
+        self.directory = Path(directory)
+        # keys looked up by this run, everything else is dropped by compact()
+        self.live_keys = set()
+        # segment id -> its stored keys, read from the manifests on first use
+        self._segment_keys = None
+
+    def _segments(self, kind: str) -> list[Path]:
+        return sorted(self.directory.glob(f"{kind}-*.parquet"))
+
+    def _manifests(self) -> list[Path]:
+        return sorted(self.directory.glob("keys-*.parquet"))
+
+    def segment_keys(self) -> dict[str, set[str]]:
+        if self._segment_keys is None:
+            self._segment_keys = {
+                path.stem.removeprefix("keys-"): set(pd.read_parquet(path)[KEY_COLUMN])
+                for path in self._manifests()
+            }
+        return self._segment_keys
+
+    def cached_keys(self) -> set[str]:
+        """keys whose rows are fully stored (a symbol may have no rows for a timeframe)."""
+        return set().union(*self.segment_keys().values())
+
+    def hits(self, keys: pd.Series) -> pd.Series:
+        """the part of a symbol -> key series that is cached."""
+        self.live_keys.update(keys)
+        return keys[keys.isin(self.cached_keys())]
+
+    def load(self, keys: pd.Series) -> tuple[dict, dict]:
+        """osc and ma frames per timeframe for the given symbol -> key series."""
+        wanted = set(keys)
+        segments = [segment for segment, stored in self.segment_keys().items() if not stored.isdisjoint(wanted)]
+        frames = []
+        for kind in KINDS:
+            symbol = SYMBOL_COLUMNS[kind]
+            filters = [
+                (symbol, ">=", str(keys.index.min())),
+                (symbol, "<=", str(keys.index.max())),
+                (KEY_COLUMN, "in", sorted(wanted)),
+            ] if wanted else None
+            parts = []
+            for segment in segments:
+                path = self.directory / f"{kind}-{segment}.parquet"
+                if path.exists():
+                    parts.append(pd.read_parquet(path, filters=filters))
+            stored = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+            if not stored.empty:
+                # a key can only be in several segments after an interrupted compaction
+                stored = stored.drop_duplicates(
+                    subset=[KEY_COLUMN, TIMEFRAME_COLUMN, symbol, DATE_COLUMNS[kind]],
+                    keep="last",
+                )
+
+            by_tf = {}
+            for tf in TIMEFRAMES:
+                if stored.empty:
+                    by_tf[tf] = pd.DataFrame()
+                    continue
+                rows = stored[stored[TIMEFRAME_COLUMN] == tf]
+                by_tf[tf] = rows.drop(columns=[KEY_COLUMN, TIMEFRAME_COLUMN]).reset_index(drop=True)
+            frames.append(by_tf)
+        return frames[0], frames[1]
+
+    def store(self, keys: pd.Series, osc_frames: dict, ma_frames: dict):
+        """write one segment per kind for freshly computed symbols, then their manifest."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        segment = uuid.uuid4().hex
+
+        for kind, frames in zip(KINDS, (osc_frames, ma_frames)):
+            parts = []
+            for tf in TIMEFRAMES:
+                df = frames.get(tf, pd.DataFrame())
+                if df.empty:
+                    continue
+                df = df.copy()
+                df[TIMEFRAME_COLUMN] = tf
+                df[KEY_COLUMN] = df[symbol_column(df)].map(keys)
+                parts.append(df)
+            if parts:
+                rows = pd.concat(parts, ignore_index=True).sort_values(SYMBOL_COLUMNS[kind], kind="stable")
+                rows.to_parquet(self.directory / f"{kind}-{segment}.parquet", index=False, row_group_size=ROW_GROUP_ROWS)
+
+        # written last: a key is only a hit once all of its rows are on disk
+        pd.DataFrame({KEY_COLUMN: keys.to_numpy()}).to_parquet(self.directory / f"keys-{segment}.parquet", index=False)
+        self.segment_keys()[segment] = set(keys)
+
+    def compact(self):
+        """
+        merge all segments into one per kind holding only the keys of this
+        run. segments are copied one at a time in order of their first
+        symbol, so the result stays (mostly) sorted by symbol without
+        holding the whole cache in memory. skipped when the cache already is
+        a single segment holding exactly the keys of this run.
+        """
+        manifests = self._manifests()
+        segments = {kind: self._segments(kind) for kind in KINDS}
+        stored = self.cached_keys()
+        live = self.live_keys & stored
+        if len(manifests) <= 1 and all(len(paths) <= 1 for paths in segments.values()) and live == stored:
+            return
+
+        old = manifests + [path for paths in segments.values() for path in paths]
+        segment = uuid.uuid4().hex
+        for kind in KINDS:
+            if not live or not segments[kind]:
+                continue
+            schema = unified_schema(segments[kind])
+            writer = None
+            try:
+                for path in sorted(segments[kind], key=lambda p: first_symbol(p, kind)):
+                    rows = pq.read_table(path, filters=[(KEY_COLUMN, "in", sorted(live))])
+                    if rows.num_rows == 0:
+                        continue
+                    if writer is None:
+                        writer = pq.ParquetWriter(self.directory / f"{kind}-{segment}.parquet", schema)
+                    writer.write_table(conform(rows, schema), row_group_size=ROW_GROUP_ROWS)
+            finally:
+                if writer is not None:
+                    writer.close()
+        pd.DataFrame({KEY_COLUMN: sorted(live)}).to_parquet(self.directory / f"keys-{segment}.parquet", index=False)
+        self._segment_keys = {segment: live}
+
+        for path in old:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,382 @@
+"""
+NumPy indicator kernels used as a lightweight alternative to pandas_ta and ta.
+
+Every kernel takes float arrays and works along axis 0, so the same code
+handles a single coin (1-D array of bars) and many coins at once (2-D
+dates x symbols matrix). NaN marks missing bars; the recursive averages follow
+pandas' ewm(adjust=False) NaN handling so results match the libraries.
+
+Defaults mirror how the indicator modules call the libraries:
+    sma / ema / wma / bollinger  ->  ta (window semantics, min_periods = window)
+    rsi / macd / stoch / adx     ->  pandas_ta (rma smoothing, sma-seeded ema)
+    cci                          ->  ta (standard (tp - sma) / (c * mad))
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+EPSILON = np.finfo(float).eps
+
+
+def as_float_array(x) -> np.ndarray:
+    return np.asarray(x, dtype=np.float64)
+
+
+def _nan_like(x: np.ndarray) -> np.ndarray:
+    return np.full(x.shape, np.nan)
+
+
+def shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    """shift values down along axis 0, filling the head with NaN."""
+    x = as_float_array(x)
+    out = _nan_like(x)
+    if periods < len(x):
+        out[periods:] = x[:len(x) - periods]
+    return out
+
+
+def first_valid_index(x: np.ndarray) -> np.ndarray:
+    """index of the first non-NaN value per column (len(x) for all-NaN columns)."""
+    valid = ~np.isnan(x)
+    first = np.argmax(valid, axis=0)
+    return np.where(valid.any(axis=0), first, len(x))
+
+
+def _windows(x: np.ndarray, n: int) -> np.ndarray | None:
+    """rolling windows along axis 0 with the window as the last axis, None if too short."""
+    if n < 1 or len(x) < n:
+        return None
+    return sliding_window_view(x, n, axis=0)
+
+
+def require_bars(out: np.ndarray, x: np.ndarray, min_bars: int) -> np.ndarray:
+    """blank columns with fewer than min_bars observations (pandas_ta returns None for those)."""
+    x2 = x.reshape(len(x), -1)
+    short = (~np.isnan(x2)).sum(axis=0) < min_bars
+    if short.any():
+        out = out.copy()
+        out.reshape(len(out), -1)[:, short] = np.nan
+    return out
+
+
+def _pad_head(values: np.ndarray, x: np.ndarray, n: int) -> np.ndarray:
+    out = _nan_like(x)
+    out[n - 1:] = values
+    return out
+
+
+# rolling windows (a NaN inside the window gives NaN, like min_periods=window)
+
+def rolling_sum(x, n: int) -> np.ndarray:
+    x = as_float_array(x)
+    windows = _windows(x, n)
+    if windows is None:
+        return _nan_like(x)
+    return _pad_head(windows.sum(axis=-1), x, n)
+
+
+def rolling_max(x, n: int) -> np.ndarray:
+    x = as_float_array(x)
+    windows = _windows(x, n)
+    if windows is None:
+        return _nan_like(x)
+    return _pad_head(windows.max(axis=-1), x, n)
+
+
+def rolling_min(x, n: int) -> np.ndarray:
+    x = as_float_array(x)
+    windows = _windows(x, n)
+    if windows is None:
+        return _nan_like(x)
+    return _pad_head(windows.min(axis=-1), x, n)
+
+
+def rolling_std(x, n: int, ddof: int = 0) -> np.ndarray:
+    x = as_float_array(x)
+    windows = _windows(x, n)
+    if windows is None:
+        return _nan_like(x)
+    return _pad_head(windows.std(axis=-1, ddof=ddof), x, n)
+
+
+def rolling_mad(x, n: int) -> np.ndarray:
+    """rolling mean absolute deviation around the window mean."""
+    x = as_float_array(x)
+    windows = _windows(x, n)
+    if windows is None:
+        return _nan_like(x)
+    deviation = np.abs(windows - windows.mean(axis=-1, keepdims=True))
+    return _pad_head(deviation.mean(axis=-1), x, n)
+
+
+# exponential smoothing
+
+def _ewm_1d(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    beta = 1.0 - alpha
+    weighted = np.nan
+    old_wt = 1.0
+    nobs = 0
+
+    # plain floats: a scalar loop is much cheaper than numpy calls per element
+    for i, cur in enumerate(values.tolist()):
+        is_obs = cur == cur
+        nobs += is_obs
+        if weighted == weighted:
+            old_wt *= beta
+            if is_obs:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        if nobs >= min_periods:
+            out[i] = weighted
+    return out
+
+
+def _ewm_2d(values: np.ndarray, alpha, min_periods) -> np.ndarray:
+    out = _nan_like(values)
+    beta = 1.0 - alpha
+    weighted = np.full(values.shape[1], np.nan)
+    old_wt = np.ones(values.shape[1])
+    nobs = np.zeros(values.shape[1], dtype=np.int64)
+
+    # one vectorized step per row, every column advances together
+    # (alpha and min_periods may be per-column arrays, see ewm_many)
+    for i in range(len(values)):
+        cur = values[i]
+        is_obs = ~np.isnan(cur)
+        nobs += is_obs
+        started = ~np.isnan(weighted)
+
+        old_wt = np.where(started, old_wt * beta, old_wt)
+        update = started & is_obs
+        with np.errstate(invalid="ignore"):
+            blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(update, blended, weighted)
+        old_wt = np.where(update, 1.0, old_wt)
+        weighted = np.where(~started & is_obs, cur, weighted)
+
+        out[i] = np.where(nobs >= min_periods, weighted, np.nan)
+    return out
+
+
+def ewm_many(series: list[np.ndarray], alphas: list[float], min_periods: list[int]) -> list[np.ndarray]:
+    """
+    several ewm calls in one pass: the inputs are placed side by side and
+    every column advances with its own alpha, so the per-row overhead of the
+    2-D loop is paid once instead of once per series.
+    """
+    blocks = [as_float_array(x).reshape(len(x), -1) for x in series]
+    widths = [block.shape[1] for block in blocks]
+    alpha = np.repeat(np.asarray(alphas, dtype=np.float64), widths)
+    minp = np.repeat(np.maximum(np.asarray(min_periods), 1), widths)
+
+    out = _ewm_2d(np.concatenate(blocks, axis=1), alpha, minp)
+    parts = np.split(out, np.cumsum(widths)[:-1], axis=1)
+    return [part.reshape(np.shape(x)) for part, x in zip(parts, series)]
+
+
+def ewm(x, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """
+    exponentially weighted mean with pandas ewm(adjust=False) semantics:
+    starts at the first observation, carries the mean over NaN gaps and
+    decays the old weight for every step of a gap.
+    """
+    x = as_float_array(x)
+    min_periods = max(min_periods, 1)
+    if x.ndim == 1:
+        return _ewm_1d(x, alpha, min_periods)
+    return _ewm_2d(x, alpha, min_periods)
+
+
+def seed_with_mean(x: np.ndarray, n: int, start: np.ndarray | int | None = None) -> np.ndarray:
+    """
+    replace the first n values after start with NaN except the last one,
+    which becomes the (NaN-skipping) mean of those n values; the sma seed
+    used by ta-lib style ema/atr.
+    """
+    x = as_float_array(x)
+    x2 = x.reshape(len(x), -1)
+    seeded = _nan_like(x2)
+
+    starts = first_valid_index(x2) if start is None else np.broadcast_to(start, x2.shape[1])
+    rows = np.arange(len(x2))[:, None]
+    seed_row = starts + n - 1
+
+    head = (rows >= starts) & (rows <= seed_row) & ~np.isnan(x2)
+    count = head.sum(axis=0)
+    total = np.where(head, x2, 0.0).sum(axis=0)
+    seed = total / np.maximum(count, 1)
+
+    tail = rows > seed_row
+    seeded[tail] = x2[tail]
+    cols = np.flatnonzero(seed_row < len(x2))
+    seeded[seed_row[cols], cols] = seed[cols]
+    return seeded.reshape(x.shape)
+
+
+def ema(x, n: int, presma: bool = False) -> np.ndarray:
+    """
+    exponential moving average with span n.
+    presma=False: ta.trend.ema_indicator (values once n bars are available).
+    presma=True: pandas_ta.ema (seeded with the sma of the first n bars).
+    """
+    alpha = 2.0 / (n + 1)
+    if presma:
+        return ewm(seed_with_mean(x, n), alpha)
+    return ewm(x, alpha, min_periods=n)
+
+
+def rma(x, n: int) -> np.ndarray:
+    """wilder's moving average (pandas_ta.rma)."""
+    return ewm(x, 1.0 / n)
+
+
+# moving averages
+
+def sma(x, n: int) -> np.ndarray:
+    return rolling_sum(x, n) / n
+
+
+def wma(x, n: int) -> np.ndarray:
+    """linearly weighted moving average, newest bar has weight n (ta.trend.wma_indicator)."""
+    x = as_float_array(x)
+    windows = _windows(x, n)
+    if windows is None:
+        return _nan_like(x)
+    weights = np.arange(1, n + 1) * 2 / (n * (n + 1))
+    return _pad_head(windows @ weights, x, n)
+
+
+def bollinger(x, n: int = 20, k: float = 2.0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """middle, upper and lower bollinger bands (population std, like ta)."""
+    middle = sma(x, n)
+    std = rolling_std(x, n, ddof=0)
+    return middle, middle + k * std, middle - k * std
+
+
+# oscillators
+
+def price_changes(close) -> tuple[np.ndarray, np.ndarray]:
+    """bar-to-bar gains and (negative) losses used by rsi."""
+    close = as_float_array(close)
+    change = close - shift(close)
+    return np.where(change < 0, 0.0, change), np.where(change > 0, 0.0, change)
+
+
+def rsi(close, n: int = 14) -> np.ndarray:
+    close = as_float_array(close)
+    gain, loss = price_changes(close)
+
+    avg_gain = rma(gain, n)
+    avg_loss = rma(loss, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 * avg_gain / (avg_gain + np.abs(avg_loss))
+    return require_bars(out, close, n + 1)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """macd line, signal line and histogram (pandas_ta.macd)."""
+    if slow < fast:
+        fast, slow = slow, fast
+    close = as_float_array(close)
+    line = ema(close, fast, presma=True) - ema(close, slow, presma=True)
+    signal_line = ema(line, signal, presma=True)
+
+    min_bars = slow + signal - 1
+    line = require_bars(line, close, min_bars)
+    signal_line = require_bars(signal_line, close, min_bars)
+    return line, signal_line, line - signal_line
+
+
+def non_zero_range(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """high - low, shifted by epsilon for every column that has a zero range somewhere."""
+    diff = as_float_array(high) - as_float_array(low)
+    return diff + EPSILON * (diff == 0).any(axis=0)
+
+
+def stoch(high, low, close, k: int = 14, d: int = 3, smooth_k: int = 3) -> tuple[np.ndarray, np.ndarray]:
+    """stochastic %K (smoothed) and %D (pandas_ta.stoch)."""
+    close = as_float_array(close)
+    lowest = rolling_min(low, k)
+    highest = rolling_max(high, k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw = 100 * (close - lowest) / non_zero_range(highest, lowest)
+
+    stoch_k = raw if smooth_k == 1 else sma(raw, smooth_k)
+    stoch_d = sma(stoch_k, d)
+
+    min_bars = k + d + smooth_k
+    return require_bars(stoch_k, close, min_bars), require_bars(stoch_d, close, min_bars)
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """true range, NaN on each column's first bar (pandas_ta prenan)."""
+    high = as_float_array(high)
+    low = as_float_array(low)
+    prev_close = shift(as_float_array(close))
+
+    tr = np.fmax(np.abs(non_zero_range(high, low)), np.abs(high - prev_close))
+    tr = np.fmax(tr, np.abs(prev_close - low))
+
+    tr2 = tr.reshape(len(tr), -1)
+    first = first_valid_index(tr2)
+    cols = np.flatnonzero(first < len(tr2))
+    tr2[first[cols], cols] = np.nan
+    return tr
+
+
+def atr(high, low, close, n: int = 14) -> np.ndarray:
+    """average true range, rma seeded with the mean of the first n true ranges."""
+    tr = true_range(high, low, close)
+    start = first_valid_index(as_float_array(close).reshape(len(tr), -1))
+    return rma(seed_with_mean(tr, n, start), n)
+
+
+def _zero(x: np.ndarray) -> np.ndarray:
+    return np.where(np.abs(x) < EPSILON, 0.0, x)
+
+
+def directional_movement(high, low) -> tuple[np.ndarray, np.ndarray]:
+    """+DM and -DM per bar."""
+    high = as_float_array(high)
+    low = as_float_array(low)
+    up = high - shift(high)
+    down = shift(low) - low
+    # comparisons with NaN are False, so 0 * move keeps NaN where the move is unknown
+    pos = _zero(np.where((up > down) & (up > 0), up, 0.0 * up))
+    neg = _zero(np.where((down > up) & (down > 0), down, 0.0 * down))
+    return pos, neg
+
+
+def adx(high, low, close, n: int = 14) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ADX, +DI and -DI (pandas_ta.adx)."""
+    high = as_float_array(high)
+    low = as_float_array(low)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 / atr(high, low, close, n)
+
+    pos, neg = directional_movement(high, low)
+
+    dmp = k * rma(pos, n)
+    dmn = k * rma(neg, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dx = 100 * np.abs(dmp - dmn) / (dmp + dmn)
+
+    close = as_float_array(close)
+    return (
+        require_bars(rma(dx, n), close, n + 1),
+        require_bars(dmp, close, n + 1),
+        require_bars(dmn, close, n + 1),
+    )
+
+
+def cci(high, low, close, n: int = 20, c: float = 0.015) -> np.ndarray:
+    """commodity channel index on the typical price (ta.trend.cci)."""
+    typical = (as_float_array(high) + as_float_array(low) + as_float_array(close)) / 3.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (typical - sma(typical, n)) / (c * rolling_mad(typical, n))
@@ -1,12 +1,26 @@
+import os
+import sys
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
-import ta
 from tqdm import tqdm
 
+TECHNICAL_ROOT = Path(__file__).resolve().parents[1]
+if str(TECHNICAL_ROOT) not in sys.path:
+    sys.path.insert(0, str(TECHNICAL_ROOT))
+
+import kernels
+import scoring
+from resampling import BarCache, TIMEFRAME_RULES
+
+# "library" = ta, "native" = numpy kernels (skips the ta import entirely)
+INDICATOR_BACKEND = os.getenv("TA_INDICATOR_BACKEND", "library")
+if INDICATOR_BACKEND == "library":
+    import ta
+
 
 HISTORY_LIMIT_DAYS = 3 * 365
-VOLUME_BOOST = 1.2
-VOLUME_DAMPEN = 0.8
 METRIC_COLUMNS = ["SMA", "EMA", "WMA", "BOLLINGER_MIDDLE", "VOLUME_SMA", "volume_multiplier"]
 
 COLUMN_RENAME_MAP = {
@@ -18,53 +32,41 @@ COLUMN_RENAME_MAP = {
 }
 
 
-def resample_data(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
-    agg_dict = {
-        "Symbol": "first",
-        "Open": "first",
-        "High": "max",
-        "Low": "min",
-        "Close": "last",
-        "Volume": "sum",
-    }
-    return df.resample(timeframe).agg(agg_dict)
-
-
-def compute_raw_score(row: pd.Series) -> int:
-    """Calculate raw moving average score based on price position relative to MAs."""
-    close = row["Close"]
-    score = 0
-    
-    # price above MA = bullish, below = bearish
-    if pd.notna(row.get("SMA")):
-        score += 1 if close > row["SMA"] else -1
-    if pd.notna(row.get("EMA")):
-        score += 1 if close > row["EMA"] else -1
-    if pd.notna(row.get("WMA")):
-        score += 1 if close > row["WMA"] else -1
-    if pd.notna(row.get("BOLLINGER_MIDDLE")):
-        score += 1 if close > row["BOLLINGER_MIDDLE"] else -1
-    
-    return score
+def compute_raw_scores(result: pd.DataFrame) -> np.ndarray:
+    """Calculate raw moving average score for every row based on price position relative to MAs."""
+    averages = [
+        result[col].to_numpy(dtype=float)
+        for col in ["SMA", "EMA", "WMA", "BOLLINGER_MIDDLE"]
+        if col in result.columns
+    ]
+    return scoring.moving_average_score(result["Close"].to_numpy(dtype=float), *averages)
 
 
 def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
     if len(df) < 20:
         return pd.DataFrame()
 
-    close = df["Close"]
-    volume = df["Volume"]
+    close = df["close"]
+    volume = df["volume"]
 
     try:
-        # calculate moving averages
-        sma_20 = ta.trend.sma_indicator(close, window=20)
-        ema_20 = ta.trend.ema_indicator(close, window=20)
-        wma_20 = ta.trend.wma_indicator(close, window=20)
-        vol_sma_20 = ta.trend.sma_indicator(volume, window=20)
-        
-        # bollinger Bands middle line
-        bb = ta.volatility.BollingerBands(close=close, window=20, window_dev=2)
-        bb_mid = bb.bollinger_mavg()
+        if INDICATOR_BACKEND == "native":
+            close_values = close.to_numpy(dtype=float)
+            sma_20 = kernels.sma(close_values, 20)
+            ema_20 = kernels.ema(close_values, 20)
+            wma_20 = kernels.wma(close_values, 20)
+            vol_sma_20 = kernels.sma(volume.to_numpy(dtype=float), 20)
+            bb_mid, _, _ = kernels.bollinger(close_values, 20, 2)
+        else:
+            # calculate moving averages
+            sma_20 = ta.trend.sma_indicator(close, window=20)
+            ema_20 = ta.trend.ema_indicator(close, window=20)
+            wma_20 = ta.trend.wma_indicator(close, window=20)
+            vol_sma_20 = ta.trend.sma_indicator(volume, window=20)
+            
+            # bollinger Bands middle line
+            bb = ta.volatility.BollingerBands(close=close, window=20, window_dev=2)
+            bb_mid = bb.bollinger_mavg()
 
         result = pd.DataFrame(index=df.index)
         result["Close"] = close
@@ -76,13 +78,13 @@ def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
         result["Volume"] = volume
         
         # calculate volume multiplier
-        result["volume_multiplier"] = np.where(volume > vol_sma_20, VOLUME_BOOST, VOLUME_DAMPEN)
+        result["volume_multiplier"] = scoring.volume_multiplier(volume, vol_sma_20)
         
         # rename columns to readable names
         result = result.rename(columns=COLUMN_RENAME_MAP)
         
         # calculate raw score
-        result["raw_score_ma"] = result.apply(compute_raw_score, axis=1)
+        result["raw_score_ma"] = compute_raw_scores(result)
         
         # keep only relevant columns
         columns_to_keep = [col for col in METRIC_COLUMNS if col in result.columns] + ["raw_score_ma"]
@@ -94,49 +96,37 @@ def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
     return result
 
 
-def process_timeframe(df_coin: pd.DataFrame, symbol: str, timeframe: str = None) -> pd.DataFrame:
+def process_timeframe(df_coin: pd.DataFrame, symbol: str) -> pd.DataFrame:
     """Process a single coin for a specific timeframe."""
     try:
-        if timeframe:
-            df_coin = resample_data(df_coin, timeframe)
-            if df_coin.empty or len(df_coin) < 20:
-                return pd.DataFrame()
+        if df_coin.empty or len(df_coin) < 20:
+            return pd.DataFrame()
         
         processed = compute_indicators(df_coin)
         if processed.empty:
             return pd.DataFrame()
         
         processed["Symbol"] = symbol
-        processed = processed.reset_index().rename(columns={"index": "Date"})
+        processed = processed.reset_index().rename(columns={"index": "Date", "date": "Date"})
         processed = processed.sort_values("Date")
         return processed.tail(1)
     except Exception:
         return pd.DataFrame()
 
 
-def compute_moving_average_frames(df_all: pd.DataFrame) -> dict:
+def compute_moving_average_frames(bars: BarCache) -> dict:
     """
     compute moving average indicators for all coins across multiple timeframes.
     returns dict with keys '1d', '1w', '1m' containing dataframes with all metrics.
     """
-    results = {"1d": [], "1w": [], "1m": []}
-    grouped = df_all.groupby("Symbol")
-
-    for symbol, df_coin in tqdm(grouped, desc="Moving Averages"):
-        # Daily
-        daily_result = process_timeframe(df_coin.copy(), symbol)
-        if not daily_result.empty:
-            results["1d"].append(daily_result)
-        
-        # Weekly
-        weekly_result = process_timeframe(df_coin.copy(), symbol, "W")
-        if not weekly_result.empty:
-            results["1w"].append(weekly_result)
-        
-        # Monthly
-        monthly_result = process_timeframe(df_coin.copy(), symbol, "ME")
-        if not monthly_result.empty:
-            results["1m"].append(monthly_result)
+    results = {tf: [] for tf in TIMEFRAME_RULES}
+
+    for symbol in tqdm(bars.symbols, desc="Moving Averages"):
+        for tf in TIMEFRAME_RULES:
+            # compute_indicators builds its own result frame, the shared bars are only read
+            result = process_timeframe(bars.get(symbol, tf), symbol)
+            if not result.empty:
+                results[tf].append(result)
 
     return {
         tf: (pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()) 
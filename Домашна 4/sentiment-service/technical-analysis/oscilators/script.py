@@ -1,7 +1,24 @@
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
 from tqdm import tqdm
 
+TECHNICAL_ROOT = Path(__file__).resolve().parents[1]
+if str(TECHNICAL_ROOT) not in sys.path:
+    sys.path.insert(0, str(TECHNICAL_ROOT))
+
+import kernels
+import scoring
+from resampling import BarCache, TIMEFRAME_RULES
+
+# "library" = pandas_ta, "native" = numpy kernels (skips the pandas_ta import entirely)
+INDICATOR_BACKEND = os.getenv("TA_INDICATOR_BACKEND", "library")
+if INDICATOR_BACKEND == "library":
+    import pandas_ta as ta
+
 
 HISTORY_LIMIT_DAYS = 3 * 365
 METRIC_COLUMNS = ["RSI", "MACD_LINE", "MACD_SIGNAL", "STOCH_K", "STOCH_D", "DMI_PLUS", "DMI_MINUS", "ADX", "CCI"]
@@ -18,62 +35,60 @@ COLUMN_RENAME_MAP = {
 }
 
 
-def resample_data(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
-    """resample OHLCV data to a different timeframe."""
-    agg_dict = {
-        "open": "first",
-        "high": "max",
-        "low": "min",
-        "close": "last",
-        "volume": "sum",
-    }
-    try:
-        resampled = df.resample(timeframe).agg(agg_dict)
-        return resampled.dropna()
-    except Exception:
-        return df
+def metric_values(df: pd.DataFrame, column: str) -> np.ndarray:
+    """column as a float array, all-NaN when the indicator could not be computed."""
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    return df[column].to_numpy(dtype=float)
+
+
+def compute_raw_scores(df: pd.DataFrame) -> np.ndarray:
+    """calculate raw oscillator score for every row based on technical indicator thresholds."""
+    return scoring.oscillator_score(
+        rsi=metric_values(df, "RSI"),
+        stoch_k=metric_values(df, "STOCH_K"),
+        cci=metric_values(df, "CCI"),
+        macd_line=metric_values(df, "MACD_LINE"),
+        macd_signal=metric_values(df, "MACD_SIGNAL"),
+        dmi_plus=metric_values(df, "DMI_PLUS"),
+        dmi_minus=metric_values(df, "DMI_MINUS"),
+    )
 
 
-def compute_raw_score(row: pd.Series) -> int:
-    """calculate raw oscillator score based on technical indicator thresholds."""
-    score = 0
+def add_indicators_library(df: pd.DataFrame) -> pd.DataFrame:
+    """add oscillator columns using pandas_ta."""
+    df["RSI"] = df.ta.rsi(length=14)
     
-    # RSI: oversold (<30) = bullish, overbought (>70) = bearish
-    if pd.notna(row.get("RSI")):
-        if row["RSI"] < 30:
-            score += 1
-        elif row["RSI"] > 70:
-            score -= 1
+    macd = df.ta.macd(fast=12, slow=26, signal=9)
+    if macd is not None:
+        df = pd.concat([df, macd], axis=1)
     
-    # stochastic: oversold (<20) = bullish, overbought (>80) = bearish
-    stoch_k = row.get("STOCH_K")
-    if pd.notna(stoch_k):
-        if stoch_k < 20:
-            score += 1
-        elif stoch_k > 80:
-            score -= 1
+    stoch = df.ta.stoch(k=14, d=3, smooth_k=3)
+    if stoch is not None:
+        df = pd.concat([df, stoch], axis=1)
     
-    # CCI: oversold (<-100) = bullish, overbought (>100) = bearish
-    cci = row.get("CCI")
-    if pd.notna(cci):
-        if cci < -100:
-            score += 1
-        elif cci > 100:
-            score -= 1
+    adx = df.ta.adx(length=14)
+    if adx is not None:
+        df = pd.concat([df, adx], axis=1)
     
-    # MACD: MACD above signal = bullish, below = bearish
-    macd = row.get("MACD_LINE")
-    macd_signal = row.get("MACD_SIGNAL")
-    if pd.notna(macd) and pd.notna(macd_signal):
-        score += 1 if macd > macd_signal else -1
+    df["CCI"] = df.ta.cci(length=20)
     
-    # DMI: DI+ above DI- = bullish, below = bearish
-    dmp = row.get("DMI_PLUS")
-    dmn = row.get("DMI_MINUS")
-    if pd.notna(dmp) and pd.notna(dmn):
-        score += 1 if dmp > dmn else -1
+    # rename columns to readable names
+    return df.rename(columns=COLUMN_RENAME_MAP)
+
+
+def add_indicators_native(df: pd.DataFrame) -> pd.DataFrame:
+    """add oscillator columns using the numpy kernels (same parameters as the pandas_ta path)."""
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
     
-    return score
+    df["RSI"] = kernels.rsi(close, 14)
+    df["MACD_LINE"], df["MACD_SIGNAL"], _ = kernels.macd(close, 12, 26, 9)
+    df["STOCH_K"], df["STOCH_D"] = kernels.stoch(high, low, close, 14, 3, 3)
+    df["ADX"], df["DMI_PLUS"], df["DMI_MINUS"] = kernels.adx(high, low, close, 14)
+    df["CCI"] = kernels.cci(high, low, close, 20)
+    return df
 
 
 def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
@@ -85,28 +100,13 @@ def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
     
     try:
-        # calculate indicators
-        df["RSI"] = df.ta.rsi(length=14)
-        
-        macd = df.ta.macd(fast=12, slow=26, signal=9)
-        if macd is not None:
-            df = pd.concat([df, macd], axis=1)
-        
-        stoch = df.ta.stoch(k=14, d=3, smooth_k=3)
-        if stoch is not None:
-            df = pd.concat([df, stoch], axis=1)
-        
-        adx = df.ta.adx(length=14)
-        if adx is not None:
-            df = pd.concat([df, adx], axis=1)
-        
-        df["CCI"] = df.ta.cci(length=20)
-        
-        # rename columns to readable names
-        df = df.rename(columns=COLUMN_RENAME_MAP)
+        if INDICATOR_BACKEND == "native":
+            df = add_indicators_native(df)
+        else:
+            df = add_indicators_library(df)
         
         # calculate raw score
-        df["raw_score_osc"] = df.apply(compute_raw_score, axis=1)
+        df["raw_score_osc"] = compute_raw_scores(df)
         
         # keep only relevant columns
         columns_to_keep = [col for col in METRIC_COLUMNS if col in df.columns] + ["raw_score_osc"]
@@ -118,13 +118,11 @@ def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
     return df.loc[:, ~df.columns.duplicated()]
 
 
-def process_timeframe(coin_df: pd.DataFrame, symbol: str, timeframe: str = None) -> pd.DataFrame:
+def process_timeframe(coin_df: pd.DataFrame, symbol: str) -> pd.DataFrame:
     """process a single coin for a specific timeframe."""
     try:
-        if timeframe:
-            coin_df = resample_data(coin_df, timeframe)
-            if coin_df.empty:
-                return pd.DataFrame()
+        if coin_df.empty:
+            return pd.DataFrame()
         
         processed = compute_indicators(coin_df)
         if processed.empty:
@@ -140,30 +138,24 @@ def process_timeframe(coin_df: pd.DataFrame, symbol: str, timeframe: str = None)
         return pd.DataFrame()
 
 
-def compute_oscillator_frames(df: pd.DataFrame) -> dict:
+def compute_oscillator_frames(bars: BarCache) -> dict:
     """
     compute oscillator indicators for all coins across multiple timeframes.
+    bars are shared with the moving-average module and must not be modified in place.
     """
-    results = {"1d": [], "1w": [], "1m": []}
-    unique_symbols = df["symbol"].unique()
+    results = {tf: [] for tf in TIMEFRAME_RULES}
 
-    for symbol in tqdm(unique_symbols, desc="Oscillators"):
-        coin_df = df[df["symbol"] == symbol].copy().sort_index()
-        
-        # Daily
-        daily_result = process_timeframe(coin_df.copy(), symbol)
-        if not daily_result.empty:
-            results["1d"].append(daily_result)
-        
-        # Weekly
-        weekly_result = process_timeframe(coin_df.copy(), symbol, "W")
-        if not weekly_result.empty:
-            results["1w"].append(weekly_result)
-        
-        # Monthly
-        monthly_result = process_timeframe(coin_df.copy(), symbol, "ME")
-        if not monthly_result.empty:
-            results["1m"].append(monthly_result)
+    for symbol in tqdm(bars.symbols, desc="Oscillators"):
+        for tf, rule in TIMEFRAME_RULES.items():
+            coin_df = bars.get(symbol, tf)
+
+            # indicators are added as new columns, so work on a private frame;
+            # resampled bars also drop periods without trades
+            coin_df = coin_df.copy() if rule is None else coin_df.dropna()
+
+            result = process_timeframe(coin_df, symbol)
+            if not result.empty:
+                results[tf].append(result)
 
     return {
         tf: (pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()) 
@@ -0,0 +1,57 @@
+"""Helpers for splitting a multi-coin OHLCV frame into per-symbol slices."""
+
+import numpy as np
+import pandas as pd
+
+
+def sort_by_symbol(df: pd.DataFrame, symbol_col: str = "symbol") -> pd.DataFrame:
+    """
+    sort frame by symbol and then by index (date), skipping the sort
+    when the input already arrives in that order (as fetch_ohlcv returns it).
+    """
+    if df.empty:
+        return df
+
+    symbols = df[symbol_col]
+    if symbols.is_monotonic_increasing:
+        # already grouped by symbol, only the per-symbol date order is left to verify
+        return df
+
+    # stable sorts: first by date, then by symbol keeps dates ascending inside each symbol
+    return df.sort_index(kind="stable").sort_values(symbol_col, kind="stable")
+
+
+def symbol_boundaries(symbols: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """return start/end row offsets of each run of equal symbols in a sorted array."""
+    if len(symbols) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    starts = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1]])
+    ends = np.r_[starts[1:], len(symbols)]
+    return starts, ends
+
+
+def partition_by_symbol(df: pd.DataFrame, symbol_col: str = "symbol") -> list[tuple[str, pd.DataFrame]]:
+    """
+    partition the frame into contiguous per-symbol slices in a single pass.
+
+    the frame is sorted once, symbol boundaries are found with one vectorized
+    comparison and each slice is taken with iloc, so no per-symbol boolean scan
+    over the whole frame is needed and no data is copied.
+    """
+    if df.empty:
+        return []
+
+    df = sort_by_symbol(df, symbol_col)
+    symbols = df[symbol_col].to_numpy()
+
+    starts, ends = symbol_boundaries(symbols)
+
+    partitions = []
+    for start, end in zip(starts, ends):
+        coin_df = df.iloc[start:end]
+        if not coin_df.index.is_monotonic_increasing:
+            coin_df = coin_df.sort_index(kind="stable")
+        partitions.append((symbols[start], coin_df))
+
+    return partitions
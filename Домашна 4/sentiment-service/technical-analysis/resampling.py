@@ -0,0 +1,74 @@
+"""Shared daily/weekly/monthly OHLCV bars for the indicator modules."""
+
+import pandas as pd
+
+from partitioning import partition_by_symbol
+
+
+# timeframe key -> pandas resample rule (None = daily rows as fetched)
+TIMEFRAME_RULES = {"1d": None, "1w": "W", "1m": "ME"}
+
+OHLCV_AGG = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+}
+
+
+def resample_bars(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """resample date-indexed OHLCV rows to a different timeframe."""
+    return df.resample(rule).agg(OHLCV_AGG)
+
+
+def fill_periods(bars: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """
+    add the empty periods a pandas resample would produce to bars aggregated
+    elsewhere (e.g. in SQL): NaN prices and zero volume.
+    """
+    bars = bars[list(OHLCV_AGG)].asfreq(rule)
+    bars["volume"] = bars["volume"].fillna(0)
+    return bars
+
+
+class BarCache:
+    """
+    per-symbol OHLCV bars for every timeframe, shared by the oscillator and
+    moving-average modules.
+
+    daily bars are zero-copy slices of the input frame, weekly and monthly
+    bars are resampled on first access and reused afterwards, so each symbol
+    is resampled once per timeframe no matter how many modules consume it.
+    consumers must not modify the returned frames in place.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        symbol_col: str = "symbol",
+        resampled: dict[str, pd.DataFrame] | None = None,
+    ):
+        # df is expected to be date-indexed with lowercase OHLCV columns,
+        # resampled optionally maps timeframe -> bars already aggregated elsewhere
+        self._daily = dict(partition_by_symbol(df, symbol_col))
+        self._bars: dict[tuple[str, str], pd.DataFrame] = {}
+        for timeframe, bars in (resampled or {}).items():
+            rule = TIMEFRAME_RULES[timeframe]
+            for symbol, coin_bars in partition_by_symbol(bars, symbol_col):
+                self._bars[(symbol, timeframe)] = fill_periods(coin_bars, rule)
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._daily)
+
+    def __len__(self) -> int:
+        return len(self._daily)
+
+    def get(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        key = (symbol, timeframe)
+        if key not in self._bars:
+            daily = self._daily[symbol]
+            rule = TIMEFRAME_RULES[timeframe]
+            self._bars[key] = daily if rule is None else resample_bars(daily, rule)
+        return self._bars[key]
@@ -0,0 +1,53 @@
+"""Vectorized raw-score rules shared by the indicator modules and the wide engine."""
+
+import numpy as np
+
+
+VOLUME_BOOST = 1.2
+VOLUME_DAMPEN = 0.8
+
+
+def band_vote(values: np.ndarray, lower: float, upper: float) -> np.ndarray:
+    """+1 below lower (oversold), -1 above upper (overbought), 0 otherwise or when missing."""
+    values = np.asarray(values, dtype=np.float64)
+    return (values < lower).astype(np.int64) - (values > upper).astype(np.int64)
+
+
+def cross_vote(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    """+1 if fast is above slow, -1 otherwise, 0 when either side is missing."""
+    fast = np.asarray(fast, dtype=np.float64)
+    slow = np.asarray(slow, dtype=np.float64)
+    known = ~np.isnan(fast) & ~np.isnan(slow)
+    return np.where(known, np.where(fast > slow, 1, -1), 0)
+
+
+def oscillator_score(rsi, stoch_k, cci, macd_line, macd_signal, dmi_plus, dmi_minus) -> np.ndarray:
+    """
+    raw oscillator score in [-5, 5]:
+    RSI <30 / >70, stochastic %K <20 / >80, CCI <-100 / >100,
+    MACD line vs signal and DI+ vs DI-.
+    """
+    return (
+        band_vote(rsi, 30, 70)
+        + band_vote(stoch_k, 20, 80)
+        + band_vote(cci, -100, 100)
+        + cross_vote(macd_line, macd_signal)
+        + cross_vote(dmi_plus, dmi_minus)
+    )
+
+
+def moving_average_score(close, *averages) -> np.ndarray:
+    """raw moving-average score: +1 for every known average below the close, -1 above it."""
+    close = np.asarray(close, dtype=np.float64)
+    score = np.zeros(close.shape, dtype=np.int64)
+    for average in averages:
+        average = np.asarray(average, dtype=np.float64)
+        score += np.where(np.isnan(average), 0, np.where(close > average, 1, -1))
+    return score
+
+
+def volume_multiplier(volume, volume_sma) -> np.ndarray:
+    """boost the score weight when volume is above its average, dampen it otherwise."""
+    with np.errstate(invalid="ignore"):
+        above = np.asarray(volume, dtype=np.float64) > np.asarray(volume_sma, dtype=np.float64)
+    return np.where(above, VOLUME_BOOST, VOLUME_DAMPEN)
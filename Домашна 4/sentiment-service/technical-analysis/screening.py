@@ -0,0 +1,134 @@
+"""
+Cross-sectional screening over the technical_analysis output.
+
+At publish time build_screen adds, for every (period, date) group of
+symbols, percentile ranks of the main metrics and the normalized_score
+rank, all with vectorized groupby ranks. The result is published as its own
+table so the API can answer "top 20 by score" or "rsi < 30 and adx > 25"
+with one indexed query instead of fetching symbols one by one.
+"""
+
+import re
+
+import pandas as pd
+
+
+SCREEN_TABLE = "technical_screen"
+SCREEN_INDEXES = [("period", "date", "score_rank"), ("symbol",)]
+
+# short names accepted by the api -> technical_analysis columns
+SCREEN_ALIASES = {
+    "score": "normalized_score",
+    "rsi": "osc_rsi",
+    "macd": "osc_macd_line",
+    "macd_signal": "osc_macd_signal",
+    "stoch_k": "osc_stoch_k",
+    "stoch_d": "osc_stoch_d",
+    "dmi_plus": "osc_dmi_plus",
+    "dmi_minus": "osc_dmi_minus",
+    "adx": "osc_adx",
+    "cci": "osc_cci",
+    "sma": "ma_sma",
+    "ema": "ma_ema",
+    "wma": "ma_wma",
+    "bollinger_middle": "ma_bollinger_middle",
+    "volume_sma": "ma_volume_sma",
+}
+METRIC_COLUMNS = list(dict.fromkeys(SCREEN_ALIASES.values()))
+
+# metrics that get a pct_<column> percentile rank within their (period, date)
+RANKED_METRICS = ["normalized_score", "osc_rsi", "osc_adx", "osc_cci", "osc_stoch_k"]
+SCREEN_ALIASES.update({
+    "pct_score": "pct_normalized_score",
+    "pct_rsi": "pct_osc_rsi",
+    "pct_adx": "pct_osc_adx",
+    "pct_cci": "pct_osc_cci",
+    "pct_stoch_k": "pct_osc_stoch_k",
+})
+
+SCREEN_COLUMNS = set(METRIC_COLUMNS) | {f"pct_{m}" for m in RANKED_METRICS} | {"score_rank"}
+PERIODS = {"DAY", "WEEK", "MONTH"}
+MAX_LIMIT = 500
+
+FILTER_PATTERN = re.compile(r"^\s*([a-z_]+)\s*(<=|>=|!=|==|=|<|>)\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def build_screen(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    percentile ranks and score rank per (period, date) for rows in the
+    technical_analysis layout (lowercase columns, one row per symbol/period).
+    """
+    columns = ["id", "date", "symbol", "period"] + [c for c in METRIC_COLUMNS if c in df.columns]
+    screen = df[columns].sort_values(["period", "date", "symbol"]).reset_index(drop=True)
+
+    groups = screen.groupby(["period", "date"], sort=False)
+    for metric in RANKED_METRICS:
+        if metric in screen.columns:
+            screen[f"pct_{metric}"] = groups[metric].rank(pct=True)
+    # 1 = highest normalized_score of the day, ties broken by symbol
+    screen["score_rank"] = groups["normalized_score"].rank(ascending=False, method="first").astype("int64")
+    return screen
+
+
+def resolve_column(name: str) -> str:
+    name = name.strip().lower()
+    column = SCREEN_ALIASES.get(name, name)
+    if column not in SCREEN_COLUMNS:
+        raise ValueError(f"Unknown screening column: {name}")
+    return column
+
+
+def parse_filters(expression: str | None) -> list[tuple[str, str, float]]:
+    """parse "rsi < 30 and adx > 25" into (column, operator, value) conditions."""
+    if not expression or not expression.strip():
+        return []
+
+    conditions = []
+    for clause in re.split(r"\s+and\s+", expression.strip(), flags=re.IGNORECASE):
+        match = FILTER_PATTERN.match(clause.lower())
+        if not match:
+            raise ValueError(f"Invalid filter: {clause!r} (expected e.g. 'rsi < 30')")
+        name, operator, value = match.groups()
+        conditions.append((resolve_column(name), "=" if operator == "==" else operator, float(value)))
+    return conditions
+
+
+def screen_query(
+    period: str = "DAY",
+    filters: list[tuple[str, str, float]] | None = None,
+    sort: str = "score",
+    ascending: bool = False,
+    limit: int = 20,
+    date: str | None = None,
+) -> tuple[str, dict]:
+    """
+    parameterized SQL for the screen table. column names only come from the
+    whitelist, values are bound. without a date the latest date of the
+    period is used.
+    """
+    period = period.upper()
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    sort_column = resolve_column(sort)
+    limit = max(1, min(int(limit), MAX_LIMIT))
+
+    params = {"period": period, "limit": limit}
+    where = ["period = :period"]
+    if date:
+        where.append("date = CAST(:date AS DATE)")
+        params["date"] = date
+    else:
+        where.append(f"date = (SELECT MAX(date) FROM {SCREEN_TABLE} WHERE period = :period)")
+
+    for i, (column, operator, value) in enumerate(filters or []):
+        where.append(f"{column} {operator} :value_{i}")
+        params[f"value_{i}"] = value
+
+    query = f"""
+        SELECT *
+        FROM {SCREEN_TABLE}
+        WHERE {' AND '.join(where)}
+        ORDER BY {sort_column} {'ASC' if ascending else 'DESC'} NULLS LAST, symbol
+        LIMIT :limit
+    """
+    return query, params
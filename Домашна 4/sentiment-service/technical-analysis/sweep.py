@@ -0,0 +1,460 @@
+"""
+Indicator parameter sweep.
+
+Computes every parameterization in a grid for all coins and timeframes in
+one pass over the wide panel (see wide_engine). Intermediates that do not
+depend on the length (price changes, true range, directional movement,
+typical price, prefix sums for rolling means) are computed once per
+timeframe, and length-dependent ones (emas, rolling extremes) once per
+distinct length, so e.g. MACD combinations sharing a fast length reuse the
+same ema. All exponential smoothings of the grid run side by side in one
+batched ewm pass (two for the macd signal lines), which is where the
+kernels spend most of their time.
+
+For each (indicator, params) entry the sweep keeps the indicator's vote
+towards the raw score (int8) and its main value (float32) on the full
+dates x symbols grid, stored column-wise in a compressed .npz. Any
+combination of entries can then be scored with normalized_scores without
+recomputing indicators.
+
+Usage:
+    python sweep.py --out sweeps/          # OHLCV from the database
+"""
+
+import argparse
+import itertools
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import kernels
+import scoring
+from resampling import TIMEFRAME_RULES
+from wide_engine import WidePanel, compact_inputs, expand, oscillator_mask, panel_for
+
+
+# indicator -> parameter tuples to evaluate (LIVE_PARAMS are the middle ones)
+DEFAULT_GRID = {
+    "rsi": [(7,), (14,), (21,)],
+    "macd": [(8, 21, 5), (12, 26, 9), (19, 39, 9)],
+    "stoch": [(9, 3, 3), (14, 3, 3), (21, 5, 5)],
+    "adx": [(10,), (14,), (20,)],
+    "cci": [(14,), (20,), (30,)],
+    "ma": [(10,), (20,), (50,)],
+}
+
+# parameters the live indicator modules use
+LIVE_PARAMS = {
+    "rsi": (14,),
+    "macd": (12, 26, 9),
+    "stoch": (14, 3, 3),
+    "adx": (14,),
+    "cci": (20,),
+    "ma": (20,),
+}
+
+# value stored next to each vote
+VALUE_NAMES = {
+    "rsi": "RSI",
+    "macd": "MACD_HIST",
+    "stoch": "STOCH_K",
+    "adx": "DI_SPREAD",
+    "cci": "CCI",
+    "ma": "VOLUME_MULTIPLIER",
+}
+
+OSCILLATORS = ["rsi", "macd", "stoch", "adx", "cci"]
+MAX_SCORE = 9  # 5 oscillator votes + 4 moving-average votes, as in combine_signals
+# input columns per batched ewm pass (wider passes stop paying off and cost memory)
+EWM_BATCH_COLUMNS = 20_000
+
+
+class Intermediates:
+    """
+    length-independent pieces and per-length caches over compacted bars.
+
+    exponential smoothings are described by specs (key, input, alpha,
+    min_periods) so that smooth() can run many of them in one ewm_many pass;
+    smoothed() returns a cached result or computes a single spec.
+    """
+
+    def __init__(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray | None = None):
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self._cache = {}
+
+    def cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    # length-independent
+
+    @property
+    def gain(self):
+        return self.cached("changes", lambda: kernels.price_changes(self.close))[0]
+
+    @property
+    def loss(self):
+        return self.cached("changes", lambda: kernels.price_changes(self.close))[1]
+
+    @property
+    def plus_dm(self):
+        return self.cached("dm", lambda: kernels.directional_movement(self.high, self.low))[0]
+
+    @property
+    def minus_dm(self):
+        return self.cached("dm", lambda: kernels.directional_movement(self.high, self.low))[1]
+
+    @property
+    def true_range(self):
+        return self.cached("tr", lambda: kernels.true_range(self.high, self.low, self.close))
+
+    @property
+    def typical(self):
+        return self.cached("typical", lambda: (self.high + self.low + self.close) / 3.0)
+
+    def cumsums(self, name: str):
+        """prefix sums of values, index-weighted values and valid counts (NaN counted as 0)."""
+        def compute():
+            x = getattr(self, name)
+            valid = ~np.isnan(x)
+            filled = np.where(valid, x, 0.0)
+            index = np.arange(len(x)).reshape((-1,) + (1,) * (x.ndim - 1))
+            pad = np.zeros((1,) + x.shape[1:])
+            return (
+                np.concatenate([pad, np.cumsum(filled, axis=0)]),
+                np.concatenate([pad, np.cumsum(filled * (index + 1), axis=0)]),
+                np.concatenate([pad, np.cumsum(valid, axis=0)]),
+            )
+        return self.cached(("cumsums", name), compute)
+
+    # per length
+
+    def mean(self, name: str, n: int) -> np.ndarray:
+        """rolling mean from prefix sums, NaN unless all n bars are present (kernels.sma)."""
+        def compute():
+            total, _, count = self.cumsums(name)
+            out = np.full(total[1:].shape, np.nan)
+            if n <= len(out):
+                full = (count[n:] - count[:-n]) == n
+                out[n - 1:] = np.where(full, (total[n:] - total[:-n]) / n, np.nan)
+            return out
+        return self.cached(("mean", name, n), compute)
+
+    def wma(self, name: str, n: int) -> np.ndarray:
+        """linearly weighted mean from prefix sums (kernels.wma)."""
+        def compute():
+            total, weighted, count = self.cumsums(name)
+            out = np.full(total[1:].shape, np.nan)
+            if n <= len(out):
+                end = np.arange(n, len(total)).reshape((-1,) + (1,) * (total.ndim - 1))
+                window_sum = total[n:] - total[:-n]
+                window_weighted = weighted[n:] - weighted[:-n]
+                # bar i in the window ending at bar t gets weight i - (t - n)
+                value = (window_weighted - (end - n) * window_sum) / (n * (n + 1) / 2)
+                out[n - 1:] = np.where((count[n:] - count[:-n]) == n, value, np.nan)
+            return out
+        return self.cached(("wma", name, n), compute)
+
+    def extremes(self, k: int) -> tuple[np.ndarray, np.ndarray]:
+        return self.cached(
+            ("extremes", k),
+            lambda: (kernels.rolling_min(self.low, k), kernels.rolling_max(self.high, k)),
+        )
+
+    def macd_line(self, fast: int, slow: int) -> np.ndarray:
+        return self.cached(
+            ("macd_line", fast, slow),
+            lambda: self.smoothed(self.ema_spec(fast, True)) - self.smoothed(self.ema_spec(slow, True)),
+        )
+
+    # exponential smoothing specs
+
+    def rma_spec(self, name: str, n: int):
+        return ("rma", name, n), lambda: getattr(self, name), 1.0 / n, 1
+
+    def ema_spec(self, n: int, presma: bool):
+        """kernels.ema: presma seeds with the first n bars' mean, otherwise min_periods = n."""
+        if presma:
+            return ("ema", n, True), lambda: kernels.seed_with_mean(self.close, n), 2.0 / (n + 1), 1
+        return ("ema", n, False), lambda: self.close, 2.0 / (n + 1), n
+
+    def atr_spec(self, n: int):
+        """kernels.atr: rma of the true range seeded from each coin's first bar."""
+        def source():
+            start = kernels.first_valid_index(self.close.reshape(len(self.close), -1))
+            return kernels.seed_with_mean(self.true_range, n, start)
+        return ("atr", n), source, 1.0 / n, 1
+
+    def signal_spec(self, fast: int, slow: int, signal: int):
+        line = lambda: kernels.seed_with_mean(self.macd_line(fast, slow), signal)
+        return ("signal", fast, slow, signal), line, 2.0 / (signal + 1), 1
+
+    def smoothed(self, spec) -> np.ndarray:
+        key, source, alpha, min_periods = spec
+        return self.cached(key, lambda: kernels.ewm(source(), alpha, min_periods))
+
+    def smooth(self, specs: list, max_columns: int = EWM_BATCH_COLUMNS):
+        """run every not yet cached spec through ewm_many, max_columns input columns per pass."""
+        pending = {}
+        for spec in specs:
+            if spec[0] not in self._cache:
+                pending.setdefault(spec[0], spec)
+        pending = list(pending.values())
+
+        width = max(1, self.close.size // len(self.close))
+        per_pass = max(1, max_columns // width)
+        for i in range(0, len(pending), per_pass):
+            batch = pending[i:i + per_pass]
+            results = kernels.ewm_many(
+                [source() for _, source, _, _ in batch],
+                [alpha for _, _, alpha, _ in batch],
+                [min_periods for _, _, _, min_periods in batch],
+            )
+            for (key, _, _, _), result in zip(batch, results):
+                self._cache[key] = result
+
+
+def smoothing_passes(ctx: Intermediates, indicators: dict) -> list[list]:
+    """
+    every exponential smoothing the grid needs, grouped into passes whose
+    inputs only depend on earlier passes (macd signals need the macd lines).
+    """
+    first, second = [], []
+    for (n,) in indicators.get("rsi", []):
+        first += [ctx.rma_spec("gain", n), ctx.rma_spec("loss", n)]
+    for fast, slow, signal in indicators.get("macd", []):
+        first += [ctx.ema_spec(fast, True), ctx.ema_spec(slow, True)]
+        second.append(ctx.signal_spec(fast, slow, signal))
+    for (n,) in indicators.get("adx", []):
+        first += [ctx.atr_spec(n), ctx.rma_spec("plus_dm", n), ctx.rma_spec("minus_dm", n)]
+    for (n,) in indicators.get("ma", []):
+        first.append(ctx.ema_spec(n, False))
+    return [first, second]
+
+
+def sweep_rsi(ctx: Intermediates, n: int):
+    avg_gain = ctx.smoothed(ctx.rma_spec("gain", n))
+    avg_loss = ctx.smoothed(ctx.rma_spec("loss", n))
+    value = kernels.require_bars(100 * avg_gain / (avg_gain + np.abs(avg_loss)), ctx.close, n + 1)
+    return value, scoring.band_vote(value, 30, 70)
+
+
+def sweep_macd(ctx: Intermediates, fast: int, slow: int, signal: int):
+    line = ctx.macd_line(fast, slow)
+    signal_line = ctx.smoothed(ctx.signal_spec(fast, slow, signal))
+    min_bars = slow + signal - 1
+    line = kernels.require_bars(line, ctx.close, min_bars)
+    signal_line = kernels.require_bars(signal_line, ctx.close, min_bars)
+    return line - signal_line, scoring.cross_vote(line, signal_line)
+
+
+def sweep_stoch(ctx: Intermediates, k: int, d: int, smooth_k: int):
+    lowest, highest = ctx.extremes(k)
+    raw = 100 * (ctx.close - lowest) / kernels.non_zero_range(highest, lowest)
+    stoch_k = raw if smooth_k == 1 else kernels.sma(raw, smooth_k)
+    stoch_k = kernels.require_bars(stoch_k, ctx.close, k + d + smooth_k)
+    return stoch_k, scoring.band_vote(stoch_k, 20, 80)
+
+
+def sweep_adx(ctx: Intermediates, n: int):
+    # only the directional indicators vote, the adx line itself is not needed
+    k = 100 / ctx.smoothed(ctx.atr_spec(n))
+    dmp = kernels.require_bars(k * ctx.smoothed(ctx.rma_spec("plus_dm", n)), ctx.close, n + 1)
+    dmn = kernels.require_bars(k * ctx.smoothed(ctx.rma_spec("minus_dm", n)), ctx.close, n + 1)
+    return dmp - dmn, scoring.cross_vote(dmp, dmn)
+
+
+def sweep_cci(ctx: Intermediates, n: int):
+    typical = ctx.typical
+    value = (typical - ctx.mean("typical", n)) / (0.015 * kernels.rolling_mad(typical, n))
+    return value, scoring.band_vote(value, -100, 100)
+
+
+def sweep_ma(ctx: Intermediates, n: int):
+    sma = ctx.mean("close", n)
+    ema = ctx.smoothed(ctx.ema_spec(n, False))
+    wma = ctx.wma("close", n)
+    # the bollinger middle band is the sma
+    vote = scoring.moving_average_score(ctx.close, sma, ema, wma, sma)
+    multiplier = scoring.volume_multiplier(ctx.volume, ctx.mean("volume", n))
+    return multiplier, vote
+
+
+SWEEPS = {
+    "rsi": sweep_rsi,
+    "macd": sweep_macd,
+    "stoch": sweep_stoch,
+    "adx": sweep_adx,
+    "cci": sweep_cci,
+    "ma": sweep_ma,
+}
+
+
+class SweepResult:
+    """votes and values of every grid entry for one timeframe, on a dates x symbols grid."""
+
+    def __init__(
+        self,
+        timeframe: str,
+        dates: pd.DatetimeIndex,
+        symbols: np.ndarray,
+        entries: list[tuple[str, tuple]],
+        votes: np.ndarray,
+        values: np.ndarray,
+        mask: np.ndarray,
+    ):
+        self.timeframe = timeframe
+        self.dates = dates
+        self.symbols = symbols
+        self.entries = entries
+        self.votes = votes      # int8 (entries, dates, symbols), 0 where unknown
+        self.values = values    # float32 (entries, dates, symbols), NaN where unknown
+        self.mask = mask        # bool (dates, symbols), bars the coin really has
+
+    def entry(self, indicator: str, params: tuple) -> int:
+        return self.entries.index((indicator, tuple(params)))
+
+    def save(self, path: str | Path):
+        width = max(len(params) for _, params in self.entries)
+        params = np.array([list(p) + [0] * (width - len(p)) for _, p in self.entries], dtype=np.int32)
+        np.savez_compressed(
+            path,
+            timeframe=np.array(self.timeframe),
+            dates=self.dates.to_numpy(dtype="datetime64[ns]"),
+            symbols=self.symbols.astype(str),
+            indicator=np.array([name for name, _ in self.entries]),
+            params=params,
+            param_count=np.array([len(p) for _, p in self.entries], dtype=np.int32),
+            votes=self.votes,
+            values=self.values,
+            mask=self.mask,
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "SweepResult":
+        with np.load(path) as data:
+            entries = [
+                (str(name), tuple(int(v) for v in params[:count]))
+                for name, params, count in zip(data["indicator"], data["params"], data["param_count"])
+            ]
+            return cls(
+                str(data["timeframe"]),
+                pd.DatetimeIndex(data["dates"]),
+                data["symbols"],
+                entries,
+                data["votes"],
+                data["values"],
+                data["mask"],
+            )
+
+
+def _sweep_group(panel: WidePanel, mask: np.ndarray, inputs: list[str], indicators: dict, out_votes, out_values, slots):
+    """compute a group of indicators sharing one compaction and scatter them onto the date grid."""
+    arrays, order, counts, keep = compact_inputs(panel, mask, inputs)
+    if not keep.any():
+        return
+    ctx = Intermediates(*arrays)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for specs in smoothing_passes(ctx, indicators):
+            ctx.smooth(specs)
+        for indicator, grid in indicators.items():
+            for params in grid:
+                value, vote = SWEEPS[indicator](ctx, *params)
+                slot = slots[(indicator, tuple(params))]
+                value = expand(np.asarray(value, dtype=np.float64), order, counts)
+                vote = expand(np.asarray(vote, dtype=np.float64), order, counts)
+                out_values[slot][:, keep] = value
+                out_votes[slot][:, keep] = np.nan_to_num(vote).astype(np.int8)
+
+
+def sweep_panel(panel: WidePanel, rule: str | None, timeframe: str, grid: dict = DEFAULT_GRID) -> SweepResult:
+    entries = [(indicator, tuple(params)) for indicator, grid_params in grid.items() for params in grid_params]
+    slots = {entry: i for i, entry in enumerate(entries)}
+    shape = (len(entries), len(panel.dates), len(panel.symbols))
+    votes = np.zeros(shape, dtype=np.int8)
+    values = np.full(shape, np.nan, dtype=np.float32)
+
+    # same bars as the live modules: oscillators skip empty periods, moving averages keep gaps
+    oscillators = {name: params for name, params in grid.items() if name in OSCILLATORS}
+    averages = {name: params for name, params in grid.items() if name not in OSCILLATORS}
+    _sweep_group(panel, oscillator_mask(panel, rule), ["high", "low", "close"], oscillators, votes, values, slots)
+    _sweep_group(panel, panel.mask, ["high", "low", "close", "volume"], averages, votes, values, slots)
+
+    return SweepResult(timeframe, panel.dates, panel.symbols, entries, votes, values, panel.mask)
+
+
+def run_sweep(raw_df: pd.DataFrame, grid: dict = DEFAULT_GRID, timeframes=tuple(TIMEFRAME_RULES)) -> dict[str, SweepResult]:
+    """sweep the grid for every timeframe on long-format OHLCV rows."""
+    daily = WidePanel.from_long(raw_df)
+    return {
+        tf: sweep_panel(panel_for(daily, tf), TIMEFRAME_RULES[tf], tf, grid)
+        for tf in timeframes
+    }
+
+
+def normalized_scores(
+    result: SweepResult,
+    selection: dict[str, tuple],
+    osc_rows: np.ndarray | None = None,
+    ma_rows: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    normalized_score on the dates x symbols grid for one parameter set, e.g.
+    {"rsi": (14,), "macd": (12, 26, 9), ..., "ma": (20,)}, the same way
+    combine_signals.calculate_normalized_score combines the raw scores.
+    osc_rows / ma_rows optionally mark the bars that have an oscillator /
+    moving-average row; the other bars count as a missing row (no votes,
+    multiplier 1).
+    """
+    raw = np.zeros(result.votes.shape[1:], dtype=np.int16)
+    for indicator, params in selection.items():
+        votes = result.votes[result.entry(indicator, params)]
+        rows = osc_rows if indicator in OSCILLATORS else ma_rows
+        raw += votes if rows is None else np.where(rows, votes, 0).astype(np.int8)
+
+    multiplier = np.ones(raw.shape)
+    if "ma" in selection:
+        stored = result.values[result.entry("ma", selection["ma"])]
+        # values are float32, map back to the exact float64 multipliers
+        exact = np.where(stored > 1.0, scoring.VOLUME_BOOST, scoring.VOLUME_DAMPEN)
+        multiplier = np.where(np.isnan(stored) | (stored == 0), 1.0, exact)
+        if ma_rows is not None:
+            multiplier = np.where(ma_rows, multiplier, 1.0)
+
+    return np.round(np.clip(raw / (MAX_SCORE * multiplier), -1, 1), 3)
+
+
+def parameter_sets(grid: dict = DEFAULT_GRID):
+    """every combination of one parameter tuple per indicator."""
+    names = list(grid)
+    for combo in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, combo))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="sweeps", help="directory for sweep_<timeframe>.npz")
+    args = parser.parse_args()
+
+    from combine_signals import fetch_ohlcv
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    print("Fetching OHLCV...")
+    raw_df = fetch_ohlcv()
+
+    for tf, result in run_sweep(raw_df).items():
+        path = out_dir / f"sweep_{tf}.npz"
+        result.save(path)
+        print(f"{tf}: {len(result.entries)} parameter entries x {len(result.symbols)} symbols -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import correlations
+from correlations import close_matrix, rebuild_state, run_correlations, update_state
+
+
+def random_closes(symbols: int, days: int, seed: int) -> pd.DataFrame:
+    """random walks with listing days, missing bars and a coin that stops trading."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=days, freq="D")
+    frames = []
+    for k in range(symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, days)))
+        keep = rng.random(days) > 0.1
+        keep[:rng.integers(0, days // 3)] = False
+        if k == 0:
+            keep[days // 2:] = False
+        frames.append(pd.DataFrame({"symbol": f"C{k:02d}", "date": dates[keep], "close": close[keep]}))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.mark.parametrize("window", [5, 30])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_incremental_updates_match_a_rebuild(window, seed):
+    df = random_closes(12, 120, seed)
+    universe = np.append(np.sort(df["symbol"].unique()), "NOBARS")
+    dates = np.sort(df["date"].unique())
+
+    state = rebuild_state(window, df[df["date"] <= dates[60]], universe)
+    for start, stop in [(60, 61), (61, 75), (75, len(dates) - 1)]:
+        # like fetch_closes(since=last state date): the chunk repeats the state's last day
+        chunk = df[(df["date"] >= dates[start]) & (df["date"] <= dates[stop])]
+        state = update_state(state, chunk)
+    rebuilt = rebuild_state(window, df, universe)
+
+    assert list(state.dates) == list(rebuilt.dates)
+    for name in ("count", "sums", "squares", "cross"):
+        np.testing.assert_allclose(getattr(state, name), getattr(rebuilt, name), atol=1e-9)
+    pd.testing.assert_frame_equal(state.top_peers(3), rebuilt.top_peers(3), check_exact=False, atol=1e-9)
+
+
+def test_empty_closes_give_an_empty_state():
+    empty = pd.DataFrame({"symbol": [], "date": pd.to_datetime([]), "close": []})
+    assert close_matrix(empty).empty
+
+    state = rebuild_state(30, empty, np.array(["BTC", "ETH"]))
+    assert len(state.dates) == 0
+    assert state.top_peers().empty
+    assert rebuild_state(30, empty, np.array([], dtype=str)).top_peers().empty
+
+
+def test_rebuild_reads_only_the_longest_window(monkeypatch, tmp_path):
+    df = random_closes(6, 200, 3)
+    latest = df["date"].max()
+    since = []
+
+    def fetch_closes(start=None):
+        since.append(start)
+        return df if start is None else df[df["date"] >= start]
+
+    monkeypatch.setattr(correlations, "STATE_DIR", tmp_path)
+    monkeypatch.setattr(correlations, "fetch_universe", lambda: np.sort(df["symbol"].unique()))
+    monkeypatch.setattr(correlations, "fetch_latest_date", lambda: latest)
+    monkeypatch.setattr(correlations, "fetch_closes", fetch_closes)
+
+    peers = run_correlations(windows=(30, 90), k=3)
+    assert since == [latest - pd.Timedelta(days=90)]
+
+    universe = np.sort(df["symbol"].unique())
+    expected = pd.concat([rebuild_state(w, df, universe).top_peers(3) for w in (30, 90)], ignore_index=True)
+    pd.testing.assert_frame_equal(peers, expected)
+
+
+def test_no_bars_at_all(monkeypatch, tmp_path):
+    empty = pd.DataFrame({"symbol": [], "date": pd.to_datetime([]), "close": []})
+    monkeypatch.setattr(correlations, "STATE_DIR", tmp_path)
+    monkeypatch.setattr(correlations, "fetch_universe", lambda: np.array([], dtype=str))
+    monkeypatch.setattr(correlations, "fetch_latest_date", lambda: None)
+    monkeypatch.setattr(correlations, "fetch_closes", lambda since=None: empty)
+
+    assert run_correlations(k=3).empty
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import kernels
+
+ta = pytest.importorskip("ta")
+pytest.importorskip("pandas_ta")
+
+RTOL = 1e-7
+ATOL = 1e-9
+
+
+def random_ohlcv(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    spread = rng.uniform(0, 0.05, n)
+    high = close * (1 + spread * rng.random(n))
+    low = close * (1 - spread * rng.random(n))
+    # flat bars give zero ranges, which stoch and cci have to survive
+    flat = rng.random(n) < 0.05
+    high[flat] = low[flat] = close[flat]
+    return pd.DataFrame({
+        "open": close, "high": high, "low": low, "close": close, "volume": rng.uniform(1e3, 1e6, n),
+    }, index=pd.date_range("2022-01-01", periods=n, freq="D"))
+
+
+def library(df: pd.DataFrame) -> dict[str, pd.Series | None]:
+    """the library calls the indicator modules make."""
+    high, low, close, volume = df["high"], df["low"], df["close"], df["volume"]
+    macd = df.ta.macd(fast=12, slow=26, signal=9)
+    stoch = df.ta.stoch(k=14, d=3, smooth_k=3)
+    adx = df.ta.adx(length=14)
+    parts = [f for f in (macd, stoch, adx) if f is not None]
+    frame = pd.concat(parts, axis=1) if parts else pd.DataFrame()
+    bb = ta.volatility.BollingerBands(close=close, window=20, window_dev=2)
+    return {
+        "RSI": df.ta.rsi(length=14),
+        "MACD_LINE": frame.get("MACD_12_26_9"),
+        "MACD_SIGNAL": frame.get("MACDs_12_26_9"),
+        "STOCH_K": frame.get("STOCHk_14_3_3"),
+        "STOCH_D": frame.get("STOCHd_14_3_3"),
+        "ADX": frame.get("ADX_14"),
+        "DMI_PLUS": frame.get("DMP_14"),
+        "DMI_MINUS": frame.get("DMN_14"),
+        "CCI": ta.trend.cci(high, low, close, window=20),
+        "SMA": ta.trend.sma_indicator(close, window=20),
+        "EMA": ta.trend.ema_indicator(close, window=20),
+        "WMA": ta.trend.wma_indicator(close, window=20),
+        "VOLUME_SMA": ta.trend.sma_indicator(volume, window=20),
+        "BOLLINGER_MIDDLE": bb.bollinger_mavg(),
+        "BOLLINGER_UPPER": bb.bollinger_hband(),
+        "BOLLINGER_LOWER": bb.bollinger_lband(),
+    }
+
+
+def native(high, low, close, volume) -> dict[str, np.ndarray]:
+    out = {"RSI": kernels.rsi(close, 14)}
+    out["MACD_LINE"], out["MACD_SIGNAL"], _ = kernels.macd(close, 12, 26, 9)
+    out["STOCH_K"], out["STOCH_D"] = kernels.stoch(high, low, close, 14, 3, 3)
+    out["ADX"], out["DMI_PLUS"], out["DMI_MINUS"] = kernels.adx(high, low, close, 14)
+    out["CCI"] = kernels.cci(high, low, close, 20)
+    out["SMA"] = kernels.sma(close, 20)
+    out["EMA"] = kernels.ema(close, 20)
+    out["WMA"] = kernels.wma(close, 20)
+    out["VOLUME_SMA"] = kernels.sma(volume, 20)
+    out["BOLLINGER_MIDDLE"], out["BOLLINGER_UPPER"], out["BOLLINGER_LOWER"] = kernels.bollinger(close, 20, 2)
+    return out
+
+
+def columns(df: pd.DataFrame):
+    return [df[c].to_numpy(dtype=np.float64) for c in ("high", "low", "close", "volume")]
+
+
+def assert_matches(expected: np.ndarray, actual: np.ndarray, name: str):
+    np.testing.assert_array_equal(np.isnan(expected), np.isnan(actual), err_msg=f"{name} NaN positions")
+    valid = ~np.isnan(expected)
+    np.testing.assert_allclose(actual[valid], expected[valid], rtol=RTOL, atol=ATOL, err_msg=name)
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("n", [10, 30, 60, 400])
+def test_kernels_match_the_libraries(n, seed):
+    df = random_ohlcv(n, seed)
+    actual = native(*columns(df))
+    for name, series in library(df).items():
+        # the .ta accessor hands back its input frame instead of None when a series is too short
+        missing = series is None or isinstance(series, pd.DataFrame)
+        expected = np.full(n, np.nan) if missing else series.to_numpy(dtype=np.float64)
+        assert_matches(expected, actual[name], name)
+
+
+def test_columns_of_a_matrix_match_single_coins():
+    # the wide engine runs the kernels on a dates x symbols matrix with NaN before each listing
+    frames = [random_ohlcv(300, seed) for seed in range(4)]
+    listed = [0, 50, 120, 280]
+    matrix = []
+    for k in range(4):
+        values = np.column_stack([f.iloc[:, 1:].to_numpy()[:, k] for f in frames])
+        for column, start in enumerate(listed):
+            values[:start, column] = np.nan
+        matrix.append(values)
+    wide = native(*matrix)
+
+    for column, start in enumerate(listed):
+        single = native(*[m[start:, column] for m in matrix])
+        for name, values in single.items():
+            assert_matches(values, wide[name][start:, column], name)
+            assert np.isnan(wide[name][:start, column]).all(), name
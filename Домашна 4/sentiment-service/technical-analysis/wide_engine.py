@@ -0,0 +1,237 @@
+"""
+Wide-matrix technical analysis engine.
+
+Instead of looping over symbols, OHLCV is pivoted into dates x symbols float
+arrays with a mask of the bars each coin really has (listing gaps, delisted
+coins). Every indicator is then computed for all coins in one vectorized pass
+along axis 0 with the numpy kernels.
+
+Before computing, each column is compacted so that the coin's own bars sit
+on consecutive rows (the same rows the per-symbol loop sees); results are
+read back by date afterwards. The output therefore matches the per-symbol
+loop with TA_INDICATOR_BACKEND=native.
+
+With history=True every bar is returned instead of only the latest one, each
+row holding the values a run on that date would have published.
+"""
+
+import numpy as np
+import pandas as pd
+
+import kernels
+import scoring
+from resampling import OHLCV_AGG, TIMEFRAME_RULES
+
+
+OHLCV_FIELDS = list(OHLCV_AGG)
+OSC_MIN_BARS = 30
+MA_MIN_BARS = 20
+OSC_COLUMNS = ["RSI", "MACD_LINE", "MACD_SIGNAL", "STOCH_K", "STOCH_D", "DMI_PLUS", "DMI_MINUS", "ADX", "CCI"]
+MA_COLUMNS = ["SMA", "EMA", "WMA", "BOLLINGER_MIDDLE", "VOLUME_SMA", "volume_multiplier"]
+
+
+class WidePanel:
+    """OHLCV for many coins as aligned dates x symbols arrays plus a presence mask."""
+
+    def __init__(self, dates: pd.DatetimeIndex, symbols: np.ndarray, fields: dict[str, np.ndarray], mask: np.ndarray):
+        self.dates = dates
+        self.symbols = symbols
+        self.fields = fields
+        self.mask = mask
+
+    @classmethod
+    def from_long(cls, raw_df: pd.DataFrame) -> "WidePanel":
+        """pivot (symbol, date, open, high, low, close, volume) rows into a panel."""
+        raw_df = raw_df.drop_duplicates(subset=["symbol", "date"], keep="last")
+        symbol_codes, symbols = pd.factorize(raw_df["symbol"], sort=True)
+        date_codes, dates = pd.factorize(pd.to_datetime(raw_df["date"]), sort=True)
+
+        shape = (len(dates), len(symbols))
+        mask = np.zeros(shape, dtype=bool)
+        mask[date_codes, symbol_codes] = True
+
+        fields = {}
+        for field in OHLCV_FIELDS:
+            values = np.full(shape, np.nan)
+            values[date_codes, symbol_codes] = raw_df[field].to_numpy(dtype=np.float64)
+            fields[field] = values
+
+        return cls(pd.DatetimeIndex(dates), np.asarray(symbols), fields, mask)
+
+    def resample(self, rule: str) -> "WidePanel":
+        """
+        aggregate to weekly/monthly bars for all coins at once. every period
+        between a coin's first and last bar is kept (with NaN prices when the
+        coin had no bars in it), like a per-symbol resample.
+        """
+        fields = {}
+        for field, how in OHLCV_AGG.items():
+            resampled = getattr(pd.DataFrame(self.fields[field], index=self.dates).resample(rule), how)()
+            fields[field] = resampled.to_numpy(dtype=np.float64)
+
+        present = pd.DataFrame(self.mask, index=self.dates).resample(rule).max().to_numpy(dtype=bool)
+        return WidePanel(pd.DatetimeIndex(resampled.index), self.symbols, fields, span_mask(present))
+
+    @classmethod
+    def from_bars(cls, bars_df: pd.DataFrame, rule: str) -> "WidePanel":
+        """panel from weekly/monthly bars aggregated elsewhere (e.g. in SQL), gaps filled like resample."""
+        panel = cls.from_long(bars_df)
+        dates = pd.date_range(panel.dates[0], panel.dates[-1], freq=rule)
+        rows = dates.get_indexer(panel.dates)
+
+        fields = {}
+        for field, values in panel.fields.items():
+            full = np.full((len(dates), len(panel.symbols)), np.nan)
+            full[rows] = values
+            fields[field] = full
+        present = np.zeros(fields["close"].shape, dtype=bool)
+        present[rows] = panel.mask
+        fields["volume"][~present] = 0.0
+
+        return cls(dates, panel.symbols, fields, span_mask(present))
+
+
+def span_mask(present: np.ndarray) -> np.ndarray:
+    """True from each column's first to its last present row."""
+    before_first = np.logical_and.accumulate(~present, axis=0)
+    after_last = np.logical_and.accumulate(~present[::-1], axis=0)[::-1]
+    return ~before_first & ~after_last
+
+
+def compact(values: np.ndarray, order: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """move each column's masked rows to the top (in date order) and blank the rest."""
+    out = np.take_along_axis(values, order, axis=0)
+    out[np.arange(len(out))[:, None] >= counts] = np.nan
+    return out
+
+
+def expand(values: np.ndarray, order: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """inverse of compact: put compacted rows back on their dates."""
+    out = np.full(values.shape, np.nan)
+    used = np.arange(len(values))[:, None] < counts
+    np.put_along_axis(out, order, np.where(used, values, np.nan), axis=0)
+    return out
+
+
+def compact_inputs(panel: WidePanel, mask: np.ndarray, inputs: list[str], min_bars: int = 1):
+    """
+    compacted input arrays for the coins with at least min_bars masked bars.
+    returns (arrays, order, counts, keep) where keep selects the panel columns.
+    """
+    counts = mask.sum(axis=0)
+    keep = counts >= min_bars
+    mask = mask[:, keep]
+    counts = counts[keep]
+    order = np.argsort(~mask, axis=0, kind="stable")
+    arrays = [compact(panel.fields[name][:, keep], order, counts) for name in inputs]
+    return arrays, order, counts, keep
+
+
+def compute_oscillators(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> dict[str, np.ndarray]:
+    out = {}
+    out["RSI"] = kernels.rsi(close, 14)
+    out["MACD_LINE"], out["MACD_SIGNAL"], _ = kernels.macd(close, 12, 26, 9)
+    out["STOCH_K"], out["STOCH_D"] = kernels.stoch(high, low, close, 14, 3, 3)
+    out["ADX"], out["DMI_PLUS"], out["DMI_MINUS"] = kernels.adx(high, low, close, 14)
+    out["CCI"] = kernels.cci(high, low, close, 20)
+    out["raw_score_osc"] = scoring.oscillator_score(
+        out["RSI"], out["STOCH_K"], out["CCI"],
+        out["MACD_LINE"], out["MACD_SIGNAL"],
+        out["DMI_PLUS"], out["DMI_MINUS"],
+    )
+    return out
+
+
+def compute_moving_averages(close: np.ndarray, volume: np.ndarray) -> dict[str, np.ndarray]:
+    out = {}
+    out["SMA"] = kernels.sma(close, 20)
+    out["EMA"] = kernels.ema(close, 20)
+    out["WMA"] = kernels.wma(close, 20)
+    out["BOLLINGER_MIDDLE"], _, _ = kernels.bollinger(close, 20, 2)
+    out["VOLUME_SMA"] = kernels.sma(volume, 20)
+    out["volume_multiplier"] = scoring.volume_multiplier(volume, out["VOLUME_SMA"])
+    out["raw_score_ma"] = scoring.moving_average_score(
+        close, out["SMA"], out["EMA"], out["WMA"], out["BOLLINGER_MIDDLE"]
+    )
+    return out
+
+
+def indicator_rows(
+    panel: WidePanel,
+    mask: np.ndarray,
+    compute,
+    inputs: list[str],
+    columns: list[str],
+    min_bars: int,
+    date_col: str,
+    symbol_col: str,
+    history: bool = False,
+) -> pd.DataFrame:
+    """
+    compute indicators on the masked bars of every coin and return the
+    latest row per coin (or every row from the min_bars-th bar on when
+    history is set), in the same layout as the per-symbol modules.
+    """
+    arrays, order, counts, keep = compact_inputs(panel, mask, inputs, min_bars)
+    if not keep.any():
+        return pd.DataFrame()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        results = compute(*arrays)
+
+    if history:
+        bar = np.arange(len(order))[:, None]
+        rows, cols = np.nonzero((bar >= min_bars - 1) & (bar < counts))
+    else:
+        rows, cols = counts - 1, np.arange(len(counts))
+
+    frame = {date_col: panel.dates[order[rows, cols]]}
+    for name in columns:
+        frame[name] = results[name][rows, cols]
+    frame[symbol_col] = panel.symbols[keep][cols]
+    return pd.DataFrame(frame)
+
+
+def oscillator_mask(panel: WidePanel, rule: str | None) -> np.ndarray:
+    """oscillators skip periods without trades, moving averages keep them as gaps."""
+    if rule is None:
+        return panel.mask
+    return panel.mask & ~np.isnan(np.stack([panel.fields[f] for f in OHLCV_FIELDS])).any(axis=0)
+
+
+def panel_for(daily: WidePanel, tf: str, resampled: dict[str, pd.DataFrame] | None = None) -> WidePanel:
+    """daily panel, SQL-aggregated bars or a resample of the daily panel for a timeframe."""
+    rule = TIMEFRAME_RULES[tf]
+    if rule is None:
+        return daily
+    if resampled and tf in resampled:
+        return WidePanel.from_bars(resampled[tf], rule)
+    return daily.resample(rule)
+
+
+def compute_frames_wide(
+    raw_df: pd.DataFrame,
+    history: bool = False,
+    resampled: dict[str, pd.DataFrame] | None = None,
+) -> tuple[dict, dict]:
+    """
+    wide-matrix counterpart of combine_signals.compute_frames. resampled
+    optionally holds weekly/monthly bars already aggregated in SQL.
+    """
+    daily = WidePanel.from_long(raw_df)
+
+    osc_frames, ma_frames = {}, {}
+    for tf, rule in TIMEFRAME_RULES.items():
+        panel = panel_for(daily, tf, resampled)
+
+        osc_mask = oscillator_mask(panel, rule)
+        osc_frames[tf] = indicator_rows(
+            panel, osc_mask, compute_oscillators, ["high", "low", "close"],
+            OSC_COLUMNS + ["raw_score_osc"], OSC_MIN_BARS, "date", "symbol", history,
+        )
+        ma_frames[tf] = indicator_rows(
+            panel, panel.mask, compute_moving_averages, ["close", "volume"],
+            MA_COLUMNS + ["raw_score_ma"], MA_MIN_BARS, "Date", "Symbol", history,
+        )
+
+    return osc_frames, ma_frames